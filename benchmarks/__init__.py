@@ -0,0 +1 @@
+"""Benchmarks for the System Monitor API and registration agent"""
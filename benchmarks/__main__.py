@@ -0,0 +1,137 @@
+"""
+Benchmark suite
+
+Runs the API load test, the collector cost, /proc fast path, encoding and
+synthetic host scaling benchmarks, and the registration agent insert benchmark (when a local
+PostgreSQL database is configured), and writes all results as one JSON
+document. Pass a previous result file with --compare to list regressions;
+the exit status is 1 when any metric got worse by more than the tolerance.
+
+Usage:
+    python -m benchmarks --output results.json
+    python -m benchmarks --output new.json --compare results.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+
+from system_monitor import __version__
+
+from benchmarks import bench_api, bench_collectors, bench_encoding, bench_procfs, bench_register, bench_scale
+
+# Section -> (key field identifying a result, {metric: True if higher is better})
+METRICS = {
+    "api": ("endpoint", {"p50_ms": False, "p99_ms": False, "requests_per_second": True,
+                         "loop_cpu_ms_per_request": False}),
+    "collectors": ("collector", {"cpu_ms_per_sample": False}),
+    "procfs": ("path", {"cpu_us_per_sample": False}),
+    "encoding": (("format", "encoding", "gzip"), {"bytes": False, "p50_ms": False}),
+    "register": ("mode", {"rows_per_second": True}),
+    "scale": (("function", "shape"), {"us_per_entity": False}),
+}
+
+
+def run_suite(args) -> dict:
+    """Run every benchmark and collect the results by section."""
+    results = {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "started_at": time.time(),
+    }
+    print("api...", file=sys.stderr)
+    results["api"] = asyncio.run(bench_api.run(concurrency=args.concurrency, requests=args.requests))
+    print("collectors...", file=sys.stderr)
+    results["collectors"] = bench_collectors.run(args.samples)
+    print("procfs...", file=sys.stderr)
+    try:
+        results["procfs"] = bench_procfs.run(args.samples * 100)
+    except SystemExit as e:
+        results["procfs"] = {"skipped": str(e)}
+    print("encoding...", file=sys.stderr)
+    results["encoding"] = asyncio.run(bench_encoding.run(requests=args.samples))
+    print("scale...", file=sys.stderr)
+    results["scale"] = bench_scale.run(shapes=args.shapes.split(","))
+    print("register...", file=sys.stderr)
+    try:
+        results["register"] = bench_register.run(args.rows, args.batch_size)
+    except SystemExit as e:
+        results["register"] = {"skipped": str(e)}
+    return results
+
+
+def _key(result: dict, field) -> tuple:
+    fields = field if isinstance(field, tuple) else (field,)
+    return tuple(result.get(name) for name in fields)
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list:
+    """
+    Find metrics that got worse than the baseline by more than the tolerance.
+
+    Args:
+        baseline: Results of an earlier run
+        current: Results of this run
+        tolerance: Allowed relative change, e.g. 0.2 for 20%
+
+    Returns:
+        List of regression descriptions
+    """
+    regressions = []
+    for section, (field, metrics) in METRICS.items():
+        before, after = baseline.get(section), current.get(section)
+        if not isinstance(before, list) or not isinstance(after, list):
+            continue
+        previous = {_key(result, field): result for result in before}
+        for result in after:
+            old = previous.get(_key(result, field))
+            if old is None:
+                continue
+            for metric, higher_is_better in metrics.items():
+                new_value, old_value = result.get(metric), old.get(metric)
+                if not new_value or not old_value:
+                    continue
+                change = (new_value - old_value) / old_value
+                if (-change if higher_is_better else change) > tolerance:
+                    name = "/".join(str(part) for part in _key(result, field))
+                    regressions.append(f"{section} {name} {metric}: {old_value:.4g} -> {new_value:.4g} "
+                                       f"({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="Earlier JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent API clients")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint under load")
+    parser.add_argument("--samples", type=int, default=20, help="Collections per collector")
+    parser.add_argument("--shapes", default="small,medium,large", help="Synthetic host shapes to scale over")
+    parser.add_argument("--rows", type=int, default=2000, help="Rows per agent insert mode")
+    parser.add_argument("--batch-size", type=int, default=100, help="Rows per batched agent flush")
+    args = parser.parse_args()
+
+    results = run_suite(args)
+    document = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(document)
+    else:
+        print(document)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), results, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
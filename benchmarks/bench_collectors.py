@@ -0,0 +1,77 @@
+"""
+Collector cost benchmark
+
+Runs every blocking collector repeatedly with its caching disabled and
+reports the CPU time and wall time of one collection.
+
+Usage:
+    python -m benchmarks.bench_collectors --samples 20
+"""
+
+import argparse
+import json
+import time
+
+from system_monitor.collectors.disk import DiskCollector
+from system_monitor.collectors.process import ProcessRegistry
+from system_monitor.collectors.sockets import SocketInventory
+from system_monitor.routers.sensors.sensors import collect_sensors_data
+from system_monitor.routers.system.system import collect_system_info
+from system_monitor.sampler import Sampler
+
+
+def collectors() -> dict:
+    """Collector name -> function taking one uncached sample."""
+    sampler = Sampler()
+    sampler.backend.cpu_percent()
+    return {
+        "sampler": sampler.collect,
+        "process": ProcessRegistry(refresh_interval=0).refresh,
+        "sockets": SocketInventory(refresh_interval=0).refresh,
+        "disk_usage": DiskCollector().usages,
+        "sensors": collect_sensors_data,
+        "system": collect_system_info,
+    }
+
+
+def measure(name: str, collect, samples: int) -> dict:
+    collect()  # warm up
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    for _ in range(samples):
+        collect()
+    return {
+        "collector": name,
+        "samples": samples,
+        "cpu_ms_per_sample": (time.process_time() - cpu_started) / samples * 1000,
+        "wall_ms_per_sample": (time.perf_counter() - started) / samples * 1000,
+    }
+
+
+def run(samples: int = 20) -> list:
+    """
+    Benchmark every collector.
+
+    Returns:
+        List of result dictionaries, one per collector
+    """
+    return [measure(name, collect, samples) for name, collect in collectors().items()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=20, help="Collections per collector")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.samples)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'collector':<12}{'samples':>9}{'cpu ms':>10}{'wall ms':>10}")
+    for r in results:
+        print(f"{r['collector']:<12}{r['samples']:>9}{r['cpu_ms_per_sample']:>10.2f}{r['wall_ms_per_sample']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
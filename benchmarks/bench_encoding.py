@@ -0,0 +1,96 @@
+"""
+Response encoding benchmark
+
+Requests an endpoint in-process through the ASGI app in every combination of
+output format (human/raw), body encoding (JSON/MessagePack) and transfer
+compression (identity/gzip), and reports payload size and latency. No server
+or database is needed.
+
+Usage:
+    python -m benchmarks.bench_encoding --path /api/v1/process/ --requests 50
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from system_monitor.encoding import MSGPACK_MEDIA_TYPES, msgpack, orjson
+from system_monitor.main import app
+
+ENCODINGS = {
+    "json": "application/json",
+    "msgpack": MSGPACK_MEDIA_TYPES[0],
+}
+
+
+async def measure(client: httpx.AsyncClient, path: str, output_format: str, encoding: str, gzip: bool,
+                  requests: int) -> dict:
+    """Request one combination repeatedly and summarize size and latency."""
+    headers = {
+        "Accept": ENCODINGS[encoding],
+        "Accept-Encoding": "gzip" if gzip else "identity",
+    }
+    params = {"format": output_format}
+    latencies = []
+    size = 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get(path, params=params, headers=headers)
+        latencies.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        size = int(response.headers.get("content-length", len(response.content)))
+    latencies.sort()
+    return {
+        "format": output_format,
+        "encoding": encoding,
+        "gzip": gzip,
+        "bytes": size,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+async def run(path: str = "/api/v1/process/", requests: int = 50) -> list:
+    """
+    Benchmark every format/encoding/compression combination for an endpoint.
+
+    Returns:
+        List of result dictionaries with payload bytes and p50/p99 latency in milliseconds
+    """
+    encodings = ["json"] + (["msgpack"] if msgpack is not None else [])
+    results = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.get(path)  # warm up the sampler and collector caches
+            for output_format in ("human", "raw"):
+                for encoding in encodings:
+                    for gzip in (False, True):
+                        results.append(await measure(client, path, output_format, encoding, gzip, requests))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default="/api/v1/process/", help="Endpoint to benchmark")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per combination")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.path, args.requests))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"JSON encoder: {'orjson' if orjson is not None else 'json (stdlib)'}")
+    print(f"{'format':<8}{'encoding':<10}{'gzip':<6}{'bytes':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(f"{r['format']:<8}{r['encoding']:<10}{'yes' if r['gzip'] else 'no':<6}{r['bytes']:>10}"
+              f"{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
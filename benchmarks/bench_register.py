@@ -0,0 +1,121 @@
+"""
+Registration agent write benchmark
+
+Compares the old write path (one upsert and one commit per sample) with the
+batched SampleBuffer path against a local PostgreSQL database configured in
+config.ini. Rows are written for documentation-range IP addresses and removed
+afterwards.
+
+Usage:
+    python -m benchmarks.bench_register --rows 2000 --batch-size 100
+"""
+
+import argparse
+import json
+import time
+
+import system_monitor.register as register
+
+BENCH_IP_PREFIX = "198.51.100."
+
+
+def make_rows(count: int, hosts: int = 50) -> list:
+    """Generate synthetic samples spread over a number of hosts."""
+    now = int(time.time() * 1000)
+    return [
+        {
+            "ip": f"{BENCH_IP_PREFIX}{i % hosts}",
+            "hostname": f"bench-{i % hosts}",
+            "access_port": 8000,
+            "cpu_percent": float(i % 100),
+            "cpu_count": 8,
+            "memory_percent": float((i * 7) % 100),
+            "memory_total": 32.0,
+            "disk_usage": float((i * 3) % 100),
+            "updated_on": now + i,
+        }
+        for i in range(count)
+    ]
+
+
+def bench_per_row(rows: list) -> dict:
+    """One server_info upsert, one sample insert and one commit per row."""
+    started = time.perf_counter()
+    for row in rows:
+        register.cursor.execute(register.sql_insert, row)
+        register.cursor.execute(
+            "INSERT INTO server_samples(ip, sampled_on, cpu_percent, memory_percent, disk_usage) "
+            "VALUES (%(ip)s, %(updated_on)s, %(cpu_percent)s, %(memory_percent)s, %(disk_usage)s)",
+            row,
+        )
+        register.conn.commit()
+    elapsed = time.perf_counter() - started
+    return {"mode": "per_row", "rows": len(rows), "commits": len(rows), "seconds": elapsed}
+
+
+def bench_batched(rows: list, batch_size: int) -> dict:
+    """SampleBuffer flushes of batch_size rows, one commit per batch."""
+    buffer = register.SampleBuffer(batch_size=batch_size, flush_interval=3600, max_buffered=batch_size)
+    commits = 0
+    started = time.perf_counter()
+    for row in rows:
+        buffer.add(row)
+        if len(buffer.rows) >= batch_size:
+            buffer.flush(register.conn, register.cursor)
+            commits += 1
+    if buffer.rows:
+        buffer.flush(register.conn, register.cursor)
+        commits += 1
+    elapsed = time.perf_counter() - started
+    return {"mode": f"batched_{batch_size}", "rows": len(rows), "commits": commits, "seconds": elapsed}
+
+
+def cleanup():
+    """Remove benchmark rows."""
+    register.cursor.execute("DELETE FROM server_samples WHERE ip LIKE %s", (BENCH_IP_PREFIX + "%",))
+    register.cursor.execute("DELETE FROM server_info WHERE ip LIKE %s", (BENCH_IP_PREFIX + "%",))
+    register.conn.commit()
+
+
+def run(rows: int = 2000, batch_size: int = 100) -> list:
+    """
+    Run both write paths and report their throughput.
+
+    Returns:
+        List of result dictionaries with rows/s and commits/s
+    """
+    if not register.connect_to_database():
+        raise SystemExit("A local PostgreSQL database is required (see [database] in config.ini)")
+
+    samples = make_rows(rows)
+    results = []
+    try:
+        for result in (bench_per_row(samples), bench_batched(samples, batch_size)):
+            result["rows_per_second"] = result["rows"] / result["seconds"]
+            result["commits_per_second"] = result["commits"] / result["seconds"]
+            results.append(result)
+    finally:
+        cleanup()
+        register.conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000, help="Number of samples to write per mode")
+    parser.add_argument("--batch-size", type=int, default=100, help="Rows per batched flush")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.batch_size)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'mode':<16}{'rows':>8}{'commits':>9}{'seconds':>10}{'rows/s':>12}{'commits/s':>12}")
+    for r in results:
+        print(f"{r['mode']:<16}{r['rows']:>8}{r['commits']:>9}{r['seconds']:>10.3f}"
+              f"{r['rows_per_second']:>12.0f}{r['commits_per_second']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Scaling benchmark
+
+Runs get_all_processes, an indexed process search, disk_usage and
+get_interfaces against synthetic hosts of growing size and reports the cost per call and per entity, so
+super-linear behaviour shows up as a rising per-entity cost. The hosts come
+from the synthetic backend with a fixed seed, so every run formats exactly
+the same data.
+
+Usage:
+    python -m benchmarks.bench_scale --samples 5
+"""
+
+import argparse
+import json
+import time
+
+from system_monitor.backends.synthetic import SyntheticBackend
+from system_monitor.collectors.process import ProcessRegistry
+from system_monitor.routers.disk.disk import disk_usage
+from system_monitor.routers.network.network import get_interfaces
+from system_monitor.routers.process.process import format_process
+from system_monitor.sampler import Sampler
+
+# name -> synthetic host shape
+SHAPES = {
+    "small": {"processes": 100, "cores": 4, "nics": 2, "partitions": 4, "sockets": 100},
+    "medium": {"processes": 1000, "cores": 16, "nics": 4, "partitions": 16, "sockets": 1000},
+    "large": {"processes": 10000, "cores": 64, "nics": 16, "partitions": 128, "sockets": 10000},
+    "huge": {"processes": 50000, "cores": 256, "nics": 64, "partitions": 512, "sockets": 50000},
+}
+
+
+def _time(func, samples: int) -> float:
+    """Mean wall time of one call in milliseconds."""
+    started = time.perf_counter()
+    for _ in range(samples):
+        func()
+    return (time.perf_counter() - started) / samples * 1000
+
+
+def measure(shape_name: str, shape: dict, samples: int) -> list:
+    backend = SyntheticBackend(seed=1, churn=0.01, **shape)
+    sampler = Sampler(interval=1.0, backend=backend)
+    registry = ProcessRegistry(refresh_interval=0, backend=backend)
+    backend.cpu_percent()
+    snapshot = sampler.collect()
+    registry.refresh()  # warm up the registry so only the steady state is timed
+
+    def get_all_processes():
+        backend.tick()  # churn the process table like a live host between refreshes
+        return [format_process(record) for record in registry.refresh()]
+
+    def search_processes():
+        # Searches reuse the process list's sample, so this times the index lookup
+        return [format_process(record) for record in registry.search(name="nginx", user="root", max_age=60)]
+
+    cases = (
+        ("get_all_processes", get_all_processes, shape["processes"]),
+        ("search_processes", search_processes, shape["processes"]),
+        ("disk_usage", lambda: disk_usage(snapshot), shape["partitions"]),
+        ("get_interfaces", lambda: get_interfaces(snapshot), shape["nics"]),
+    )
+    results = []
+    for function, func, entities in cases:
+        milliseconds = _time(func, samples)
+        results.append({
+            "function": function,
+            "shape": shape_name,
+            "entities": entities,
+            "samples": samples,
+            "ms_per_call": milliseconds,
+            "us_per_entity": milliseconds * 1000 / entities,
+        })
+    return results
+
+
+def run(samples: int = 5, shapes=None) -> list:
+    """
+    Benchmark every function on every host shape.
+
+    Args:
+        samples: Calls per function and shape
+        shapes: Shape names to run, all of SHAPES if omitted
+
+    Returns:
+        List of result dictionaries, one per function and shape
+    """
+    results = []
+    for name in shapes or SHAPES:
+        results.extend(measure(name, SHAPES[name], samples))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=5, help="Calls per function and shape")
+    parser.add_argument("--shapes", default=",".join(SHAPES), help="Comma-separated host shapes to run")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.samples, [name.strip() for name in args.shapes.split(",")])
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'function':<20}{'shape':<8}{'entities':>10}{'ms/call':>12}{'us/entity':>12}")
+    for r in results:
+        print(f"{r['function']:<20}{r['shape']:<8}{r['entities']:>10}{r['ms_per_call']:>12.2f}"
+              f"{r['us_per_entity']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
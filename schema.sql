@@ -23,6 +23,18 @@ CREATE INDEX IF NOT EXISTS idx_server_info_updated_on ON server_info(updated_on)
 -- Create an index on hostname for faster lookups
 CREATE INDEX IF NOT EXISTS idx_server_info_hostname ON server_info(hostname);
 
+-- Time-series samples written in batches by the registration agent
+CREATE TABLE IF NOT EXISTS server_samples (
+    ip VARCHAR(15) NOT NULL,
+    sampled_on BIGINT NOT NULL,
+    cpu_percent FLOAT,
+    memory_percent FLOAT,
+    disk_usage FLOAT
+);
+
+-- Create an index for per-server time range queries
+CREATE INDEX IF NOT EXISTS idx_server_samples_ip_sampled_on ON server_samples(ip, sampled_on);
+
 -- Example query to get all servers updated in the last 5 minutes
 -- SELECT * FROM server_info WHERE updated_on > (EXTRACT(EPOCH FROM NOW()) * 1000) - 300000;
 
@@ -38,7 +38,16 @@ setup(
         "psutil>=7.0.0",
         "psycopg2-binary>=2.9.10",
         "pydantic>=2.11.0",
+        "httpx>=0.28.0",
     ],
+    extras_require={
+        # Faster history queries, JSON encoding and MessagePack responses
+        "performance": [
+            "numpy>=1.24.0",
+            "orjson>=3.9.0",
+            "msgpack>=1.0.0",
+        ],
+    },
     entry_points={
         "console_scripts": [
             "system-monitor=system_monitor.main:main",
@@ -8,6 +8,9 @@ PYTHON_REGISTER_CMD="python -m $REGISTER_SCRIPT"
 
 source .venv/bin/activate
 
+# With [agent] embedded = true the API process runs the registration agent itself
+EMBEDDED_AGENT=$(python -c "import system_monitor.config as c; print(c.get('agent', 'embedded', 'false').lower())" | tail -n 1)
+
 # Kill processes by script name
 kill_process() {
     local SCRIPT_NAME=$1
@@ -44,5 +47,9 @@ kill_process "$API_SCRIPT"
 kill_process "$REGISTER_SCRIPT"
 sleep 1
 start_process "$PYTHON_API_CMD" "api.log"
-start_process "$PYTHON_REGISTER_CMD" "agent.log"
+if [ "$EMBEDDED_AGENT" != "true" ]; then
+    start_process "$PYTHON_REGISTER_CMD" "agent.log"
+else
+    echo "Registration agent is embedded in the API process"
+fi
 echo "=== Restart completed ==="
\ No newline at end of file
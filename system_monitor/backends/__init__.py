@@ -0,0 +1,46 @@
+"""
+Pluggable metrics backends
+
+``backend`` is the source of raw measurements for the whole process, chosen
+with ``[backend] name``:
+    - psutil: the local host (default)
+    - synthetic: generated hosts of a configurable shape, see [synthetic]
+    - replay: snapshots recorded with ``python -m system_monitor.backends.replay``
+"""
+
+from typing import Optional
+
+import system_monitor.config as config
+from system_monitor.backends.base import MetricsBackend
+
+BACKENDS = ("psutil", "synthetic", "replay")
+
+
+def create(name: Optional[str] = None) -> MetricsBackend:
+    """
+    Create a metrics backend.
+
+    Args:
+        name: Backend name; read from ``[backend] name`` if omitted
+
+    Returns:
+        The backend instance
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    if name is None:
+        name = config.get("backend", "name", "psutil")
+    if name == "psutil":
+        from system_monitor.backends.psutil_backend import PsutilBackend
+        return PsutilBackend()
+    if name == "synthetic":
+        from system_monitor.backends.synthetic import SyntheticBackend
+        return SyntheticBackend()
+    if name == "replay":
+        from system_monitor.backends.replay import ReplayBackend
+        return ReplayBackend()
+    raise ValueError(f"Unknown metrics backend '{name}', expected one of: {', '.join(BACKENDS)}")
+
+
+backend = create()
@@ -0,0 +1,135 @@
+"""
+Metrics backend interface
+
+A backend supplies every raw measurement the sampler, collectors, routers
+and the registration agent use. Results are the named tuples of
+system_monitor.measurements, with the same field names as their psutil
+counterparts, so consumers do not care which backend produced them.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+# The result types live in a module of their own so that collectors such as
+# the /proc fast path can use them without importing the backend package
+from system_monitor.measurements import (  # noqa: F401 (re-exported for the backends)
+    pio, pmem, sbattery, sconn, sdiskio, sdiskpart, sdiskusage, sfan, shwtemp, snetio, snicaddr, snicstats, suser,
+    svmem,
+)
+
+
+class MetricsBackend(ABC):
+    """
+    Source of raw system metrics.
+
+    Subclasses implement every abstract method, so an incomplete backend
+    fails when it is created rather than inside a request. ``tick()`` is
+    called once before each sampler collection; backends that generate or
+    play back data advance to their next sample there.
+    """
+
+    name = "base"
+
+    def tick(self):
+        """Advance to the next sample."""
+
+    def supports(self, feature: str) -> bool:
+        """
+        Check whether an optional measurement is available.
+
+        Args:
+            feature: sensors_temperatures, sensors_fans or sensors_battery
+
+        Returns:
+            True if the corresponding method can be called
+        """
+        return True
+
+    @abstractmethod
+    def cpu_count(self, logical: bool = True) -> Optional[int]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def cpu_percent(self) -> Tuple[float, List[float]]:
+        """Overall and per-CPU utilization since the previous call."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def getloadavg(self) -> Optional[Tuple[float, float, float]]:
+        """1, 5 and 15 minute load averages, or None where unavailable."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def virtual_memory(self) -> svmem:
+        raise NotImplementedError
+
+    @abstractmethod
+    def net_io_counters(self) -> Dict[str, snetio]:
+        """Per-interface network counters."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def net_if_addrs(self) -> Dict[str, List[snicaddr]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def net_if_stats(self) -> Dict[str, snicstats]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def net_connections(self) -> List[sconn]:
+        """System-wide inet sockets."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def disk_partitions(self) -> List[sdiskpart]:
+        """Mounted physical partitions."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def disk_usage(self, mountpoint: str) -> sdiskusage:
+        raise NotImplementedError
+
+    @abstractmethod
+    def disk_io_counters(self) -> Dict[str, sdiskio]:
+        """Per-device disk counters."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def pids(self) -> List[int]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def process(self, pid: int):
+        """
+        Get a process handle.
+
+        Returns:
+            Object with a ``pid`` attribute and ``as_dict(attrs, ad_value)`` and
+            ``is_running()`` methods like psutil.Process; is_running() is False
+            once the process exited or its PID belongs to another process
+
+        Raises:
+            psutil.NoSuchProcess: If the process does not exist
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def sensors_temperatures(self) -> Dict[str, List[shwtemp]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def sensors_fans(self) -> Dict[str, List[sfan]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def sensors_battery(self) -> Optional[sbattery]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def boot_time(self) -> float:
+        raise NotImplementedError
+
+    @abstractmethod
+    def users(self) -> List[suser]:
+        raise NotImplementedError
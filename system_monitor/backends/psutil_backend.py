@@ -0,0 +1,91 @@
+"""
+psutil metrics backend
+
+Reads the real host through psutil. On Linux the hot sampler metrics (CPU,
+memory, network and disk counters) go through the /proc fast path instead.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+from system_monitor.backends.base import MetricsBackend, sdiskio, snetio, svmem
+from system_monitor.collectors import procfs
+
+
+class PsutilBackend(MetricsBackend):
+    """Measurements of the local host."""
+
+    name = "psutil"
+
+    def __init__(self, fast_path: Optional[procfs.ProcfsCollector] = None):
+        self.fast = fast_path if fast_path is not None else procfs.create()
+
+    def supports(self, feature: str) -> bool:
+        return hasattr(psutil, feature)
+
+    def cpu_count(self, logical: bool = True) -> Optional[int]:
+        return psutil.cpu_count(logical=logical)
+
+    def cpu_percent(self) -> Tuple[float, List[float]]:
+        if self.fast is not None:
+            return self.fast.cpu_percent()
+        return psutil.cpu_percent(interval=None), psutil.cpu_percent(interval=None, percpu=True)
+
+    def getloadavg(self) -> Optional[Tuple[float, float, float]]:
+        try:
+            return psutil.getloadavg()
+        except (AttributeError, OSError):
+            # getloadavg() not available on Windows
+            return None
+
+    def virtual_memory(self) -> svmem:
+        if self.fast is not None:
+            return self.fast.virtual_memory()
+        return psutil.virtual_memory()
+
+    def net_io_counters(self) -> Dict[str, snetio]:
+        if self.fast is not None:
+            return self.fast.net_io_counters()
+        return psutil.net_io_counters(pernic=True)
+
+    def net_if_addrs(self):
+        return psutil.net_if_addrs()
+
+    def net_if_stats(self):
+        return psutil.net_if_stats()
+
+    def net_connections(self):
+        return psutil.net_connections(kind="inet")
+
+    def disk_partitions(self):
+        return psutil.disk_partitions(all=False)
+
+    def disk_usage(self, mountpoint: str):
+        return psutil.disk_usage(mountpoint)
+
+    def disk_io_counters(self) -> Dict[str, sdiskio]:
+        if self.fast is not None:
+            return self.fast.disk_io_counters()
+        return psutil.disk_io_counters(perdisk=True) or {}
+
+    def pids(self) -> List[int]:
+        return psutil.pids()
+
+    def process(self, pid: int) -> psutil.Process:
+        return psutil.Process(pid)
+
+    def sensors_temperatures(self):
+        return psutil.sensors_temperatures()
+
+    def sensors_fans(self):
+        return psutil.sensors_fans()
+
+    def sensors_battery(self):
+        return psutil.sensors_battery()
+
+    def boot_time(self) -> float:
+        return psutil.boot_time()
+
+    def users(self):
+        return psutil.users()
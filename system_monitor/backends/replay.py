@@ -0,0 +1,302 @@
+"""
+Replay metrics backend
+
+Plays back snapshots recorded from another backend, one recorded frame per
+sampler tick, so a real host (or a generated one) can be reproduced exactly.
+Recordings are JSON lines holding the output of every backend method.
+
+Record 60 one-second frames of this host:
+    python -m system_monitor.backends.replay --output host.jsonl --samples 60
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import psutil
+
+import system_monitor.config as config
+from system_monitor.backends.base import (
+    MetricsBackend, pio, pmem, sbattery, sconn, sdiskio, sdiskpart, sdiskusage, sfan, shwtemp, snetio, snicaddr,
+    snicstats, suser, svmem,
+)
+
+# psutil.Process attributes stored for every recorded process
+PROCESS_ATTRS = ["pid", "name", "username", "status", "cpu_percent", "memory_percent", "memory_info",
+                 "create_time", "exe", "cmdline", "io_counters", "num_threads"]
+
+
+def capture_processes(source: MetricsBackend, handles: Dict[int, object]) -> Dict[int, dict]:
+    """
+    Record PROCESS_ATTRS of every process.
+
+    Process handles are kept in ``handles`` between frames, like the process
+    registry does, so cpu_percent measures the time since the previous frame
+    instead of always reading 0.0 on a new handle.
+
+    Args:
+        source: Backend to record
+        handles: Process handles of the previous frame, updated in place
+
+    Returns:
+        PID -> recorded attributes
+    """
+    pids = source.pids()
+    for pid in handles.keys() - set(pids):
+        del handles[pid]
+    processes = {}
+    for pid in pids:
+        try:
+            handle = handles.get(pid)
+            if handle is None or not handle.is_running():
+                handle = handles[pid] = source.process(pid)
+            processes[pid] = handle.as_dict(attrs=PROCESS_ATTRS, ad_value=None)
+        except psutil.NoSuchProcess:
+            handles.pop(pid, None)
+    return processes
+
+
+def capture(source: MetricsBackend, handles: Optional[Dict[int, object]] = None) -> dict:
+    """
+    Record the output of every method of a backend.
+
+    Args:
+        source: Backend to record, already advanced to the sample to capture
+        handles: Process handles kept across frames (see capture_processes)
+
+    Returns:
+        JSON-serializable frame
+    """
+    processes = capture_processes(source, {} if handles is None else handles)
+    try:
+        connections = source.net_connections()
+    except psutil.AccessDenied:
+        connections = []
+    partitions = source.disk_partitions()
+    usages = {}
+    for partition in partitions:
+        try:
+            usages[partition.mountpoint] = source.disk_usage(partition.mountpoint)
+        except OSError:
+            continue
+
+    def optional(feature):
+        return getattr(source, feature)() if source.supports(feature) else None
+
+    return {
+        "cpu_count": source.cpu_count(),
+        "cpu_count_physical": source.cpu_count(logical=False),
+        "cpu_percent": source.cpu_percent(),
+        "loadavg": source.getloadavg(),
+        "virtual_memory": source.virtual_memory(),
+        "net_io_counters": source.net_io_counters(),
+        "net_if_addrs": source.net_if_addrs(),
+        "net_if_stats": source.net_if_stats(),
+        "net_connections": [[conn.fd, conn.family, conn.type, conn.laddr, conn.raddr, conn.status, conn.pid]
+                            for conn in connections],
+        "disk_partitions": partitions,
+        "disk_usage": usages,
+        "disk_io_counters": source.disk_io_counters(),
+        "processes": processes,
+        "sensors_temperatures": optional("sensors_temperatures"),
+        "sensors_fans": optional("sensors_fans"),
+        "sensors_battery": optional("sensors_battery"),
+        "boot_time": source.boot_time(),
+        "users": source.users(),
+    }
+
+
+def record(source: MetricsBackend, path: str, samples: int, interval: float = 1.0,
+           progress: Optional[Callable[[int, int], None]] = None):
+    """
+    Record frames from a backend into a JSON lines file.
+
+    Args:
+        source: Backend to record
+        path: Output file
+        samples: Number of frames
+        interval: Seconds between frames
+        progress: Called with the number of recorded frames and the total after each frame
+    """
+    # Establish the CPU baselines of the host and of every process
+    source.cpu_percent()
+    handles: Dict[int, object] = {}
+    capture_processes(source, handles)
+    with open(path, "w") as output:
+        for index in range(samples):
+            time.sleep(interval)
+            source.tick()
+            output.write(json.dumps(capture(source, handles), separators=(",", ":")))
+            output.write("\n")
+            if progress is not None:
+                progress(index + 1, samples)
+
+
+class ReplayProcess:
+    """A recorded process with the subset of the psutil.Process API the collectors use."""
+
+    def __init__(self, pid: int, info: dict):
+        self.pid = pid
+        self.info = info
+        self.running = True
+
+    def as_dict(self, attrs: Optional[List[str]] = None, ad_value=None) -> dict:
+        info = self.info
+        values = dict(info)
+        if info.get("memory_info") is not None:
+            values["memory_info"] = pmem(*info["memory_info"][:2])
+        if info.get("io_counters") is not None:
+            values["io_counters"] = pio(*info["io_counters"][:4])
+        if attrs is None:
+            return values
+        return {attr: ad_value if values.get(attr) is None else values[attr] for attr in attrs}
+
+    def is_running(self) -> bool:
+        return self.running
+
+
+class ReplayBackend(MetricsBackend):
+    """
+    Backend that returns recorded frames.
+
+    The first ``tick()`` selects the first frame. With ``loop`` enabled
+    playback restarts after the last frame, otherwise the last frame repeats.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: Optional[str] = None, loop: Optional[bool] = None):
+        if path is None:
+            path = config.get("replay", "path", "")
+        if loop is None:
+            loop = config.get("replay", "loop", "true").lower() == "true"
+        if not path:
+            raise ValueError("The replay backend needs a recording, set [replay] path")
+        with open(path) as recording:
+            self.frames = [json.loads(line) for line in recording if line.strip()]
+        if not self.frames:
+            raise ValueError(f"Recording {path} has no frames")
+        self.loop = loop
+        self.index = 0
+        self._started = False
+        self._processes: Dict[int, ReplayProcess] = {}
+        self._load_processes()
+
+    @property
+    def frame(self) -> dict:
+        return self.frames[self.index]
+
+    def _load_processes(self):
+        # Handles of processes still in the frame are updated in place, like a
+        # live psutil.Process, so holders such as the process registry see new values
+        processes = {}
+        for pid, info in self.frame["processes"].items():
+            process = self._processes.pop(int(pid), None)
+            if process is None:
+                process = ReplayProcess(int(pid), info)
+            process.info = info
+            processes[int(pid)] = process
+        for process in self._processes.values():
+            process.running = False
+        self._processes = processes
+
+    def tick(self):
+        if not self._started:
+            self._started = True
+        elif self.index + 1 < len(self.frames):
+            self.index += 1
+        elif self.loop:
+            self.index = 0
+        else:
+            return
+        self._load_processes()
+
+    def supports(self, feature: str) -> bool:
+        return feature == "sensors_battery" or self.frame.get(feature) is not None
+
+    def cpu_count(self, logical: bool = True) -> Optional[int]:
+        return self.frame["cpu_count"] if logical else self.frame["cpu_count_physical"]
+
+    def cpu_percent(self) -> Tuple[float, List[float]]:
+        total, per_cpu = self.frame["cpu_percent"]
+        return total, per_cpu
+
+    def getloadavg(self) -> Optional[Tuple[float, float, float]]:
+        loadavg = self.frame["loadavg"]
+        return tuple(loadavg) if loadavg is not None else None
+
+    def virtual_memory(self) -> svmem:
+        return svmem(*self.frame["virtual_memory"])
+
+    def net_io_counters(self) -> Dict[str, snetio]:
+        return {nic: snetio(*values) for nic, values in self.frame["net_io_counters"].items()}
+
+    def net_if_addrs(self) -> Dict[str, List[snicaddr]]:
+        return {nic: [snicaddr(*address) for address in addresses]
+                for nic, addresses in self.frame["net_if_addrs"].items()}
+
+    def net_if_stats(self) -> Dict[str, snicstats]:
+        return {nic: snicstats(*values) for nic, values in self.frame["net_if_stats"].items()}
+
+    def net_connections(self) -> List[sconn]:
+        return [sconn(fd, family, kind, tuple(laddr), tuple(raddr), status, pid)
+                for fd, family, kind, laddr, raddr, status, pid in self.frame["net_connections"]]
+
+    def disk_partitions(self) -> List[sdiskpart]:
+        return [sdiskpart(*values[:4]) for values in self.frame["disk_partitions"]]
+
+    def disk_usage(self, mountpoint: str) -> sdiskusage:
+        values = self.frame["disk_usage"].get(mountpoint)
+        if values is None:
+            raise FileNotFoundError(mountpoint)
+        return sdiskusage(*values)
+
+    def disk_io_counters(self) -> Dict[str, sdiskio]:
+        return {disk: sdiskio(*values) for disk, values in self.frame["disk_io_counters"].items()}
+
+    def pids(self) -> List[int]:
+        return list(self._processes)
+
+    def process(self, pid: int) -> ReplayProcess:
+        process = self._processes.get(pid)
+        if process is None:
+            raise psutil.NoSuchProcess(pid)
+        return process
+
+    def sensors_temperatures(self) -> Dict[str, List[shwtemp]]:
+        return {name: [shwtemp(*entry) for entry in entries]
+                for name, entries in (self.frame["sensors_temperatures"] or {}).items()}
+
+    def sensors_fans(self) -> Dict[str, List[sfan]]:
+        return {name: [sfan(*entry) for entry in entries] for name, entries in (self.frame["sensors_fans"] or {}).items()}
+
+    def sensors_battery(self) -> Optional[sbattery]:
+        battery = self.frame["sensors_battery"]
+        return sbattery(*battery) if battery else None
+
+    def boot_time(self) -> float:
+        return self.frame["boot_time"]
+
+    def users(self) -> List[suser]:
+        return [suser(*values) for values in self.frame["users"]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", required=True, help="Recording file to write (JSON lines)")
+    parser.add_argument("--samples", type=int, default=60, help="Number of frames to record")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between frames")
+    parser.add_argument("--backend", default="psutil", help="Backend to record: psutil or synthetic")
+    args = parser.parse_args()
+
+    def progress(recorded: int, total: int):
+        print(f"Recorded frame {recorded}/{total}", file=sys.stderr)
+
+    from system_monitor.backends import create
+    record(create(args.backend), args.output, args.samples, args.interval, progress)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Synthetic metrics backend
+
+Generates a host of a configurable shape (processes, cores, NICs,
+partitions, sockets) so the routers can be exercised at production scale on
+any machine. Every value is a pure function of the seed, the sample number
+and the entity it belongs to, so two runs with the same configuration
+produce identical metrics.
+"""
+
+import socket
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+import system_monitor.config as config
+from system_monitor.backends.base import (
+    MetricsBackend, pio, pmem, sconn, sdiskio, sdiskpart, sdiskusage, sfan, shwtemp, snetio, snicaddr,
+    snicstats, suser, svmem,
+)
+
+BOOT_TIME = 1700000000.0
+
+PROCESS_NAMES = ("nginx", "postgres", "python", "java", "node", "sshd", "redis-server", "systemd",
+                 "kworker", "containerd", "dockerd", "envoy", "gunicorn", "celery", "bash")
+
+SOCKET_STATES = ("ESTABLISHED",) * 6 + ("LISTEN", "TIME_WAIT", "TIME_WAIT", "CLOSE_WAIT")
+
+
+def _noise(*keys: int) -> float:
+    """Deterministic pseudo-random value in [0, 1) derived from integer keys."""
+    value = 0x811C9DC5
+    for key in keys:
+        value = ((value ^ (key & 0xFFFFFFFF)) * 0x01000193) & 0xFFFFFFFF
+    value ^= value >> 16
+    value = (value * 0x7FEB352D) & 0xFFFFFFFF
+    value ^= value >> 15
+    value = (value * 0x846CA68B) & 0xFFFFFFFF
+    value ^= value >> 16
+    return value / 0x100000000
+
+
+def _disk_name(index: int) -> str:
+    """sda, sdb, ..., sdz, sdaa, sdab, ... like the kernel names SCSI disks."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("a") + remainder) + letters
+    return f"sd{letters}"
+
+
+class SyntheticProcess:
+    """A generated process with the subset of the psutil.Process API the collectors use."""
+
+    def __init__(self, host: "SyntheticBackend", pid: int):
+        self.host = host
+        self.pid = pid
+
+    def as_dict(self, attrs: Optional[List[str]] = None, ad_value=None) -> dict:
+        host, pid, step, seed = self.host, self.pid, self.host.step, self.host.seed
+        name = PROCESS_NAMES[pid % len(PROCESS_NAMES)]
+        roll = _noise(seed, pid, 1)
+        rss = int(2 ** 20 * (4 + 4000 * _noise(seed, pid, 2) ** 3))
+        values = {
+            "pid": pid,
+            "name": name,
+            "username": f"user{pid % host.user_count}" if pid % 3 else "root",
+            "status": "zombie" if roll < 0.002 else "running" if roll < 0.05 else "sleeping",
+            # Heavy-tailed: most processes idle, a few busy
+            "cpu_percent": round(100 * _noise(seed, pid, step, 3) ** 6, 1),
+            "memory_percent": rss / host.memory_total * 100,
+            "memory_info": pmem(rss, rss * 3),
+            "create_time": BOOT_TIME + pid,
+            "exe": f"/usr/bin/{name}",
+            "cmdline": [f"/usr/bin/{name}", "--worker", str(pid % 16), f"--config=/etc/{name}/{pid % 5}.conf"],
+            "io_counters": pio(step * 10 + pid, step * 5 + pid, (step + 1) * 4096 * (pid % 97),
+                               (step + 1) * 4096 * (pid % 89)),
+            "num_threads": 1 + int(64 * _noise(seed, pid, 4) ** 4),
+        }
+        if attrs is None:
+            return values
+        return {attr: values.get(attr, ad_value) for attr in attrs}
+
+    def is_running(self) -> bool:
+        # Synthetic PIDs are never reused
+        return self.pid in self.host._pid_set
+
+
+class SyntheticBackend(MetricsBackend):
+    """
+    Deterministic generated host.
+
+    The shape is read from the [synthetic] section unless given explicitly.
+    Each ``tick()`` advances the sample number: counters grow, utilization
+    changes and ``churn`` of the processes exit and are replaced by new PIDs.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, processes: Optional[int] = None, cores: Optional[int] = None, nics: Optional[int] = None,
+                 partitions: Optional[int] = None, sockets: Optional[int] = None, memory_gb: Optional[float] = None,
+                 users: Optional[int] = None, churn: Optional[float] = None, seed: Optional[int] = None):
+        def setting(value, key, default, kind=int):
+            return value if value is not None else kind(config.get("synthetic", key, default))
+
+        self.processes = setting(processes, "processes", "500")
+        self.cores = setting(cores, "cores", "8")
+        self.nics = setting(nics, "nics", "2")
+        self.partitions = setting(partitions, "partitions", "4")
+        self.sockets = setting(sockets, "sockets", "200")
+        self.memory_total = int(setting(memory_gb, "memory_gb", "16", float) * 2 ** 30)
+        self.user_count = max(1, setting(users, "users", "5"))
+        self.churn = setting(churn, "churn", "0.01", float)
+        self.seed = setting(seed, "seed", "1")
+
+        self.step = 0
+        self._pids = [100 + index * 3 for index in range(self.processes)]
+        self._next_pid = 100 + self.processes * 3
+        self._pid_set = set(self._pids)
+        self._net = [[0] * 8 for _ in range(self.nics)]
+        self._disk = [[0] * 9 for _ in range(self.partitions)]
+        self._mounts = {("/" if index == 0 else f"/data/{index:03d}"): index for index in range(self.partitions)}
+
+    def tick(self):
+        self.step += 1
+        step, seed = self.step, self.seed
+
+        # Replace a deterministic slice of the process table with new PIDs
+        for offset in range(int(self.processes * self.churn)):
+            index = (step * 7919 + offset * 104729) % self.processes
+            self._pid_set.discard(self._pids[index])
+            self._pids[index] = self._next_pid
+            self._pid_set.add(self._next_pid)
+            self._next_pid += 1
+
+        for nic, counters in enumerate(self._net):
+            load = _noise(seed, step, nic, 10)
+            sent, received = int(125e6 * load), int(125e6 * _noise(seed, step, nic, 11))
+            for index, increase in enumerate((sent, received, sent // 1200, received // 1200,
+                                              int(load > 0.99), 0, int(load > 0.98), 0)):
+                counters[index] += increase
+
+        for disk, counters in enumerate(self._disk):
+            reads, writes = int(500 * _noise(seed, step, disk, 20)), int(300 * _noise(seed, step, disk, 21))
+            for index, increase in enumerate((reads, writes, reads * 8192, writes * 16384, reads // 2,
+                                              writes, reads // 4, writes // 4, min(1000, (reads + writes) * 2))):
+                counters[index] += increase
+
+    def cpu_count(self, logical: bool = True) -> int:
+        return self.cores if logical else max(1, self.cores // 2)
+
+    def cpu_percent(self) -> Tuple[float, List[float]]:
+        per_cpu = [round(100 * _noise(self.seed, self.step, core, 30) ** 2, 1) for core in range(self.cores)]
+        return round(sum(per_cpu) / len(per_cpu), 1), per_cpu
+
+    def getloadavg(self) -> Tuple[float, float, float]:
+        return tuple(round(self.cores * _noise(self.seed, self.step // period, period, 31), 2)
+                     for period in (1, 5, 15))
+
+    def virtual_memory(self) -> svmem:
+        total = self.memory_total
+        used = int(total * (0.3 + 0.5 * _noise(self.seed, self.step // 10, 40)))
+        available = total - used
+        cached = available // 2
+        return svmem(total, available, round(used / total * 100, 1), used, available - cached,
+                     used // 2, cached, total // 100, cached, total // 200, total // 50)
+
+    def net_io_counters(self) -> Dict[str, snetio]:
+        return {f"eth{nic}": snetio(*counters) for nic, counters in enumerate(self._net)}
+
+    def net_if_addrs(self) -> Dict[str, List[snicaddr]]:
+        return {f"eth{nic}": [snicaddr(socket.AF_INET, f"10.{nic}.0.1", "255.255.0.0", f"10.{nic}.255.255", None)]
+                for nic in range(self.nics)}
+
+    def net_if_stats(self) -> Dict[str, snicstats]:
+        return {f"eth{nic}": snicstats(True, psutil.NIC_DUPLEX_FULL, 10000, 1500, "up,broadcast,running,multicast")
+                for nic in range(self.nics)}
+
+    def net_connections(self) -> List[sconn]:
+        pids, seed, step = self._pids, self.seed, self.step
+        connections = []
+        for index in range(self.sockets):
+            state = SOCKET_STATES[int(_noise(seed, step, index, 50) * len(SOCKET_STATES))]
+            pid = pids[int(_noise(seed, index, 51) * len(pids))] if pids else None
+            connections.append(sconn(-1, socket.AF_INET, socket.SOCK_STREAM, ("10.0.0.1", 1024 + index),
+                                     () if state == "LISTEN" else ("10.1.0.1", 443), state, pid))
+        return connections
+
+    def disk_partitions(self) -> List[sdiskpart]:
+        return [sdiskpart(f"/dev/{_disk_name(index)}1", mountpoint, "xfs" if index % 2 else "ext4", "rw,relatime")
+                for mountpoint, index in self._mounts.items()]
+
+    def disk_usage(self, mountpoint: str) -> sdiskusage:
+        index = self._mounts.get(mountpoint)
+        if index is None:
+            raise FileNotFoundError(mountpoint)
+        total = int(2 ** 30 * (100 + 3900 * _noise(self.seed, index, 60)))
+        used = int(total * min(0.99, _noise(self.seed, index, 61) + self.step * 1e-6))
+        return sdiskusage(total, used, total - used, round(used / total * 100, 1))
+
+    def disk_io_counters(self) -> Dict[str, sdiskio]:
+        return {_disk_name(disk): sdiskio(*counters) for disk, counters in enumerate(self._disk)}
+
+    def pids(self) -> List[int]:
+        return list(self._pids)
+
+    def process(self, pid: int) -> SyntheticProcess:
+        if pid not in self._pid_set:
+            raise psutil.NoSuchProcess(pid)
+        return SyntheticProcess(self, pid)
+
+    def sensors_temperatures(self) -> Dict[str, List[shwtemp]]:
+        return {"coretemp": [shwtemp(f"Core {core}", round(35 + 50 * _noise(self.seed, self.step, core, 70), 1),
+                                     85.0, 100.0) for core in range(self.cores)]}
+
+    def sensors_fans(self) -> Dict[str, List[sfan]]:
+        return {"chassis": [sfan(f"fan{index}", 1200 + int(800 * _noise(self.seed, self.step, index, 71)))
+                            for index in range(4)]}
+
+    def sensors_battery(self) -> None:
+        return None
+
+    def boot_time(self) -> float:
+        return BOOT_TIME
+
+    def users(self) -> List[suser]:
+        return [suser(f"user{index}", f"pts/{index}", f"10.2.0.{index}", BOOT_TIME + 3600 * index, 2000 + index)
+                for index in range(min(self.user_count, 10))]
@@ -0,0 +1 @@
+"""Stateful metric collectors shared by the routers"""
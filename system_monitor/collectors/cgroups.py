@@ -0,0 +1,241 @@
+"""
+cgroup v2 collector
+
+Reads CPU, memory, I/O and PID accounting of the monitor's own cgroup, and
+optionally of every cgroup below it, straight from the cgroup v2 interface
+files. The kernel keeps these totals per container, so reading a handful of
+small files replaces summing per-process psutil data. CPU and I/O rates are
+computed from the counter increase since the previous read of a cgroup.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import system_monitor.config as config
+
+DEFAULT_ROOTS = ("/sys/fs/cgroup", "/sys/fs/cgroup/unified")
+
+CPU_FIELDS = ("usage_usec", "user_usec", "system_usec", "nr_periods", "nr_throttled", "throttled_usec")
+
+# io.stat keys -> response names
+IO_FIELDS = (("rbytes", "read_bytes"), ("wbytes", "write_bytes"), ("rios", "read_ios"), ("wios", "write_ios"))
+
+
+def find_root() -> Optional[str]:
+    """The cgroup v2 mount point, also under the hybrid layout, or None on cgroup v1 only hosts."""
+    for root in DEFAULT_ROOTS:
+        if os.path.exists(os.path.join(root, "cgroup.controllers")):
+            return root
+    return None
+
+
+def own_cgroup(proc_file: str = "/proc/self/cgroup") -> str:
+    """Path of the calling process' cgroup v2 relative to the mount point, from its ``0::`` entry."""
+    try:
+        with open(proc_file) as f:
+            for line in f:
+                if line.startswith("0::"):
+                    return line[3:].strip() or "/"
+    except OSError:
+        pass
+    return "/"
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path) as f:
+            return f.read()
+    except OSError:
+        # Controller not enabled for this cgroup, or the cgroup was just removed
+        return None
+
+
+def _read_int(path: str) -> Optional[int]:
+    """Single-value file; "max" (no limit) and missing files are None."""
+    text = _read(path)
+    if text is None or text.strip() == "max":
+        return None
+    return int(text)
+
+
+def _read_flat(path: str) -> Optional[Dict[str, int]]:
+    """Flat keyed file such as cpu.stat or memory.stat."""
+    text = _read(path)
+    if text is None:
+        return None
+    values = {}
+    for line in text.splitlines():
+        key, _, value = line.partition(" ")
+        if value:
+            values[key] = int(value)
+    return values
+
+
+def _read_io(path: str) -> Optional[Dict[str, Dict[str, int]]]:
+    """Nested keyed io.stat: ``MAJ:MIN rbytes=.. wbytes=.. rios=.. wios=.. ...`` per device."""
+    text = _read(path)
+    if text is None:
+        return None
+    devices = {}
+    for line in text.splitlines():
+        device, *pairs = line.split()
+        devices[device] = {key: int(value) for key, _, value in (pair.partition("=") for pair in pairs)}
+    return devices
+
+
+def _cpu_limit(path: str) -> Optional[float]:
+    """CPU limit in CPUs from cpu.max (``quota period``), None when unlimited."""
+    text = _read(path)
+    if text is None:
+        return None
+    quota, _, period = text.strip().partition(" ")
+    if quota == "max" or not period:
+        return None
+    return int(quota) / int(period)
+
+
+class CgroupCollector:
+    """
+    Per-cgroup resource accounting.
+
+    Each cgroup is read at most once per ``refresh_interval``; the CPU and
+    I/O rates of a read are relative to the previous read of the same
+    cgroup and are null on its first read. Cgroups that disappear are
+    forgotten.
+    """
+
+    def __init__(self, root: Optional[str] = None, children: Optional[bool] = None,
+                 max_depth: Optional[int] = None, refresh_interval: Optional[float] = None):
+        if root is None:
+            root = config.get("cgroups", "root", "") or find_root()
+        if children is None:
+            children = config.get("cgroups", "children", "false").lower() == "true"
+        if max_depth is None:
+            max_depth = int(config.get("cgroups", "max_depth", "3"))
+        if refresh_interval is None:
+            refresh_interval = float(config.get("sampler", "interval", "1.0"))
+        self.root = root
+        self.children = children
+        self.max_depth = max_depth
+        self.refresh_interval = refresh_interval
+        self.cgroup = own_cgroup()
+        # cgroup path -> (monotonic time, cpu usage_usec, io totals, entry)
+        self._reads: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        return self.root is not None and os.path.exists(os.path.join(self.root, "cgroup.controllers"))
+
+    def paths(self, children: Optional[bool] = None) -> List[str]:
+        """The own cgroup followed by its descendants, if requested, down to ``max_depth`` levels."""
+        own = self.cgroup
+        if not (self.children if children is None else children):
+            return [own]
+        top = os.path.join(self.root, own.lstrip("/"))
+        paths = []
+        for directory, subdirectories, _ in os.walk(top):
+            relative = os.path.relpath(directory, top)
+            depth = 0 if relative == "." else relative.count(os.sep) + 1
+            if depth >= self.max_depth:
+                subdirectories.clear()
+            paths.append(own if depth == 0 else os.path.join(own, relative))
+        return paths
+
+    def read(self, cgroup: str) -> Optional[dict]:
+        """
+        Read one cgroup, reusing the last read if it is recent enough.
+
+        This performs blocking file reads and is meant to run in a worker thread.
+
+        Args:
+            cgroup: Path relative to the cgroup mount point, e.g. /kubepods/pod1/container
+
+        Returns:
+            The cgroup's accounting, or None if it no longer exists
+        """
+        directory = os.path.join(self.root, cgroup.lstrip("/"))
+        now = time.monotonic()
+        previous = self._reads.get(cgroup)
+        if previous is not None and now - previous[0] < self.refresh_interval:
+            return previous[3]
+        if not os.path.isdir(directory):
+            return None
+
+        cpu_stat = _read_flat(os.path.join(directory, "cpu.stat")) or {}
+        memory_stat = _read_flat(os.path.join(directory, "memory.stat"))
+        io_stat = _read_io(os.path.join(directory, "io.stat"))
+        procs = _read(os.path.join(directory, "cgroup.procs"))
+
+        usage = cpu_stat.get("usage_usec")
+        limit = _cpu_limit(os.path.join(directory, "cpu.max"))
+        cpu = {field: cpu_stat.get(field) for field in CPU_FIELDS}
+        cpu["limit_cpus"] = limit
+        cpu["usage_percent"] = None
+        cpu["limit_percent"] = None
+
+        io_totals = None
+        io = None
+        if io_stat is not None:
+            io_totals = {name: sum(values.get(key, 0) for values in io_stat.values()) for key, name in IO_FIELDS}
+            io = dict(io_totals)
+            io["read_bytes_per_second"] = None
+            io["write_bytes_per_second"] = None
+            io["devices"] = {device: {name: values.get(key, 0) for key, name in IO_FIELDS}
+                             for device, values in io_stat.items()}
+
+        elapsed = now - previous[0] if previous is not None else 0.0
+        if elapsed > 0:
+            if usage is not None and previous[1] is not None:
+                # usage_usec over wall microseconds; 100% is one fully busy CPU
+                cpu["usage_percent"] = max(0, usage - previous[1]) / (elapsed * 1e6) * 100
+                if limit:
+                    cpu["limit_percent"] = cpu["usage_percent"] / limit
+            if io_totals is not None and previous[2] is not None:
+                io["read_bytes_per_second"] = max(0, io_totals["read_bytes"] - previous[2]["read_bytes"]) / elapsed
+                io["write_bytes_per_second"] = max(0, io_totals["write_bytes"] - previous[2]["write_bytes"]) / elapsed
+
+        current = _read_int(os.path.join(directory, "memory.current"))
+        maximum = _read_int(os.path.join(directory, "memory.max"))
+        entry = {
+            "path": cgroup,
+            "cpu": cpu,
+            "memory": {
+                "current": current,
+                "max": maximum,
+                "percent": current / maximum * 100 if current is not None and maximum else None,
+                "stat": memory_stat,
+            },
+            "io": io,
+            "pids": [int(pid) for pid in procs.split()] if procs is not None else [],
+        }
+        self._reads[cgroup] = (now, usage, io_totals, entry)
+        return entry
+
+    def refresh(self, children: Optional[bool] = None) -> List[dict]:
+        """
+        Read the own cgroup and, if enabled, its descendants.
+
+        This performs blocking file reads and is meant to run in a worker thread.
+
+        Args:
+            children: Include descendant cgroups; ``[cgroups] children`` if omitted
+
+        Returns:
+            One accounting dictionary per cgroup, the own cgroup first
+        """
+        with self._lock:
+            entries = []
+            for cgroup in self.paths(children):
+                entry = self.read(cgroup)
+                if entry is not None:
+                    entries.append(entry)
+            # Forget cgroups that were removed
+            for cgroup in [cgroup for cgroup in self._reads if not os.path.isdir(
+                    os.path.join(self.root, cgroup.lstrip("/")))]:
+                del self._reads[cgroup]
+            return entries
+
+
+cgroup_collector = CgroupCollector()
@@ -0,0 +1,205 @@
+"""
+Disk collector
+
+Caches the mounted partition list and only rebuilds it when the mount table
+changes, reads partition usage with a timeout for network filesystems, and
+turns consecutive ``disk_io_counters(perdisk=True)`` samples into
+per-device throughput, IOPS, utilization and latency.
+"""
+
+import os
+import select
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Dict, List, Optional, Set, Tuple
+
+import system_monitor.config as config
+from system_monitor.backends import backend as default_backend
+from system_monitor.backends.base import MetricsBackend
+
+MOUNTINFO = "/proc/self/mountinfo"
+
+# Filesystems whose statfs() may block on an unreachable server
+NETWORK_FSTYPES = {
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "ncpfs", "afs", "9p", "ceph", "glusterfs",
+    "fuse.sshfs", "fuse.glusterfs", "fuse.s3fs", "fuse.rclone", "lustre", "gpfs",
+}
+
+
+class DiskCollector:
+    """
+    Partition discovery and usage with a cached mount table.
+
+    On Linux the kernel flags /proc/self/mountinfo with POLLPRI whenever a
+    filesystem is mounted or unmounted, so the partition list is only rebuilt
+    after a change. Elsewhere it is rebuilt every ``refresh_interval``
+    seconds.
+
+    Usage of network filesystems is read on a separate small pool and
+    abandoned after ``network_timeout`` seconds. A mount whose previous call
+    is still hung is skipped until that call returns, so a dead server costs
+    at most one blocked thread.
+    """
+
+    def __init__(self, refresh_interval: Optional[float] = None, network_timeout: Optional[float] = None,
+                 skip_network: Optional[bool] = None, backend: Optional[MetricsBackend] = None):
+        self.backend = backend or default_backend
+        if refresh_interval is None:
+            refresh_interval = float(config.get("disk", "partitions_refresh", "60"))
+        if network_timeout is None:
+            network_timeout = float(config.get("disk", "network_timeout", "0.5"))
+        if skip_network is None:
+            skip_network = config.get("disk", "skip_network", "false").lower() == "true"
+        self.refresh_interval = refresh_interval
+        self.network_timeout = network_timeout
+        self.skip_network = skip_network
+        self._partitions: Optional[list] = None
+        self._refreshed = 0.0
+        self._lock = threading.Lock()
+        self._poll: Optional[select.poll] = None
+        self._mountinfo = None
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="disk-usage")
+        self._pending: Dict[str, Future] = {}
+        # Mounts whose last usage read failed, reported once until they recover
+        self._failing: Set[str] = set()
+        self._open_mountinfo()
+
+    def _open_mountinfo(self):
+        """Watch /proc/self/mountinfo for mount table changes where supported."""
+        if not hasattr(select, "poll") or not os.path.exists(MOUNTINFO):
+            return
+        try:
+            self._mountinfo = open(MOUNTINFO, "rb")
+            self._poll = select.poll()
+            self._poll.register(self._mountinfo.fileno(), select.POLLPRI | select.POLLERR)
+        except OSError:
+            self._mountinfo = self._poll = None
+
+    def _mounts_changed(self) -> bool:
+        """Check (and acknowledge) a mount table change since the last call."""
+        if self._poll is None:
+            return time.monotonic() - self._refreshed >= self.refresh_interval
+        if not self._poll.poll(0):
+            return False
+        # Reading the file to the end re-arms the notification
+        self._mountinfo.seek(0)
+        self._mountinfo.read()
+        return True
+
+    def partitions(self) -> list:
+        """
+        Mounted physical partitions, as returned by disk_partitions(all=False).
+
+        Returns:
+            The cached partition list, rebuilt if the mount table changed
+        """
+        with self._lock:
+            if self._mounts_changed() or self._partitions is None:
+                self._partitions = self.backend.disk_partitions()
+                self._refreshed = time.monotonic()
+            return self._partitions
+
+    def _network_usage(self, mountpoint: str):
+        """Read the usage of a network mount with a timeout; None if it is hung."""
+        pending = self._pending.get(mountpoint)
+        if pending is not None:
+            if not pending.done():
+                return None  # previous call still blocked
+            del self._pending[mountpoint]
+        future = self._pool.submit(self.backend.disk_usage, mountpoint)
+        try:
+            return future.result(timeout=self.network_timeout)
+        except TimeoutError:
+            self._pending[mountpoint] = future
+            print(f"Disk usage of {mountpoint} timed out after {self.network_timeout:g}s, skipping it")
+            return None
+
+    def usages(self) -> List[Tuple[object, object]]:
+        """
+        Read the usage of every cached partition.
+
+        This performs blocking backend calls and is meant to run in a worker thread.
+
+        Returns:
+            List of (partition, usage) tuples; restricted, vanished, failing
+            (e.g. stale NFS handles), skipped and hung mounts are left out
+        """
+        result = []
+        for partition in self.partitions():
+            try:
+                if partition.fstype in NETWORK_FSTYPES:
+                    if self.skip_network:
+                        continue
+                    usage = self._network_usage(partition.mountpoint)
+                    if usage is None:
+                        continue
+                else:
+                    usage = self.backend.disk_usage(partition.mountpoint)
+            except (PermissionError, FileNotFoundError):
+                continue  # skip restricted partitions and mounts removed since discovery
+            except OSError as e:
+                # One broken mount (ESTALE, EIO, ...) must not fail the whole sample
+                if partition.mountpoint not in self._failing:
+                    self._failing.add(partition.mountpoint)
+                    print(f"Cannot read disk usage of {partition.mountpoint}, skipping it: {e}")
+                continue
+            self._failing.discard(partition.mountpoint)
+            result.append((partition, usage))
+        return result
+
+
+class DiskIORates:
+    """
+    Per-device I/O activity between the two latest sampler snapshots.
+
+    For every device the latest rates are:
+        - read_bytes / write_bytes: Bytes per second
+        - read_iops / write_iops: Completed operations per second
+        - utilization: Percentage of time the device was busy (Linux, FreeBSD)
+        - await_ms: Average time per completed operation in milliseconds
+    """
+
+    def __init__(self):
+        self._previous: Optional[dict] = None
+        self.rates: Dict[str, dict] = {}
+
+    def record(self, snapshot: dict):
+        """
+        Compute rates from a sampler snapshot and the one before it.
+
+        Args:
+            snapshot: Snapshot produced by the background sampler
+        """
+        previous = self._previous
+        self._previous = snapshot
+        if previous is None:
+            return
+        elapsed = snapshot["sampled_at"] - previous["sampled_at"]
+        if elapsed <= 0:
+            return
+
+        before = previous["disk_io"]
+        rates = {}
+        for disk, io in snapshot["disk_io"].items():
+            last = before.get(disk)
+            if last is None or io.read_count < last.read_count or io.write_count < last.write_count:
+                continue  # new device, or counters reset
+            reads = io.read_count - last.read_count
+            writes = io.write_count - last.write_count
+            io_time = (io.read_time - last.read_time) + (io.write_time - last.write_time)
+            busy_time = getattr(io, "busy_time", None)
+            rates[disk] = {
+                "read_bytes": (io.read_bytes - last.read_bytes) / elapsed,
+                "write_bytes": (io.write_bytes - last.write_bytes) / elapsed,
+                "read_iops": reads / elapsed,
+                "write_iops": writes / elapsed,
+                "utilization": None if busy_time is None
+                else min(100.0, (busy_time - last.busy_time) / (elapsed * 10)),
+                "await_ms": io_time / (reads + writes) if reads + writes else 0.0,
+            }
+        self.rates = rates
+
+
+disk_collector = DiskCollector()
+disk_io_rates = DiskIORates()
@@ -0,0 +1,126 @@
+"""
+Network rate collector
+
+Turns the cumulative per-interface counters of consecutive sampler
+snapshots into per-second rates over several trailing windows. Requests read
+the precomputed rates instead of sleeping between two counter reads.
+"""
+
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import system_monitor.config as config
+
+FIELDS = ("bytes_sent", "bytes_recv", "packets_sent", "packets_recv", "errin", "errout", "dropin", "dropout")
+
+# Counters exported by some drivers are 32 bit and wrap at this value
+WRAP_32 = 2 ** 32
+
+
+def _delta(current: int, previous: int) -> int:
+    """
+    Increase of a counter between two samples.
+
+    A counter that went down either wrapped around 32 bits (when it was in
+    the upper half of the range) or was reset, e.g. because the interface
+    was re-created; after a reset the new value is the increase.
+    """
+    if current >= previous:
+        return current - previous
+    if previous >= WRAP_32 // 2 and previous < WRAP_32:
+        return current + WRAP_32 - previous
+    return current
+
+
+class NetworkRates:
+    """
+    Per-interface throughput, packet, error and drop rates.
+
+    For every interface the collector keeps a running total of counter
+    increases (wraparound-safe) and a short history of (sampled_at, totals)
+    pairs covering the longest window. The rate over a window is the
+    difference of totals divided by the time between the two samples.
+    Interfaces that disappear are forgotten; new ones report rates once they
+    have two samples.
+    """
+
+    def __init__(self, windows: Optional[List[float]] = None, interval: Optional[float] = None):
+        if windows is None:
+            windows = [float(window) for window in config.get("network", "windows", "1,10,60").split(",")]
+        if interval is None:
+            interval = float(config.get("sampler", "interval", "1.0"))
+        self.windows = sorted(windows)
+        self.interval = interval
+        self._previous: Dict[str, tuple] = {}
+        self._totals: Dict[str, List[int]] = {}
+        self._history: Dict[str, Deque[Tuple[float, Tuple[int, ...]]]] = {}
+
+    def record(self, snapshot: dict):
+        """
+        Add the per-interface counters of a sampler snapshot.
+
+        Args:
+            snapshot: Snapshot produced by the background sampler
+        """
+        sampled_at = snapshot["sampled_at"]
+        counters = snapshot["network"]["io_pernic"]
+        horizon = sampled_at - self.windows[-1] - self.interval
+
+        for nic in [nic for nic in self._previous if nic not in counters]:
+            del self._previous[nic], self._totals[nic], self._history[nic]
+
+        for nic, io in counters.items():
+            values = tuple(getattr(io, field) for field in FIELDS)
+            previous = self._previous.get(nic)
+            if previous is None:
+                totals = self._totals[nic] = [0] * len(FIELDS)
+                history = self._history[nic] = deque()
+            else:
+                totals = self._totals[nic]
+                for index, (current, last) in enumerate(zip(values, previous)):
+                    totals[index] += _delta(current, last)
+                history = self._history[nic]
+            self._previous[nic] = values
+            history.append((sampled_at, tuple(totals)))
+            while len(history) > 2 and history[1][0] <= horizon:
+                history.popleft()
+
+    def rates(self, nic: str) -> Dict[str, Optional[dict]]:
+        """
+        Rates of one interface over every configured window.
+
+        A window uses the oldest sample that is at most the window length
+        (plus half a sampling interval of jitter) old, so a window longer than
+        the recorded history reports the rate over the available span.
+
+        Args:
+            nic: Interface name
+
+        Returns:
+            Window label (e.g. "10s") -> {field: per-second rate, "seconds": span},
+            or None for every window while fewer than two samples exist
+        """
+        history = self._history.get(nic)
+        result: Dict[str, Optional[dict]] = {}
+        for window in self.windows:
+            label = f"{window:g}s"
+            if not history or len(history) < 2:
+                result[label] = None
+                continue
+            now, latest = history[-1]
+            cutoff = now - window - self.interval / 2
+            start, start_totals = next((entry for entry in history if entry[0] >= cutoff), history[-2])
+            if start == now:
+                start, start_totals = history[-2]
+            elapsed = now - start
+            rates = {field: (latest[index] - start_totals[index]) / elapsed for index, field in enumerate(FIELDS)}
+            rates["seconds"] = elapsed
+            result[label] = rates
+        return result
+
+    def all_rates(self) -> Dict[str, Dict[str, Optional[dict]]]:
+        """Rates of every known interface, keyed by interface name."""
+        return {nic: self.rates(nic) for nic in self._history}
+
+
+network_rates = NetworkRates()
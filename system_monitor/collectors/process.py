@@ -0,0 +1,361 @@
+"""
+Process table collector
+
+Keeps psutil Process objects alive across samples so per-process CPU usage is
+measured against the previous sample instead of always reading 0.0.
+"""
+
+import heapq
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import psutil
+
+import system_monitor.config as config
+from system_monitor.backends import backend as default_backend
+from system_monitor.backends.base import MetricsBackend
+from system_monitor.collectors.sockets import SocketInventory, socket_inventory
+from system_monitor.instrumentation import stats
+
+ATTRS = [
+    "pid", "name", "username", "status", "cpu_percent",
+    "memory_percent", "memory_info", "create_time", "exe", "io_counters", "num_threads"
+]
+
+# Attributes read to index a process: when its PID appears, and again when its
+# name or create_time changes (exec() or a reused PID)
+INDEX_ATTRS = ["name", "username", "exe", "cmdline", "create_time"]
+
+# as_dict() placeholder for attributes that raised AccessDenied, so they can be counted
+_DENIED = object()
+
+# Separators inside command line arguments, e.g. --config=/etc/app/app.conf
+_TOKEN_SEPARATORS = re.compile(r"[\s=/:,]+")
+
+
+def tokenize(arguments: Iterable[str]) -> Set[str]:
+    """
+    Split command line arguments into lower-case search tokens.
+
+    Every argument is a token, and so is every part of it between
+    whitespace, "=", "/", ":" or ",", so ``/usr/bin/java`` matches both
+    the full path and ``java``.
+    """
+    tokens = set()
+    for argument in arguments:
+        argument = argument.lower()
+        if argument:
+            tokens.add(argument)
+            tokens.update(part for part in _TOKEN_SEPARATORS.split(argument) if part)
+    return tokens
+
+
+class ProcessIndex:
+    """
+    Inverted index of the process table.
+
+    Maps lower-case names, usernames, executables (full path and basename)
+    and command line tokens to the PIDs that have them. It is maintained
+    incrementally: PIDs are added when they appear and removed when they
+    exit, so a lookup is a few dictionary probes and set intersections.
+    """
+
+    def __init__(self):
+        self.keys: Dict[str, Dict[str, Set[int]]] = {"name": {}, "user": {}, "exe": {}, "cmdline": {}}
+        self.entries: Dict[int, List[Tuple[str, str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, pid: int, info: dict):
+        """
+        Index a process.
+
+        Args:
+            pid: Process ID
+            info: The process' INDEX_ATTRS as returned by as_dict(); denied values are None
+        """
+        self.remove(pid)
+        entries = []
+        if info.get("name"):
+            entries.append(("name", info["name"].lower()))
+        if info.get("username"):
+            entries.append(("user", info["username"].lower()))
+        if info.get("exe"):
+            exe = info["exe"].lower()
+            entries.append(("exe", exe))
+            entries.append(("exe", exe.rsplit("/", 1)[-1]))
+        entries.extend(("cmdline", token) for token in tokenize(info.get("cmdline") or ()))
+        for kind, key in entries:
+            self.keys[kind].setdefault(key, set()).add(pid)
+        self.entries[pid] = entries
+
+    def remove(self, pid: int):
+        for kind, key in self.entries.pop(pid, ()):
+            pids = self.keys[kind].get(key)
+            if pids is not None:
+                pids.discard(pid)
+                if not pids:
+                    del self.keys[kind][key]
+
+    def search(self, name: Optional[str] = None, user: Optional[str] = None, exe: Optional[str] = None,
+               cmdline: Optional[str] = None) -> Set[int]:
+        """
+        Find the PIDs matching every given criterion.
+
+        Args:
+            name: Process name, case-insensitive exact match
+            user: Username, case-insensitive exact match
+            exe: Executable path or basename
+            cmdline: Command line text; every token in it must occur in the process' command line
+
+        Returns:
+            The matching PIDs
+        """
+        wanted = []
+        if name is not None:
+            wanted.append(("name", name.lower()))
+        if user is not None:
+            wanted.append(("user", user.lower()))
+        if exe is not None:
+            wanted.append(("exe", exe.lower()))
+        if cmdline is not None:
+            wanted.extend(("cmdline", token) for token in tokenize(cmdline.split()))
+        if not wanted:
+            return set()
+        # Intersect starting from the rarest key
+        candidates = sorted((self.keys[kind].get(key, set()) for kind, key in wanted), key=len)
+        return set(candidates[0]).intersection(*candidates[1:])
+
+
+SORT_FIELDS = {
+    "pid", "name", "username", "status", "cpu_percent", "memory_percent", "create_time",
+    "num_threads", "rss", "vms", "read_bytes", "write_bytes", "connections"
+}
+
+
+class ProcessRegistry:
+    """
+    Persistent registry of running processes.
+
+    Each refresh diffs the current PID set against the known one: Process
+    objects of exited PIDs are dropped, new PIDs are added, and the remaining
+    objects are reused so cpu_percent() reports usage since the last refresh.
+    The same diff keeps ``index`` up to date for search(). A known PID whose
+    process was replaced (is_running() is False) gets a new Process object,
+    and one whose name or create_time no longer matches the indexed values
+    (it exec()ed another program) is indexed again.
+    """
+
+    def __init__(self, refresh_interval: Optional[float] = None, backend: Optional[MetricsBackend] = None,
+                 sockets: Optional[SocketInventory] = None):
+        self.backend = backend or default_backend
+        self.sockets = sockets or (socket_inventory if backend is None else SocketInventory(backend=backend))
+        if refresh_interval is None:
+            refresh_interval = float(config.get("process", "refresh_interval", "1.0"))
+        self.refresh_interval = refresh_interval
+        self.processes: Dict[int, psutil.Process] = {}
+        self.records: List[dict] = []
+        self.by_pid: Dict[int, dict] = {}
+        self.refreshed_at = 0.0
+        self.index = ProcessIndex()
+        # PID -> (create_time, name) when it was indexed
+        self.identities: Dict[int, Tuple[Optional[float], Optional[str]]] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, max_age: Optional[float] = None) -> List[dict]:
+        """
+        Sample the process table, reusing the previous sample if it is recent enough.
+
+        This performs blocking backend calls and is meant to run in a worker thread.
+
+        Args:
+            max_age: Oldest previous sample in seconds that may be reused; refresh_interval if omitted
+
+        Returns:
+            List of raw process records with numeric values
+        """
+        if max_age is None:
+            max_age = self.refresh_interval
+        with self._lock:
+            if time.monotonic() - self.refreshed_at < max_age:
+                return self.records
+
+            connections = self.sockets.refresh()["by_pid"]
+            with stats.timer("process.scan"):
+                records = self._scan(connections)
+
+            self.records = records
+            self.by_pid = {record["pid"]: record for record in records}
+            self.refreshed_at = time.monotonic()
+            return records
+
+    def search(self, name: Optional[str] = None, user: Optional[str] = None, exe: Optional[str] = None,
+               cmdline: Optional[str] = None, max_age: Optional[float] = None) -> List[dict]:
+        """
+        Find processes through the index instead of filtering the whole table.
+
+        The sample comes from refresh(), so searches share its rate limit
+        and CPU usage baseline with the process list; the index then
+        selects the matching records of that sample.
+
+        This performs blocking backend calls and is meant to run in a worker thread.
+
+        Args:
+            name: Process name, case-insensitive exact match
+            user: Username, case-insensitive exact match
+            exe: Executable path or basename
+            cmdline: Command line text; every token in it must occur in the process' command line
+            max_age: Oldest previous sample in seconds that may be reused; refresh_interval if omitted
+
+        Returns:
+            Raw process records of the matching processes
+        """
+        self.refresh(max_age)
+        with self._lock:
+            with stats.timer("process.search"):
+                pids = self.index.search(name=name, user=user, exe=exe, cmdline=cmdline)
+                return [self.by_pid[pid] for pid in pids if pid in self.by_pid]
+
+    def _sync(self):
+        """Apply the PID-set diff to the known processes and the index."""
+        pids = set(self.backend.pids())
+        for pid in self.processes.keys() - pids:
+            self._forget(pid)
+        vanished = 0
+        for pid in pids - self.processes.keys():
+            try:
+                self._add(pid)
+            except psutil.NoSuchProcess:
+                vanished += 1
+        stats.count("process.no_such_process", vanished)
+
+    def _add(self, pid: int) -> psutil.Process:
+        """Create the Process object of a PID and index it."""
+        proc = self.backend.process(pid)
+        self._index(proc)
+        self.processes[pid] = proc
+        return proc
+
+    def _index(self, proc: psutil.Process):
+        info = proc.as_dict(attrs=INDEX_ATTRS, ad_value=None)
+        self.index.add(proc.pid, info)
+        self.identities[proc.pid] = (info["create_time"], info["name"])
+
+    def _forget(self, pid: int):
+        self.processes.pop(pid, None)
+        self.index.remove(pid)
+        self.identities.pop(pid, None)
+
+    def _records(self, pids: Iterable[int], connections: Dict[int, int]) -> List[dict]:
+        """Build records for known processes, forgetting those that exited."""
+        records = []
+        vanished = denied = reused = changed = 0
+        for pid in pids:
+            proc = self.processes[pid]
+            try:
+                if not proc.is_running():
+                    # Exited, or another process now has the PID (psutil compares create times)
+                    self._forget(pid)
+                    proc = self._add(pid)
+                    reused += 1
+                record, record_denied = self._record(proc, connections)
+                if (record["create_time"], record["name"]) != self.identities[pid]:
+                    # The process exec()ed another program
+                    self._index(proc)
+                    changed += 1
+            except psutil.NoSuchProcess:
+                self._forget(pid)
+                vanished += 1
+                continue
+            records.append(record)
+            denied += record_denied
+        stats.count("process.no_such_process", vanished)
+        stats.count("process.access_denied", denied)
+        stats.count("process.pid_reused", reused)
+        stats.count("process.reindexed", changed)
+        return records
+
+    def _scan(self, connections: Dict[int, int]) -> List[dict]:
+        """Apply the PID-set diff and build a record for every known process."""
+        self._sync()
+        return self._records(list(self.processes), connections)
+
+    @staticmethod
+    def _record(proc: psutil.Process, connections: Dict[int, int]) -> Tuple[dict, int]:
+        """Build the raw record for a single process and count the attributes it was denied."""
+        info = proc.as_dict(attrs=ATTRS, ad_value=_DENIED)
+        denied = 0
+        for key, value in info.items():
+            if value is _DENIED:
+                info[key] = None
+                denied += 1
+        mem_info = info.pop("memory_info")
+        io_info = info.pop("io_counters")
+        is_zombie = info["status"] == psutil.STATUS_ZOMBIE
+
+        info["rss"] = mem_info.rss if mem_info else None
+        info["vms"] = mem_info.vms if mem_info else None
+        info["read_bytes"] = io_info.read_bytes if io_info else None
+        info["write_bytes"] = io_info.write_bytes if io_info else None
+        info["connections"] = connections.get(proc.pid, 0)
+        info["is_zombie"] = is_zombie
+        return info, denied
+
+
+def filter_records(records: Iterable[dict], user: Optional[str] = None, name: Optional[str] = None) -> List[dict]:
+    """
+    Filter process records by owner and name.
+
+    Args:
+        records: Raw process records
+        user: Only include processes owned by this user
+        name: Only include processes whose name contains this text (case-insensitive)
+
+    Returns:
+        The matching records
+    """
+    if user is not None:
+        records = (r for r in records if r["username"] == user)
+    if name is not None:
+        needle = name.lower()
+        records = (r for r in records if r["name"] and needle in r["name"].lower())
+    return list(records)
+
+
+def select(records: Iterable[dict], sort: str = "pid", limit: Optional[int] = None, offset: int = 0) -> List[dict]:
+    """
+    Order and paginate process records.
+
+    When a limit is given only the top ``offset + limit`` records are selected
+    with a heap instead of sorting the whole table.
+
+    Args:
+        records: Raw process records
+        sort: Field to order by; prefix with "-" for descending order
+        limit: Maximum number of records to return
+        offset: Number of leading records to skip
+
+    Returns:
+        The selected records in order
+    """
+    descending = sort.startswith("-")
+    field = sort.lstrip("-")
+    if descending:
+        # Missing values sort last in either direction
+        def key(r):
+            return (0, 0) if r[field] is None else (1, r[field])
+    else:
+        def key(r):
+            return (1, 0) if r[field] is None else (0, r[field])
+
+    if limit is None:
+        return sorted(records, key=key, reverse=descending)[offset:]
+    if descending:
+        return heapq.nlargest(offset + limit, records, key=key)[offset:]
+    return heapq.nsmallest(offset + limit, records, key=key)[offset:]
+
+
+process_registry = ProcessRegistry()
@@ -0,0 +1,261 @@
+"""
+Linux /proc fast-path collector
+
+Keeps /proc/stat, /proc/meminfo, /proc/net/dev and /proc/diskstats open and
+re-reads them with ``preadv`` into buffers that are reused between samples,
+so reading allocates nothing. Parsing copies the part of the buffer it needs
+once and splits it into lines in C; of /proc/stat only the cpu lines are
+copied, not the interrupt counters that follow. CPU times are parsed into
+preallocated arrays, and meminfo lines are looked up by their remembered
+position instead of building a dictionary of every field. Results use the
+same field names as the psutil equivalents, so the sampler can use either
+path. On other platforms ``create()`` returns None and the sampler keeps
+using psutil.
+"""
+
+import os
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import system_monitor.config as config
+from system_monitor.measurements import sdiskio, snetio, svmem
+
+# /proc/diskstats counts 512-byte sectors regardless of the device sector size
+SECTOR_SIZE = 512
+
+# /proc/stat cpu columns: user nice system idle iowait irq softirq steal guest guest_nice
+CPU_COLUMNS = 10
+IDLE, IOWAIT, GUEST = 3, 4, 8
+
+MEMINFO_KEYS = (b"MemTotal:", b"MemFree:", b"MemAvailable:", b"Buffers:", b"Cached:", b"SReclaimable:",
+                b"Shmem:", b"Active:", b"Inactive:", b"Slab:")
+
+
+class ProcFile:
+    """A /proc file kept open and re-read from offset 0 into a reused buffer."""
+
+    def __init__(self, path: str, size: int = 4096):
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+        self.buffer = bytearray(size)
+
+    def read(self) -> int:
+        """
+        Read the whole file into the buffer.
+
+        The buffer doubles until the file fits, so after the first few
+        samples every read is a single preadv() into the same buffer.
+
+        Returns:
+            Number of bytes read; the content is ``buffer[:size]``
+        """
+        while True:
+            size = os.preadv(self.fd, [self.buffer], 0)
+            if size < len(self.buffer):
+                return size
+            self.buffer = bytearray(len(self.buffer) * 2)
+
+    def lines(self, stop: Optional[bytes] = None) -> List[bytearray]:
+        """
+        Read the file and split it into lines.
+
+        The filled part of the buffer is copied once, which measured faster
+        than walking the lines inside the buffer from Python.
+
+        Args:
+            stop: Text at which to end, e.g. the first line that is not needed
+
+        Returns:
+            The lines before ``stop``, or of the whole file
+        """
+        size = self.read()
+        if stop is not None:
+            end = self.buffer.find(stop, 0, size)
+            if end >= 0:
+                size = end
+        return self.buffer[:size].split(b"\n")
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ProcfsCollector:
+    """
+    Reads the hot sampler metrics straight from /proc.
+
+    CPU utilization is computed like psutil.cpu_percent(interval=None): the
+    busy share of the CPU time elapsed since the previous call, with guest
+    time counted inside user time and iowait counted as idle.
+    """
+
+    def __init__(self, procfs: str = "/proc"):
+        self.stat = ProcFile(f"{procfs}/stat", 16384)
+        self.meminfo = ProcFile(f"{procfs}/meminfo")
+        self.net_dev = ProcFile(f"{procfs}/net/dev")
+        self.diskstats = ProcFile(f"{procfs}/diskstats")
+        self._cpus = 0
+        self._times = array("Q")
+        self._previous = array("Q")
+        self._meminfo_lines: Dict[bytes, int] = {}
+        self.cpu_percent()  # establish the CPU baseline and size the arrays
+
+    def _read_cpu_times(self) -> int:
+        """Parse the cpu lines of /proc/stat into self._times; returns the number of CPUs."""
+        # The cpu lines come first; everything from the intr line on is skipped
+        lines = self.stat.lines(stop=b"\nintr")
+        rows = 0
+        for line in lines:
+            if not line.startswith(b"cpu"):
+                break
+            rows += 1
+        if rows * CPU_COLUMNS != len(self._times):
+            # First sample, or a CPU went on- or offline
+            self._times = array("Q", bytes(8 * rows * CPU_COLUMNS))
+            self._previous = array("Q", bytes(8 * rows * CPU_COLUMNS))
+        times = self._times
+        for row in range(rows):
+            fields = lines[row].split()
+            base = row * CPU_COLUMNS
+            for column in range(min(CPU_COLUMNS, len(fields) - 1)):
+                times[base + column] = int(fields[column + 1])
+        return rows - 1
+
+    def cpu_percent(self) -> Tuple[float, List[float]]:
+        """
+        CPU utilization since the previous call.
+
+        Returns:
+            Overall percentage and a list of per-CPU percentages
+        """
+        cpus = self._read_cpu_times()
+        resized = cpus != self._cpus
+        self._cpus = cpus
+        times, previous = self._times, self._previous
+        percents = []
+        for row in range(cpus + 1):
+            base = row * CPU_COLUMNS
+            total = busy = 0
+            for column in range(GUEST):
+                delta = times[base + column] - previous[base + column]
+                total += delta
+                if column != IDLE and column != IOWAIT:
+                    busy += delta
+            if resized or total <= 0:
+                percents.append(0.0)
+            else:
+                percents.append(round(min(100.0, max(0.0, busy * 100 / total)), 1))
+        # Keep this sample as the next baseline, reusing the old array for the next read
+        self._previous, self._times = times, previous
+        return percents[0], percents[1:]
+
+    def virtual_memory(self) -> svmem:
+        """
+        Memory statistics computed as psutil.virtual_memory() does on Linux.
+
+        Returns:
+            Named tuple with the psutil virtual_memory() fields
+        """
+        lines = self.meminfo.lines()
+        positions = self._meminfo_lines
+        values = {}
+        for key in MEMINFO_KEYS:
+            index = positions.get(key)
+            if index is None or index >= len(lines) or not lines[index].startswith(key):
+                index = positions[key] = next((i for i, line in enumerate(lines) if line.startswith(key)), -1)
+            if index >= 0:
+                values[key] = int(lines[index].split()[1]) * 1024
+
+        total = values[b"MemTotal:"]
+        free = values[b"MemFree:"]
+        buffers = values.get(b"Buffers:", 0)
+        cached = values.get(b"Cached:", 0) + values.get(b"SReclaimable:", 0)
+        available = values.get(b"MemAvailable:") or free + buffers + cached
+        if available > total:
+            available = free  # distorted values inside some containers
+        used = total - available
+        return svmem(
+            total, available, round(used / total * 100, 1) if total else 0.0, used, free,
+            values.get(b"Active:", 0), values.get(b"Inactive:", 0), buffers, cached,
+            values.get(b"Shmem:", 0), values.get(b"Slab:", 0),
+        )
+
+    def net_io_counters(self) -> Dict[str, snetio]:
+        """
+        Per-interface network counters.
+
+        Unlike psutil, counters are not corrected for wraparound; consumers
+        computing rates handle that themselves, as well as counters that
+        restart when an interface is re-created.
+
+        Returns:
+            Interface name -> named tuple with the psutil net_io_counters() fields
+        """
+        counters = {}
+        for line in self.net_dev.lines()[2:]:
+            colon = line.rfind(b":")
+            if colon < 0:
+                continue
+            fields = line[colon + 1:].split()
+            counters[line[:colon].strip().decode()] = snetio(
+                int(fields[8]), int(fields[0]), int(fields[9]), int(fields[1]),
+                int(fields[2]), int(fields[10]), int(fields[3]), int(fields[11]),
+            )
+        return counters
+
+    def disk_io_counters(self) -> Dict[str, sdiskio]:
+        """
+        Per-device disk counters, like psutil.disk_io_counters(perdisk=True).
+
+        Returns:
+            Device name -> named tuple with the psutil disk_io_counters() fields
+        """
+        counters = {}
+        for line in self.diskstats.lines():
+            fields = line.split()
+            if len(fields) >= 14:
+                counters[fields[2].decode()] = sdiskio(
+                    int(fields[3]), int(fields[7]), int(fields[5]) * SECTOR_SIZE, int(fields[9]) * SECTOR_SIZE,
+                    int(fields[6]), int(fields[10]), int(fields[4]), int(fields[8]), int(fields[12]),
+                )
+            elif len(fields) == 7:
+                # Partition lines of kernels before 2.6.25
+                counters[fields[2].decode()] = sdiskio(
+                    int(fields[3]), int(fields[5]), int(fields[4]) * SECTOR_SIZE, int(fields[6]) * SECTOR_SIZE,
+                    0, 0, 0, 0, 0,
+                )
+        return counters
+
+    def close(self):
+        for proc_file in (self.stat, self.meminfo, self.net_dev, self.diskstats):
+            proc_file.close()
+
+
+def total_net_io(pernic: Dict[str, snetio]) -> snetio:
+    """
+    Sum per-interface counters into system-wide totals, like net_io_counters(pernic=False).
+
+    The totals can go down, when an interface disappears or, on the fast
+    path, when a 32-bit counter wraps. They are only reported as they are;
+    rates are computed from the per-interface counters by NetworkRates and
+    the history buffer, which handle both cases.
+    """
+    return snetio(*(sum(column) for column in zip(*pernic.values()))) if pernic else snetio(0, 0, 0, 0, 0, 0, 0, 0)
+
+
+def create(procfs: str = "/proc") -> Optional[ProcfsCollector]:
+    """
+    Create the fast-path collector if this platform supports it.
+
+    Returns:
+        A ProcfsCollector on Linux when ``[sampler] fast_path`` is enabled,
+        otherwise None
+    """
+    if config.get("sampler", "fast_path", "true").lower() != "true":
+        return None
+    if not hasattr(os, "preadv"):
+        return None
+    try:
+        return ProcfsCollector(procfs)
+    except (OSError, ValueError, IndexError, KeyError) as e:
+        print(f"/proc fast path unavailable, using psutil: {e}")
+        return None
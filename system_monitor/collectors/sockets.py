@@ -0,0 +1,75 @@
+"""
+Socket inventory collector
+
+Scans the system socket table once per sample and indexes it by PID and by
+connection state, so per-process connection counts do not each re-parse
+/proc/net/tcp*.
+"""
+
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+import psutil
+
+import system_monitor.config as config
+from system_monitor.backends import backend as default_backend
+from system_monitor.backends.base import MetricsBackend
+from system_monitor.instrumentation import stats
+
+
+class SocketInventory:
+    """
+    System-wide index of inet sockets, refreshed at most once per sample interval.
+
+    The index is a dictionary with:
+        - total: Number of inet sockets
+        - by_pid: PID -> number of sockets owned by that process
+        - by_state: Connection state -> number of sockets in that state
+        - refreshed_at: Unix timestamp of the scan
+    """
+
+    def __init__(self, refresh_interval: Optional[float] = None, backend: Optional[MetricsBackend] = None):
+        self.backend = backend or default_backend
+        if refresh_interval is None:
+            refresh_interval = float(config.get("sampler", "interval", "1.0"))
+        self.refresh_interval = refresh_interval
+        self.index: dict = {"total": 0, "by_pid": {}, "by_state": {}, "refreshed_at": None}
+        self._refreshed = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self) -> dict:
+        """
+        Scan the socket table unless the current index is recent enough.
+
+        This performs blocking backend calls and is meant to run in a worker thread.
+
+        Returns:
+            The socket index dictionary
+        """
+        with self._lock:
+            if time.monotonic() - self._refreshed < self.refresh_interval:
+                return self.index
+
+            try:
+                with stats.timer("sockets.scan"):
+                    connections = self.backend.net_connections()
+            except psutil.AccessDenied:
+                # macOS requires root for a system-wide scan
+                stats.count("sockets.access_denied")
+                connections = []
+
+            by_pid = Counter(conn.pid for conn in connections if conn.pid is not None)
+            by_state = Counter(conn.status for conn in connections)
+            self.index = {
+                "total": len(connections),
+                "by_pid": dict(by_pid),
+                "by_state": dict(by_state),
+                "refreshed_at": time.time(),
+            }
+            self._refreshed = time.monotonic()
+            return self.index
+
+
+socket_inventory = SocketInventory()
@@ -0,0 +1,98 @@
+"""
+Response encoding
+
+Negotiates the response body encoding from the Accept header: MessagePack
+when requested and available, otherwise JSON, encoded with orjson when it is
+installed. Handlers return the encoded Response directly, which skips
+FastAPI's generic jsonable_encoder pass over the payload.
+"""
+
+import json
+from typing import Any, Optional, Tuple
+
+from fastapi import Query, Request
+from fastapi.responses import Response
+
+from system_monitor.instrumentation import stats
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; MessagePack is only offered when it is installed
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+# Shared ?format= query parameter: "human" keeps the formatted strings, "raw" returns plain numbers
+FORMAT_QUERY = Query(
+    "human",
+    pattern="^(human|raw)$",
+    description="'human' for formatted sizes and percentages, 'raw' for integer bytes and float percentages",
+)
+
+
+def encode_json(payload: Any) -> bytes:
+    """Encode a payload as compact JSON."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def negotiate(request: Request) -> str:
+    """
+    Pick the response media type for a request.
+
+    Args:
+        request: The incoming request
+
+    Returns:
+        A MessagePack media type if the client accepts one and msgpack is installed, otherwise JSON
+    """
+    accept = request.headers.get("accept", "")
+    if msgpack is not None:
+        for media_type in MSGPACK_MEDIA_TYPES:
+            if media_type in accept:
+                return media_type
+    return JSON_MEDIA_TYPE
+
+
+def encode(request: Request, payload: Any) -> Tuple[bytes, str]:
+    """
+    Encode a payload in the negotiated format.
+
+    Args:
+        request: The incoming request, used for content negotiation
+        payload: JSON-compatible data to encode
+
+    Returns:
+        The encoded body and its media type
+    """
+    media_type = negotiate(request)
+    if media_type == JSON_MEDIA_TYPE:
+        with stats.timer("encode.json"):
+            return encode_json(payload), media_type
+    with stats.timer("encode.msgpack"):
+        return msgpack.packb(payload), media_type
+
+
+def respond(request: Request, payload: Any, headers: Optional[dict] = None) -> Response:
+    """
+    Encode a payload in the negotiated format.
+
+    Args:
+        request: The incoming request, used for content negotiation
+        payload: JSON-compatible data to encode
+        headers: Extra response headers
+
+    Returns:
+        Response with the encoded body
+    """
+    body, media_type = encode(request, payload)
+    response = Response(content=body, media_type=media_type, headers=headers)
+    response.headers["Vary"] = "Accept"
+    return response
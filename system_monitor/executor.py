@@ -0,0 +1,196 @@
+"""
+Collector execution layer
+
+Runs blocking psutil collections on a bounded thread pool so the event loop
+only awaits their results and stays responsive under concurrent load.
+"""
+
+import asyncio
+import functools
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import system_monitor.config as config
+from system_monitor.instrumentation import stats
+
+MAX_WORKERS = int(config.get("collectors", "max_workers", "8"))
+MAX_CONCURRENCY = int(config.get("collectors", "max_concurrency", "4"))
+COALESCE = config.get("collectors", "coalesce", "true").lower() == "true"
+DEFAULT_TIMEOUT = float(config.get("collectors", "timeout", "10"))
+
+executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="collector")
+
+_semaphore: Optional[asyncio.Semaphore] = None
+
+# (name, func, args) -> submission of the collection currently queued or running
+_in_flight: Dict[Tuple, asyncio.Task] = {}
+
+
+class CollectorTimeoutError(Exception):
+    """Raised when a collector does not finish within its timeout."""
+
+    def __init__(self, name: str, timeout: float):
+        super().__init__(f"Collector '{name}' timed out after {timeout:g}s")
+        self.name = name
+        self.timeout = timeout
+
+
+def collector_timeout(name: str) -> float:
+    """
+    Get the configured timeout for a collector.
+
+    Args:
+        name: The collector name, looked up as ``timeout_<name>`` in [collectors]
+
+    Returns:
+        Timeout in seconds
+    """
+    return float(config.get("collectors", f"timeout_{name}", str(DEFAULT_TIMEOUT)))
+
+
+def _release(future: asyncio.Future):
+    """Free a concurrency slot once a collector thread has finished."""
+    _semaphore.release()
+    if not future.cancelled():
+        future.exception()  # mark the outcome retrieved after a timeout
+
+
+def _release_unused(acquire: asyncio.Future):
+    """Give back a slot that was granted to an acquisition that had already given up."""
+    if not acquire.cancelled():
+        _semaphore.release()
+
+
+async def _within(future: asyncio.Future, timeout: float) -> Any:
+    """
+    Await a future for at most timeout seconds without cancelling it.
+
+    Unlike wait_for() around shield(), a cancellation of the caller is never
+    swallowed when the future completes at the same moment.
+    """
+    done, _ = await asyncio.wait({future}, timeout=timeout)
+    if not done:
+        raise asyncio.TimeoutError
+    return future.result()
+
+
+def _timed(name: str, func: Callable[..., Any], *args) -> Any:
+    """Run a collector in its worker thread and record how long it took."""
+    started = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        stats.observe("collectors", name, time.perf_counter() - started)
+
+
+async def _submit(name: str, func: Callable[..., Any], args: tuple, timeout: float) -> asyncio.Future:
+    """
+    Wait up to timeout for a concurrency slot and start func on the thread pool.
+
+    Raises:
+        CollectorTimeoutError: If no slot became free within the timeout
+    """
+    acquire = asyncio.ensure_future(_semaphore.acquire())
+    try:
+        await asyncio.wait({acquire}, timeout=timeout)
+    finally:
+        granted = acquire.done()
+        if not granted:
+            acquire.cancel()
+            # The cancellation can lose the race with a release
+            acquire.add_done_callback(_release_unused)
+    if not granted:
+        raise CollectorTimeoutError(name, timeout)
+    loop = asyncio.get_running_loop()
+    try:
+        future = loop.run_in_executor(executor, functools.partial(_timed, name, func, *args))
+    except BaseException:
+        _semaphore.release()
+        raise
+    future.add_done_callback(_release)
+    return future
+
+
+def _forget(key: Tuple, submission: asyncio.Task):
+    """Remove a finished collection from the in-flight table."""
+    if _in_flight.get(key) is submission:
+        del _in_flight[key]
+
+
+def _submitted(key: Tuple, submission: asyncio.Task):
+    """Keep a collection in the in-flight table until its thread has finished."""
+    if submission.cancelled() or submission.exception() is not None:
+        _forget(key, submission)
+    else:
+        submission.result().add_done_callback(lambda _: _forget(key, submission))
+
+
+def in_flight() -> Dict[str, int]:
+    """Number of collections currently queued or running, by collector name."""
+    return dict(Counter(key[0] for key in _in_flight))
+
+
+async def run_collector(name: str, func: Callable[..., Any], *args, timeout: Optional[float] = None,
+                        coalesce: bool = True) -> Any:
+    """
+    Run a blocking collector function on the collector thread pool.
+
+    At most MAX_CONCURRENCY collectors run at once; further callers wait for a
+    free slot. The timeout covers both the wait for a slot and the run, so
+    callers fail with CollectorTimeoutError instead of queueing forever when
+    every slot is held. A collector that times out keeps its slot until its
+    thread actually finishes, so hung syscalls cannot pile up unbounded work.
+    The run time of every call is recorded in the ``collectors`` histograms.
+
+    Concurrent calls with the same name, function and arguments are coalesced
+    (single flight): only the first one runs the function and the others
+    await its result, which is counted as ``coalesced.<name>``. Each caller
+    still applies its own timeout; the slot wait of a shared run is bounded
+    by the timeout of the caller that started it. Functions with side effects pass
+    ``coalesce=False``; ``[collectors] coalesce = false`` disables it entirely.
+
+    Args:
+        name: Collector name used for timeouts and error reporting
+        func: Blocking function to execute
+        *args: Positional arguments passed to func
+        timeout: Override for the configured timeout in seconds
+        coalesce: Share the result with concurrent identical calls
+
+    Returns:
+        The value returned by func
+
+    Raises:
+        CollectorTimeoutError: If func does not complete within the timeout
+    """
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    if timeout is None:
+        timeout = collector_timeout(name)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    key = (name, func, args) if coalesce and COALESCE else None
+    try:
+        submission = _in_flight.get(key) if key is not None else None
+    except TypeError:  # unhashable arguments are never coalesced
+        key, submission = None, None
+    if submission is not None:
+        stats.count(f"coalesced.{name}")
+    else:
+        submission = asyncio.ensure_future(_submit(name, func, args, timeout))
+        if key is not None:
+            _in_flight[key] = submission
+            submission.add_done_callback(functools.partial(_submitted, key))
+
+    try:
+        future = await _within(submission, timeout)
+        return await _within(future, max(0.0, deadline - loop.time()))
+    except asyncio.TimeoutError:
+        stats.count(f"collector_timeouts.{name}")
+        raise CollectorTimeoutError(name, timeout) from None
+    except CollectorTimeoutError:
+        stats.count(f"collector_timeouts.{name}")
+        raise
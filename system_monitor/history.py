@@ -0,0 +1,230 @@
+"""
+In-process metrics history
+
+Keeps the last few hours of sampler snapshots in fixed-size ring buffers.
+Every series is a preallocated float column (a NumPy array when NumPy is
+installed, otherwise an ``array('d')``), so memory use is bounded and
+recording a sample does not allocate per-sample objects. Series that get
+no samples for a whole window, such as those of removed network interfaces
+or loop devices, are dropped.
+"""
+
+import math
+import threading
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import system_monitor.config as config
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to pure-Python reductions
+    np = None
+
+NAN = float("nan")
+
+METRICS = ("cpu", "memory", "network", "disk")
+
+
+class HistoryStore:
+    """
+    Ring buffer of metric samples.
+
+    Samples are grouped by metric (cpu, memory, network, disk) and stored as
+    named series sharing one timestamp column. Network and disk series hold
+    per-second rates computed from consecutive counter samples.
+
+    ``record()`` runs on the event loop while ``query()`` runs in a worker
+    thread, so both hold a lock; a query copies the columns under it and
+    reduces the copies.
+    """
+
+    def __init__(self, hours: Optional[float] = None, interval: Optional[float] = None):
+        if hours is None:
+            hours = float(config.get("history", "hours", "1"))
+        if interval is None:
+            interval = float(config.get("sampler", "interval", "1.0"))
+        self.capacity = max(1, int(hours * 3600 / interval))
+        self.timestamps = self._column()
+        self.series: Dict[str, Dict[str, object]] = {metric: {} for metric in METRICS}
+        self.position = 0
+        self.count = 0
+        # Number of samples recorded so far, and the sample number of the last value of each series
+        self.recorded = 0
+        self.last_sample: Dict[Tuple[str, str], int] = {}
+        self._previous: Optional[dict] = None
+        self._lock = threading.Lock()
+
+    def _column(self):
+        """Allocate a NaN-filled column with room for every slot in the buffer."""
+        if np is not None:
+            return np.full(self.capacity, np.nan)
+        return array("d", [NAN]) * self.capacity
+
+    def record(self, snapshot: dict):
+        """
+        Append a sampler snapshot to the buffer, overwriting the oldest slot when full.
+
+        Args:
+            snapshot: Snapshot produced by the background sampler
+        """
+        values = list(self._values(snapshot))
+        with self._lock:
+            slot = self.position
+            self.timestamps[slot] = snapshot["sampled_at"]
+            for metric, series in self.series.items():
+                for column in series.values():
+                    column[slot] = NAN
+            for metric, name, value in values:
+                column = self.series[metric].get(name)
+                if column is None:
+                    column = self.series[metric][name] = self._column()
+                column[slot] = value
+                self.last_sample[metric, name] = self.recorded
+
+            self.recorded += 1
+            self.position = (slot + 1) % self.capacity
+            self.count = min(self.count + 1, self.capacity)
+            self._evict()
+        self._previous = snapshot
+
+    def _evict(self):
+        """Drop the series whose last value has left the buffer, e.g. of a removed NIC."""
+        oldest = self.recorded - self.capacity
+        for key in [key for key, last in self.last_sample.items() if last < oldest]:
+            metric, name = key
+            del self.series[metric][name]
+            del self.last_sample[key]
+
+    def _values(self, snapshot: dict) -> Iterator[Tuple[str, str, float]]:
+        """Yield (metric, series, value) triples extracted from a snapshot."""
+        cpu = snapshot["cpu"]
+        yield "cpu", "total", cpu["percent"]
+        for index, percent in enumerate(cpu["per_cpu_percent"]):
+            yield "cpu", f"cpu{index}", percent
+
+        memory = snapshot["memory"]
+        yield "memory", "percent", memory.percent
+        yield "memory", "used", memory.used
+        yield "memory", "available", memory.available
+
+        previous = self._previous
+        if previous is None:
+            return
+        elapsed = snapshot["sampled_at"] - previous["sampled_at"]
+        if elapsed <= 0:
+            return
+
+        before = previous["network"]["io_pernic"]
+        for nic, io in snapshot["network"]["io_pernic"].items():
+            if nic in before:
+                last = before[nic]
+                yield "network", f"{nic}.bytes_sent", _rate(io.bytes_sent, last.bytes_sent, elapsed)
+                yield "network", f"{nic}.bytes_recv", _rate(io.bytes_recv, last.bytes_recv, elapsed)
+
+        before = previous["disk_io"]
+        for disk, io in snapshot["disk_io"].items():
+            if disk in before:
+                last = before[disk]
+                yield "disk", f"{disk}.read_bytes", _rate(io.read_bytes, last.read_bytes, elapsed)
+                yield "disk", f"{disk}.write_bytes", _rate(io.write_bytes, last.write_bytes, elapsed)
+
+    def query(self, metric: str, since: Optional[float] = None, step: float = 60.0) -> dict:
+        """
+        Downsample the stored series of a metric into min/avg/max buckets.
+
+        Buckets are aligned to multiples of ``step`` seconds; buckets without
+        samples are omitted.
+
+        Args:
+            metric: One of cpu, memory, network or disk
+            since: Only include samples taken at or after this Unix timestamp
+            step: Bucket width in seconds
+
+        Returns:
+            Dictionary with the bucket start timestamps and, for each series,
+            lists of min, avg and max values
+        """
+        with self._lock:
+            timestamps = self._chronological(self.timestamps)
+            series = {name: self._chronological(column) for name, column in self.series[metric].items()}
+
+        if np is not None:
+            buckets, reduced = _reduce_numpy(timestamps, series, since, step)
+        else:
+            buckets, reduced = _reduce_python(timestamps, series, since, step)
+        return {"metric": metric, "step": step, "timestamps": buckets, "series": reduced}
+
+    def _chronological(self, column):
+        """Return a copy of the filled part of a column ordered from the oldest to the newest sample."""
+        if self.count < self.capacity:
+            # NumPy slices are views; copy so later records do not show through
+            return column[:self.count].copy() if np is not None else column[:self.count]
+        if np is not None:
+            return np.concatenate((column[self.position:], column[:self.position]))
+        return column[self.position:] + column[:self.position]
+
+
+def _rate(current: float, previous: float, elapsed: float) -> float:
+    """Per-second rate between two counter readings; NaN if the counter was reset."""
+    return (current - previous) / elapsed if current >= previous else NAN
+
+
+def _reduce_numpy(timestamps, series: dict, since: Optional[float], step: float) -> Tuple[List[float], dict]:
+    """Vectorized min/avg/max per bucket using ufunc.reduceat over contiguous bucket runs."""
+    mask = ~np.isnan(timestamps)
+    if since is not None:
+        mask &= timestamps >= since
+    timestamps = timestamps[mask]
+    if not len(timestamps):
+        return [], {name: {"min": [], "avg": [], "max": []} for name in series}
+
+    bucket_ids = np.floor(timestamps / step)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(bucket_ids)) + 1))
+    buckets = (bucket_ids[starts] * step).tolist()
+
+    reduced = {}
+    for name, column in series.items():
+        values = column[mask]
+        present = ~np.isnan(values)
+        counts = np.add.reduceat(present, starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg = np.add.reduceat(np.where(present, values, 0.0), starts) / counts
+        reduced[name] = {
+            "min": _nan_to_none(np.fmin.reduceat(values, starts).tolist()),
+            "avg": _nan_to_none(avg.tolist()),
+            "max": _nan_to_none(np.fmax.reduceat(values, starts).tolist()),
+        }
+    return buckets, reduced
+
+
+def _reduce_python(timestamps, series: dict, since: Optional[float], step: float) -> Tuple[List[float], dict]:
+    """Pure-Python fallback for _reduce_numpy."""
+    rows = [i for i, t in enumerate(timestamps) if not math.isnan(t) and (since is None or t >= since)]
+    groups: List[List[int]] = []
+    buckets: List[float] = []
+    for i in rows:
+        bucket = math.floor(timestamps[i] / step) * step
+        if not buckets or buckets[-1] != bucket:
+            buckets.append(bucket)
+            groups.append([])
+        groups[-1].append(i)
+
+    reduced = {}
+    for name, column in series.items():
+        result = {"min": [], "avg": [], "max": []}
+        for group in groups:
+            values = [column[i] for i in group if not math.isnan(column[i])]
+            result["min"].append(min(values) if values else None)
+            result["avg"].append(sum(values) / len(values) if values else None)
+            result["max"].append(max(values) if values else None)
+        reduced[name] = result
+    return buckets, reduced
+
+
+def _nan_to_none(values: List[float]) -> List[Optional[float]]:
+    """Replace NaN with None so the result can be encoded as JSON."""
+    return [None if value != value else value for value in values]
+
+
+history = HistoryStore()
@@ -0,0 +1,363 @@
+"""
+Self-instrumentation
+
+Timing histograms per collector, per collection phase and per route, event
+loop lag, and counters for skipped processes and sockets, reported at
+/internal/stats. An opt-in profiler captures a cProfile or stack-sampling
+profile of the next requests to a path without restarting the server.
+"""
+
+import asyncio
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import system_monitor.config as config
+
+# Upper bounds of the histogram buckets in seconds
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram.
+
+    Observations may come from the event loop and from collector threads.
+    Quantiles are estimated by linear interpolation inside the bucket that
+    contains them, like Prometheus' histogram_quantile().
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        index = bisect_left(BUCKETS, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated q-quantile in seconds, or None without observations."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if cumulative + count >= rank and count:
+                if index == len(BUCKETS):
+                    return self.max
+                lower = BUCKETS[index - 1] if index else 0.0
+                upper = min(BUCKETS[index], self.max)
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.max
+
+    def report(self) -> dict:
+        """Summary in milliseconds with cumulative bucket counts keyed by upper bound."""
+        with self._lock:
+            counts, count, total, maximum = list(self.counts), self.count, self.sum, self.max
+        buckets = {}
+        cumulative = 0
+        for bound, bucket in zip(BUCKETS + (float("inf"),), counts):
+            cumulative += bucket
+            buckets["+Inf" if bound == float("inf") else f"{bound * 1000:g}"] = cumulative
+
+        def ms(value):
+            return None if value is None else value * 1000
+
+        return {
+            "count": count,
+            "sum_ms": total * 1000,
+            "mean_ms": total / count * 1000 if count else None,
+            "max_ms": maximum * 1000,
+            "p50_ms": ms(self.quantile(0.5)),
+            "p90_ms": ms(self.quantile(0.9)),
+            "p99_ms": ms(self.quantile(0.99)),
+            "buckets_ms": buckets,
+        }
+
+
+class Stats:
+    """
+    Process-wide instrumentation registry.
+
+    Histograms are grouped by kind: ``collectors`` (whole run_collector
+    calls), ``phases`` (steps inside a collection or response, such as the
+    process scan or JSON encoding) and ``routes`` (complete requests by route
+    template).
+    """
+
+    KINDS = ("collectors", "phases", "routes")
+
+    def __init__(self, enabled: Optional[bool] = None):
+        if enabled is None:
+            enabled = config.get("instrumentation", "enabled", "true").lower() == "true"
+        self.enabled = enabled
+        self.started_at = time.time()
+        self.histograms: Dict[str, Dict[str, Histogram]] = {kind: {} for kind in self.KINDS}
+        self.loop_lag = Histogram()
+        self.last_loop_lag = 0.0
+        self.counters: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def histogram(self, kind: str, name: str) -> Histogram:
+        histograms = self.histograms[kind]
+        histogram = histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = histograms.setdefault(name, Histogram())
+        return histogram
+
+    def observe(self, kind: str, name: str, seconds: float):
+        """Record one duration in the named histogram."""
+        if self.enabled:
+            self.histogram(kind, name).observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Time the enclosed block as a phase."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("phases", name, time.perf_counter() - started)
+
+    def count(self, name: str, increment: int = 1):
+        """Increase a counter, e.g. ``process.access_denied``."""
+        if self.enabled and increment:
+            with self._lock:
+                self.counters[name] += increment
+
+    def report(self) -> dict:
+        """All histograms and counters as a JSON-compatible dictionary."""
+        report = {
+            "enabled": self.enabled,
+            "uptime_seconds": time.time() - self.started_at,
+        }
+        for kind in self.KINDS:
+            report[kind] = {name: histogram.report() for name, histogram in sorted(self.histograms[kind].items())}
+        report["event_loop_lag"] = dict(self.loop_lag.report(), last_ms=self.last_loop_lag * 1000)
+        with self._lock:
+            report["counters"] = dict(sorted(self.counters.items()))
+        return report
+
+
+async def monitor_loop_lag(interval: Optional[float] = None):
+    """
+    Measure how late the event loop wakes up from a sleep, forever.
+
+    A callback that blocks the loop delays every other request by the same
+    amount, so the lag is the latency added to concurrent requests.
+
+    Args:
+        interval: Seconds between measurements; read from [instrumentation] if omitted
+    """
+    if interval is None:
+        interval = float(config.get("instrumentation", "loop_lag_interval", "0.5"))
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - started - interval)
+        stats.last_loop_lag = lag
+        if stats.enabled:
+            stats.loop_lag.observe(lag)
+
+
+class ProfileCapture:
+    """
+    Profile of the next ``requests`` requests to one path.
+
+    ``cprofile`` mode profiles the event loop thread with cProfile, which
+    covers routing, formatting and encoding but not work running on
+    collector threads. ``sample`` mode snapshots the stacks of every thread
+    every ``sample_interval`` seconds while a captured request is running,
+    so it also shows where collector threads spend their time.
+    """
+
+    def __init__(self, path: str, requests: int, mode: str, sample_interval: float):
+        self.path = path
+        self.requests = requests
+        self.mode = mode
+        self.sample_interval = sample_interval
+        self.captured = 0
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.active = False
+        self._profile = cProfile.Profile() if mode == "cprofile" else None
+        self._stacks: Counter = Counter()
+        self._samples = 0
+        self._stop: Optional[threading.Event] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def done(self) -> bool:
+        return self.captured >= self.requests
+
+    def begin(self):
+        self.active = True
+        if self._profile is not None:
+            self._profile.enable()
+        else:
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._sample, name="profiler", daemon=True)
+            self._thread.start()
+
+    def end(self):
+        if self._profile is not None:
+            self._profile.disable()
+        else:
+            self._stop.set()
+            self._thread.join()
+        self.active = False
+        self.captured += 1
+        if self.done:
+            self.finished_at = time.time()
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self._stop.wait(self.sample_interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._stacks[";".join(reversed(stack))] += 1
+            self._samples += 1
+
+    def result(self, limit: int = 50) -> dict:
+        """
+        Summarize the capture.
+
+        Returns:
+            For cProfile the pstats listing of the top functions by cumulative
+            time; for sampling the most frequent stacks in collapsed format
+            (``thread;outer;...;inner``) with their sample counts
+        """
+        result = {
+            "path": self.path,
+            "mode": self.mode,
+            "requests": self.requests,
+            "captured": self.captured,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self._profile is not None:
+            if self.captured:
+                output = io.StringIO()
+                pstats.Stats(self._profile, stream=output).sort_stats("cumulative").print_stats(limit)
+                result["profile"] = output.getvalue()
+        else:
+            result["samples"] = self._samples
+            result["stacks"] = [{"stack": stack, "count": count} for stack, count in self._stacks.most_common(limit)]
+        return result
+
+
+class Profiler:
+    """
+    Opt-in, rate-limited request profiler.
+
+    Only one capture runs at a time and a new one can be armed at most every
+    ``min_interval`` seconds. Captured requests run one after another: a
+    matching request that arrives while another is being profiled is served
+    without profiling.
+    """
+
+    def __init__(self, enabled: Optional[bool] = None, max_requests: Optional[int] = None,
+                 min_interval: Optional[float] = None, sample_interval: Optional[float] = None):
+        def setting(value, key, default, kind):
+            return value if value is not None else kind(config.get("instrumentation", key, default))
+
+        if enabled is None:
+            enabled = config.get("instrumentation", "profiling", "false").lower() == "true"
+        self.enabled = enabled
+        self.max_requests = setting(max_requests, "profile_max_requests", "20", int)
+        self.min_interval = setting(min_interval, "profile_min_interval", "60", float)
+        self.sample_interval = setting(sample_interval, "profile_sample_interval", "0.005", float)
+        self.capture: Optional[ProfileCapture] = None
+        self._armed_at: Optional[float] = None
+
+    def retry_after(self) -> float:
+        """Seconds until a new capture may be armed."""
+        if self._armed_at is None:
+            return 0.0
+        return max(0.0, self._armed_at + self.min_interval - time.monotonic())
+
+    def busy(self) -> bool:
+        return self.capture is not None and not self.capture.done
+
+    def arm(self, path: str, requests: int, mode: str) -> ProfileCapture:
+        """
+        Profile the next requests to a path.
+
+        Args:
+            path: Exact request path, e.g. /api/v1/process/
+            requests: Number of requests to capture, at most ``max_requests``
+            mode: cprofile or sample
+
+        Returns:
+            The new capture
+        """
+        self.capture = ProfileCapture(path, requests, mode, self.sample_interval)
+        self._armed_at = time.monotonic()
+        return self.capture
+
+    def claim(self, path: str) -> Optional[ProfileCapture]:
+        """Start profiling a request to ``path`` if a capture is waiting for it."""
+        capture = self.capture
+        if capture is None or capture.active or capture.done or capture.path != path:
+            return None
+        capture.begin()
+        return capture
+
+
+class InstrumentationMiddleware:
+    """
+    ASGI middleware recording the duration of every HTTP request by route.
+
+    Requests are keyed by method and route template (``GET /api/v1/history/{metric}``)
+    so path parameters do not create a histogram per value; unmatched paths
+    share one entry. It also starts and stops profiler captures.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        capture = profiler.claim(scope["path"]) if profiler.enabled else None
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            elapsed = time.perf_counter() - started
+            if capture is not None:
+                capture.end()
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            stats.observe("routes", f"{scope['method']} {template}", elapsed)
+
+
+stats = Stats()
+profiler = Profiler()
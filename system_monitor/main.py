@@ -5,7 +5,11 @@ A comprehensive FastAPI-based system monitoring solution providing real-time met
 for CPU, memory, disk, network, processes, sensors, and system information.
 """
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 
 from system_monitor.routers.cpu import cpu
@@ -15,8 +19,51 @@ from system_monitor.routers.network import network
 from system_monitor.routers.sensors import sensors
 from system_monitor.routers.system import system
 from system_monitor.routers.process import process
+from system_monitor.routers.history import history
+from system_monitor.routers.stream import stream
+from system_monitor.routers.fleet import fleet
+from system_monitor.routers.metrics import metrics
+from system_monitor.routers.snapshot import snapshot
+from system_monitor.routers.internal import internal
+from system_monitor.routers.cgroups import cgroups
 import system_monitor.config as config
 from system_monitor import __version__
+from system_monitor.collectors.disk import disk_io_rates
+from system_monitor.collectors.network import network_rates
+from system_monitor.executor import CollectorTimeoutError
+from system_monitor.history import history as history_store
+from system_monitor.instrumentation import InstrumentationMiddleware, monitor_loop_lag, stats
+from system_monitor.sampler import SharedSampler, StaleSnapshotError, sampler
+
+# Record every sample into the in-process history buffer and the network and disk rate trackers
+sampler.add_listener(history_store.record)
+sampler.add_listener(network_rates.record)
+sampler.add_listener(disk_io_rates.record)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the background sampler, and the embedded registration agent if enabled, for the lifetime of the application"""
+    sampler.start()
+    lag_task = asyncio.create_task(monitor_loop_lag()) if stats.enabled else None
+    agent_task = None
+    # In multi-worker mode the sampler process runs the agent
+    if config.get("agent", "embedded", "false").lower() == "true" and not isinstance(sampler, SharedSampler):
+        from system_monitor.register import run_embedded
+        agent_task = asyncio.create_task(run_embedded(sampler))
+    yield
+    if agent_task is not None:
+        agent_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await agent_task
+    if lag_task is not None:
+        lag_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await lag_task
+    await fleet.close_client()
+    fleet.close_pool()
+    await sampler.stop()
+
 
 app = FastAPI(
     title="System Monitor API",
@@ -30,8 +77,33 @@ app = FastAPI(
         "name": "MIT",
         "url": "https://opensource.org/licenses/MIT",
     },
+    lifespan=lifespan,
+)
+
+# Compress large responses such as the process list for clients that accept gzip
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=int(config.get("api", "gzip_minimum_size", "1024")),
+    compresslevel=int(config.get("api", "gzip_level", "5")),
 )
 
+# Outermost, so request durations include compression
+if stats.enabled:
+    app.add_middleware(InstrumentationMiddleware)
+
+
+@app.exception_handler(CollectorTimeoutError)
+async def collector_timeout_handler(request: Request, exc: CollectorTimeoutError):
+    """Report collectors that exceeded their timeout as 504 Gateway Timeout"""
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
+@app.exception_handler(StaleSnapshotError)
+async def stale_snapshot_handler(request: Request, exc: StaleSnapshotError):
+    """Report a stalled sampler as 503 Service Unavailable"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
 # Register routers
 app.include_router(cpu.router)
 app.include_router(memory.router)
@@ -40,6 +112,13 @@ app.include_router(network.router)
 app.include_router(sensors.router)
 app.include_router(system.router)
 app.include_router(process.router)
+app.include_router(history.router)
+app.include_router(stream.router)
+app.include_router(fleet.router)
+app.include_router(metrics.router)
+app.include_router(snapshot.router)
+app.include_router(cgroups.router)
+app.include_router(internal.router)
 
 
 @app.get("/", tags=["Root"])
@@ -66,15 +145,20 @@ if __name__ == "__main__":
     host = config.get("api", "host", "0.0.0.0")
     port = int(config.get("api", "port", "8000"))
     log_level = config.get("api", "log_level", "info")
+    workers = int(config.get("api", "workers", "1"))
     
     print(f"Starting System Monitor API v{__version__}")
     print(f"Server running on http://{host}:{port}")
     print(f"Documentation available at http://{host}:{port}/docs")
     
-    uvicorn.run(
-        app,
-        host=host,
-        port=port,
-        log_level=log_level
-    )
+    if workers > 1:
+        from system_monitor.shared_snapshot import serve
+        serve(host, port, log_level, workers)
+    else:
+        uvicorn.run(
+            app,
+            host=host,
+            port=port,
+            log_level=log_level
+        )
 
@@ -0,0 +1,28 @@
+"""
+Measurement types
+
+Named tuples returned by the metrics backends and the /proc fast path. They
+have the same field names as their psutil counterparts, so code written
+against psutil results works with any source.
+"""
+
+from collections import namedtuple
+
+# Field-compatible with psutil.virtual_memory(), net_io_counters() and disk_io_counters() on Linux
+svmem = namedtuple("svmem", ["total", "available", "percent", "used", "free", "active", "inactive",
+                             "buffers", "cached", "shared", "slab"])
+snetio = namedtuple("snetio", ["bytes_sent", "bytes_recv", "packets_sent", "packets_recv",
+                               "errin", "errout", "dropin", "dropout"])
+sdiskio = namedtuple("sdiskio", ["read_count", "write_count", "read_bytes", "write_bytes", "read_time",
+                                 "write_time", "read_merged_count", "write_merged_count", "busy_time"])
+sdiskpart = namedtuple("sdiskpart", ["device", "mountpoint", "fstype", "opts"])
+sdiskusage = namedtuple("sdiskusage", ["total", "used", "free", "percent"])
+snicaddr = namedtuple("snicaddr", ["family", "address", "netmask", "broadcast", "ptp"])
+snicstats = namedtuple("snicstats", ["isup", "duplex", "speed", "mtu", "flags"])
+sconn = namedtuple("sconn", ["fd", "family", "type", "laddr", "raddr", "status", "pid"])
+suser = namedtuple("suser", ["name", "terminal", "host", "started", "pid"])
+shwtemp = namedtuple("shwtemp", ["label", "current", "high", "critical"])
+sfan = namedtuple("sfan", ["label", "current"])
+sbattery = namedtuple("sbattery", ["percent", "secsleft", "power_plugged"])
+pmem = namedtuple("pmem", ["rss", "vms"])
+pio = namedtuple("pio", ["read_count", "write_count", "read_bytes", "write_bytes"])
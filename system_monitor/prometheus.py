@@ -0,0 +1,173 @@
+"""
+Prometheus text exposition
+
+Renders sampler snapshots in the Prometheus text format (version 0.0.4).
+Series prefixes (metric name plus encoded label set) are built once and
+reused across scrapes, so a scrape only formats the sample values.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# (name, type, help) for every exposed metric family
+FAMILIES = [
+    ("system_monitor_sample_timestamp_seconds", "gauge", "Unix time of the sample the values come from"),
+    ("system_monitor_cpu_usage_percent", "gauge", "Overall CPU utilization"),
+    ("system_monitor_cpu_core_usage_percent", "gauge", "Utilization of each logical CPU"),
+    ("system_monitor_load_average", "gauge", "System load average"),
+    ("system_monitor_memory_bytes", "gauge", "Virtual memory statistics"),
+    ("system_monitor_memory_usage_percent", "gauge", "Virtual memory in use"),
+    ("system_monitor_disk_total_bytes", "gauge", "Partition size"),
+    ("system_monitor_disk_used_bytes", "gauge", "Used space on the partition"),
+    ("system_monitor_disk_free_bytes", "gauge", "Free space on the partition"),
+    ("system_monitor_disk_usage_percent", "gauge", "Partition space in use"),
+    ("system_monitor_network_sent_bytes_total", "counter", "Bytes sent by the interface"),
+    ("system_monitor_network_received_bytes_total", "counter", "Bytes received by the interface"),
+    ("system_monitor_network_sent_packets_total", "counter", "Packets sent by the interface"),
+    ("system_monitor_network_received_packets_total", "counter", "Packets received by the interface"),
+    ("system_monitor_network_receive_errors_total", "counter", "Receive errors on the interface"),
+    ("system_monitor_network_transmit_errors_total", "counter", "Transmit errors on the interface"),
+    ("system_monitor_network_receive_drops_total", "counter", "Dropped incoming packets on the interface"),
+    ("system_monitor_network_transmit_drops_total", "counter", "Dropped outgoing packets on the interface"),
+    ("system_monitor_temperature_celsius", "gauge", "Temperature sensor reading"),
+    ("system_monitor_processes", "gauge", "Number of processes by status"),
+    ("system_monitor_sockets", "gauge", "Number of inet sockets by connection state"),
+]
+
+MEMORY_FIELDS = ("total", "available", "used", "free", "active", "inactive", "buffers", "cached", "shared", "slab")
+
+NIC_FIELDS = (
+    ("system_monitor_network_sent_bytes_total", "bytes_sent"),
+    ("system_monitor_network_received_bytes_total", "bytes_recv"),
+    ("system_monitor_network_sent_packets_total", "packets_sent"),
+    ("system_monitor_network_received_packets_total", "packets_recv"),
+    ("system_monitor_network_receive_errors_total", "errin"),
+    ("system_monitor_network_transmit_errors_total", "errout"),
+    ("system_monitor_network_receive_drops_total", "dropin"),
+    ("system_monitor_network_transmit_drops_total", "dropout"),
+)
+
+# Header lines are encoded once per process
+_HEADERS = {name: f"# HELP {name} {text}\n# TYPE {name} {kind}\n" for name, kind, text in FAMILIES}
+
+
+def _escape(value: str) -> str:
+    """Escape a label value as required by the text format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Renderer:
+    """
+    Renders snapshots into the Prometheus text format.
+
+    Keeps a cache of series prefixes such as ``name{device="sda1"} `` keyed
+    by metric name and label values, so label strings are escaped and joined
+    only the first time a series is seen.
+    """
+
+    MAX_CACHED_SERIES = 50000
+
+    def __init__(self):
+        self._prefixes: Dict[Tuple, str] = {}
+
+    def _prefix(self, name: str, labels: Tuple[Tuple[str, str], ...] = ()) -> str:
+        key = (name, labels)
+        prefix = self._prefixes.get(key)
+        if prefix is None:
+            if len(self._prefixes) >= self.MAX_CACHED_SERIES:
+                self._prefixes.clear()  # series churn, e.g. many short-lived interfaces
+            if labels:
+                encoded = ",".join(f'{label}="{_escape(str(value))}"' for label, value in labels)
+                prefix = f"{name}{{{encoded}}} "
+            else:
+                prefix = f"{name} "
+            self._prefixes[key] = prefix
+        return prefix
+
+    def render(self, snapshot: dict, temperatures: Optional[dict] = None,
+               process_statuses: Optional[Iterable[str]] = None, sockets: Optional[dict] = None) -> str:
+        """
+        Render a snapshot and the optional sensor, process and socket data.
+
+        Args:
+            snapshot: Snapshot produced by the background sampler
+            temperatures: Result of psutil.sensors_temperatures()
+            process_statuses: Status of every process in the process table
+            sockets: Socket index from the socket inventory
+
+        Returns:
+            The exposition text
+        """
+        out: List[str] = []
+        write = out.append
+        prefix = self._prefix
+        headers = _HEADERS
+
+        write(headers["system_monitor_sample_timestamp_seconds"])
+        write(f"{prefix('system_monitor_sample_timestamp_seconds')}{snapshot['sampled_at']}\n")
+
+        cpu = snapshot["cpu"]
+        write(headers["system_monitor_cpu_usage_percent"])
+        write(f"{prefix('system_monitor_cpu_usage_percent')}{cpu['percent']}\n")
+        write(headers["system_monitor_cpu_core_usage_percent"])
+        for core, percent in enumerate(cpu["per_cpu_percent"]):
+            write(f"{prefix('system_monitor_cpu_core_usage_percent', (('core', core),))}{percent}\n")
+        if cpu["load_avg"] is not None:
+            write(headers["system_monitor_load_average"])
+            for period, load in zip(("1m", "5m", "15m"), cpu["load_avg"]):
+                write(f"{prefix('system_monitor_load_average', (('period', period),))}{load}\n")
+
+        memory = snapshot["memory"]
+        write(headers["system_monitor_memory_bytes"])
+        for field in MEMORY_FIELDS:
+            value = getattr(memory, field, None)
+            if value is not None:
+                write(f"{prefix('system_monitor_memory_bytes', (('type', field),))}{value}\n")
+        write(headers["system_monitor_memory_usage_percent"])
+        write(f"{prefix('system_monitor_memory_usage_percent')}{memory.percent}\n")
+
+        partitions = snapshot["disk"]
+        for name, attribute in (("system_monitor_disk_total_bytes", "total"),
+                                ("system_monitor_disk_used_bytes", "used"),
+                                ("system_monitor_disk_free_bytes", "free"),
+                                ("system_monitor_disk_usage_percent", "percent")):
+            write(headers[name])
+            for partition, usage in partitions:
+                labels = (("device", partition.device), ("mountpoint", partition.mountpoint),
+                          ("fstype", partition.fstype))
+                write(f"{prefix(name, labels)}{getattr(usage, attribute)}\n")
+
+        io_pernic = snapshot["network"]["io_pernic"]
+        for name, attribute in NIC_FIELDS:
+            write(headers[name])
+            for nic, io in io_pernic.items():
+                write(f"{prefix(name, (('interface', nic),))}{getattr(io, attribute)}\n")
+
+        if temperatures:
+            write(headers["system_monitor_temperature_celsius"])
+            for sensor, entries in temperatures.items():
+                labels = [entry.label or str(index) for index, entry in enumerate(entries)]
+                repeated = {label for label, count in Counter(labels).items() if count > 1}
+                for index, (label, entry) in enumerate(zip(labels, entries)):
+                    series = (("sensor", sensor), ("label", label))
+                    if label in repeated:
+                        # e.g. one "Composite" per NVMe drive, which psutil lists under a single sensor name
+                        series += (("index", str(index)),)
+                    write(f"{prefix('system_monitor_temperature_celsius', series)}{entry.current}\n")
+
+        if process_statuses is not None:
+            write(headers["system_monitor_processes"])
+            for status, count in Counter(process_statuses).items():
+                write(f"{prefix('system_monitor_processes', (('status', status),))}{count}\n")
+
+        if sockets is not None:
+            write(headers["system_monitor_sockets"])
+            for state, count in sockets["by_state"].items():
+                write(f"{prefix('system_monitor_sockets', (('state', state),))}{count}\n")
+
+        return "".join(out)
+
+
+renderer = Renderer()
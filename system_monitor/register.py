@@ -3,22 +3,30 @@ Database Registration Agent
 
 Continuously monitors and registers system metrics to a PostgreSQL database.
 This allows centralized tracking of multiple system monitors.
+
+The agent runs either standalone (``python -m system_monitor.register``) or
+embedded in the API process (``[agent] embedded = true``), where it consumes
+the API's background sampler instead of collecting metrics itself.
 """
 
+import asyncio
+import threading
 import time
 import socket
 import platform
 import sys
-from typing import Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
 
 import psycopg2
-from psycopg2 import OperationalError, DatabaseError
+from psycopg2 import OperationalError, DatabaseError, InterfaceError
+from psycopg2.extras import execute_values
 
 import system_monitor.config as config
-import psutil
-
-# Prime the CPU measurement
-psutil.cpu_percent(interval=1)
+from system_monitor.backends import backend
+from system_monitor.collectors.disk import disk_collector
+from system_monitor.spool import Spool
 
 # Database connection variables
 conn: Optional[psycopg2.extensions.connection] = None
@@ -28,18 +36,25 @@ cursor: Optional[psycopg2.extensions.cursor] = None
 sql_insert = """
              INSERT INTO server_info(ip, hostname, access_port, cpu_percent, cpu_count, memory_percent, memory_total,
                                      disk_usage, updated_on)
-             VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+             VALUES (%(ip)s, %(hostname)s, %(access_port)s, %(cpu_percent)s, %(cpu_count)s, %(memory_percent)s,
+                     %(memory_total)s, %(disk_usage)s, %(updated_on)s)
              ON CONFLICT(ip) DO UPDATE SET 
-                                           hostname=%s,
-                                           access_port=%s,
-                                           cpu_percent=%s,
-                                           cpu_count=%s,
-                                           memory_percent=%s,
-                                           memory_total=%s,
-                                           disk_usage=%s,
-                                           updated_on=%s
+                                           hostname=EXCLUDED.hostname,
+                                           access_port=EXCLUDED.access_port,
+                                           cpu_percent=EXCLUDED.cpu_percent,
+                                           cpu_count=EXCLUDED.cpu_count,
+                                           memory_percent=EXCLUDED.memory_percent,
+                                           memory_total=EXCLUDED.memory_total,
+                                           disk_usage=EXCLUDED.disk_usage,
+                                           updated_on=EXCLUDED.updated_on
              """
 
+# SQL query for appending samples to the time-series table (used with execute_values)
+sql_insert_samples = """
+                     INSERT INTO server_samples(ip, sampled_on, cpu_percent, memory_percent, disk_usage)
+                     VALUES %s
+                     """
+
 register_flag = False
 
 
@@ -81,6 +96,28 @@ def get_hostname() -> str:
     return socket.gethostname()
 
 
+def connection_params() -> dict:
+    """
+    Read the PostgreSQL connection parameters from config.ini.
+
+    Returns:
+        Keyword arguments for psycopg2.connect
+
+    Raises:
+        ValueError: If a required database setting is missing
+    """
+    return {
+        "database": config.get("database", "db"),
+        "user": config.get("database", "username"),
+        "password": config.get("database", "password"),
+        "host": config.get("database", "host"),
+        "port": int(config.get("database", "port")),
+        "connect_timeout": int(config.get("database", "connect_timeout", "5")),
+        # A hung statement fails after this long instead of blocking the agent
+        "options": f"-c statement_timeout={int(float(config.get('database', 'statement_timeout', '10')) * 1000)}",
+    }
+
+
 def connect_to_database():
     """
     Establish connection to PostgreSQL database.
@@ -91,21 +128,10 @@ def connect_to_database():
     global conn, cursor
 
     try:
-        host = config.get("database", "host")
-        port = config.get("database", "port")
-        username = config.get("database", "username")
-        password = config.get("database", "password")
-        database = config.get("database", "db")
-
-        conn = psycopg2.connect(
-            database=database,
-            user=username,
-            password=password,
-            host=host,
-            port=int(port)
-        )
+        params = connection_params()
+        conn = psycopg2.connect(**params)
         cursor = conn.cursor()
-        print(f"Successfully connected to database at {host}:{port}")
+        print(f"Successfully connected to database at {params['host']}:{params['port']}")
         return True
     except (OperationalError, DatabaseError, ValueError) as e:
         print(f"Error connecting to database: {e}")
@@ -116,99 +142,434 @@ def connect_to_database():
         return False
 
 
-def total_disk_usage_percent() -> float:
+def total_disk_usage_percent(usages: Optional[list] = None) -> float:
     """
     Calculate the total disk usage percentage across all partitions.
 
+    Args:
+        usages: Disk usage results to aggregate; the cached partitions are read if omitted
+
     Returns:
         Total disk usage percentage as a float
     """
-    total = used = free = 0
-    for partition in psutil.disk_partitions(all=False):
+    if usages is None:
+        usages = [usage for _, usage in disk_collector.usages()]
+
+    total = sum(usage.total for usage in usages)
+    used = sum(usage.used for usage in usages)
+    return (used / total) * 100 if total else 0.00
+
+
+class SampleBuffer:
+    """
+    Buffers samples locally and writes them to the database in batches.
+
+    Each flush appends all buffered samples to server_samples with a single
+    multi-row INSERT, upserts the latest sample into server_info, and commits
+    once. If a flush fails the samples stay buffered, up to max_buffered
+    rows, until the agent moves them to the on-disk spool with drain().
+
+    The embedded agent adds samples on the event loop while a flush runs on
+    its writer thread, so the row deque is only changed under a lock.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, flush_interval: Optional[float] = None,
+                 max_buffered: Optional[int] = None):
+        self.batch_size = batch_size or int(config.get("agent", "batch_size", "100"))
+        self.flush_interval = flush_interval or float(config.get("agent", "flush_interval", "5"))
+        max_buffered = max_buffered or int(config.get("agent", "max_buffered", str(self.batch_size * 10)))
+        self.rows = deque(maxlen=max_buffered)
+        self.flushed_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def add(self, row: dict):
+        """
+        Buffer a sample.
+
+        Args:
+            row: Sample with the server_info column names as keys
+        """
+        with self._lock:
+            self.rows.append(row)
+
+    def drain(self) -> list:
+        """Remove and return all buffered samples."""
+        with self._lock:
+            rows = list(self.rows)
+            self.rows.clear()
+        return rows
+
+    def should_flush(self) -> bool:
+        """Check whether the batch size or the flush interval has been reached."""
+        if not self.rows:
+            return False
+        if self.flushed_at is None:
+            return True  # register the host as soon as the first sample is taken
+        return len(self.rows) >= self.batch_size or time.monotonic() - self.flushed_at >= self.flush_interval
+
+    def flush(self, connection, cursor) -> int:
+        """
+        Write all buffered samples in one transaction.
+
+        Args:
+            connection: Open database connection
+            cursor: Cursor on that connection
+
+        Returns:
+            Number of samples written
+        """
+        with self._lock:
+            rows = list(self.rows)
+        if not rows:
+            return 0
         try:
-            usage = psutil.disk_usage(partition.mountpoint)
-        except PermissionError:
-            continue  # skip restricted partitions
+            cursor.execute(sql_insert, rows[-1])
+            execute_values(
+                cursor, sql_insert_samples,
+                [(row["ip"], row["updated_on"], row["cpu_percent"], row["memory_percent"], row["disk_usage"])
+                 for row in rows],
+                page_size=self.batch_size,
+            )
+            connection.commit()
+        except Exception:
+            if not connection.closed:
+                connection.rollback()
+            raise
+        written = {id(row) for row in rows}
+        with self._lock:
+            # Rows that add() evicted during the write are already gone from the left
+            while self.rows and id(self.rows[0]) in written:
+                self.rows.popleft()
+        self.flushed_at = time.monotonic()
+        return len(rows)
+
+
+class Deadband:
+    """
+    Suppresses samples that do not differ meaningfully from the last written one.
 
-        total += usage.total
-        used += usage.used
-        free += usage.free
+    A sample is written when any metric moved by more than its configured
+    delta since the last written sample, or when the last write is older
+    than the heartbeat. Because the heartbeat is only checked when a sample
+    is taken, an idle host writes at most every heartbeat plus the maximum
+    sampling interval; RegistrationAgent keeps that under the fleet max_age.
+    """
 
-    return (used / total) * 100 if total else 0.00
+    def __init__(self, deltas: Optional[Dict[str, float]] = None, heartbeat: Optional[float] = None):
+        if deltas is None:
+            deltas = {
+                "cpu_percent": float(config.get("deadband", "cpu_percent", "5")),
+                "memory_percent": float(config.get("deadband", "memory_percent", "2")),
+                "disk_usage": float(config.get("deadband", "disk_usage", "1")),
+                # Static values are written whenever they change at all
+                "cpu_count": 0.0,
+                "memory_total": 0.0,
+            }
+        self.deltas = deltas
+        self.heartbeat = heartbeat or float(config.get("deadband", "heartbeat", "30"))
+        self.last: Optional[dict] = None
+
+    def changed(self, row: dict) -> bool:
+        """
+        Check whether any metric moved by more than its delta since the last written sample.
+
+        Metrics that can be unknown, such as the physical core count, count as
+        changed when they become known or unknown.
+
+        Args:
+            row: Sample with the server_info column names as keys
+
+        Returns:
+            True if the sample crossed a deadband
+        """
+        if self.last is None:
+            return True
+        for key, delta in self.deltas.items():
+            current, last = row[key], self.last[key]
+            if current is None or last is None:
+                if current != last:
+                    return True
+            elif abs(current - last) > delta:
+                return True
+        return False
 
+    def heartbeat_due(self, row: dict) -> bool:
+        """Check whether the last written sample is older than the heartbeat."""
+        return self.last is None or row["updated_on"] - self.last["updated_on"] >= self.heartbeat * 1000
 
-def register():
+    def written(self, row: dict):
+        """Record a sample as the new reference for the deadbands."""
+        self.last = row
+
+
+class AdaptiveInterval:
     """
-    Main registration loop that continuously updates system metrics to the database.
+    Sampling interval that tightens while metrics are volatile and relaxes while idle.
+
+    The interval drops to min_interval as soon as a sample crosses a deadband
+    and grows by ``backoff`` after every unchanged sample, up to max_interval.
     """
-    global register_flag, conn, cursor
 
-    if not connect_to_database():
-        print("Failed to connect to database. Exiting.")
-        sys.exit(1)
+    def __init__(self, min_interval: Optional[float] = None, max_interval: Optional[float] = None,
+                 backoff: Optional[float] = None):
+        self.min_interval = min_interval or float(config.get("deadband", "min_interval", "1"))
+        self.max_interval = max(self.min_interval, max_interval or float(config.get("deadband", "max_interval", "10")))
+        self.backoff = backoff or float(config.get("deadband", "backoff", "1.5"))
+        self.interval = self.min_interval
 
-    ip_address = get_ip_address()
-    host_name = get_hostname()
-    access_port = config.get("api", "port", "8000")
+    def update(self, changed: bool) -> float:
+        """
+        Adjust the interval after a sample.
 
-    print(f"Starting registration agent for {ip_address}:{access_port}")
-    print(f"Hostname: {host_name}")
+        Args:
+            changed: Whether the sample crossed a deadband
 
-    # Prime CPU measurement
-    psutil.cpu_percent(interval=1)
+        Returns:
+            Seconds to wait before the next sample
+        """
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        return self.interval
 
-    while True:
-        try:
-            virtual_memory = psutil.virtual_memory()
-            cpu_percent = psutil.cpu_percent(interval=1)
-            disk_percent = round(total_disk_usage_percent(), 2)
-            timestamp = int(time.time() * 1000)
-
-            cursor.execute(sql_insert,
-                           (ip_address,
-                            host_name,
-                            access_port,
-                            cpu_percent,
-                            psutil.cpu_count(logical=False),
-                            virtual_memory.percent,
-                            virtual_memory.total / 1024 ** 3,
-                            disk_percent,
-                            timestamp,
-                            host_name,
-                            access_port,
-                            cpu_percent,
-                            psutil.cpu_count(logical=False),
-                            virtual_memory.percent,
-                            virtual_memory.total / 1024 ** 3,
-                            disk_percent,
-                            timestamp
-                            ))
-            conn.commit()
-
-            if not register_flag:
-                print(f"Successfully registered {ip_address}:{access_port} to database")
-                register_flag = True
 
-            time.sleep(1)
+class RegistrationAgent:
+    """
+    Turns samples into database writes.
+
+    Applies the deadbands, buffers samples, writes them in batches, replays
+    the spool after outages and spools samples while the database is
+    unreachable. The methods that touch the database or the spool block and
+    are run in a worker thread by the embedded agent.
+    """
 
-        except (OperationalError, DatabaseError) as e:
-            print(f"Database error: {e}")
+    def __init__(self):
+        self.spool = Spool()
+        self.replay_batches = int(config.get("spool", "replay_batches", "1"))
+        self.buffer = SampleBuffer()
+        self.deadband = Deadband()
+        self.interval = AdaptiveInterval()
+        self.check_heartbeat(float(config.get("fleet", "max_age", "60")))
+        self.retry_at = 0.0
+        self.ip_address = get_ip_address()
+        self.host_name = get_hostname()
+        self.access_port = config.get("api", "port", "8000")
+
+    def check_heartbeat(self, max_age: float):
+        """
+        Shorten the heartbeat if an idle host could look dead to /api/v1/fleet.
+
+        An idle host's server_info row is refreshed at most every heartbeat
+        plus the maximum sampling interval plus the flush interval, which must
+        stay below the fleet's max_age.
+
+        Args:
+            max_age: Seconds after which the fleet endpoint considers a host gone
+        """
+        limit = max_age - self.interval.max_interval - self.buffer.flush_interval
+        if self.deadband.heartbeat > limit:
+            heartbeat = max(self.interval.min_interval, limit)
+            print(f"[deadband] heartbeat of {self.deadband.heartbeat:g}s plus max_interval and flush_interval "
+                  f"exceeds the fleet max_age of {max_age:g}s, using a heartbeat of {heartbeat:g}s")
+            self.deadband.heartbeat = heartbeat
+
+    def start(self):
+        """Connect to the database, falling back to spooling if it is unreachable."""
+        if not connect_to_database():
+            print(f"Failed to connect to database. "
+                  f"Samples will be spooled to {self.spool.directory} until it is reachable.")
+            self.retry_at = time.monotonic() + 5
+        print(f"Starting registration agent for {self.ip_address}:{self.access_port}")
+        print(f"Hostname: {self.host_name}")
+
+    def make_row(self, cpu_percent: float, cpu_count: int, virtual_memory, disk_percent: float) -> dict:
+        """Build a sample with the server_info column names as keys."""
+        return {
+            "ip": self.ip_address,
+            "hostname": self.host_name,
+            "access_port": self.access_port,
+            "cpu_percent": cpu_percent,
+            "cpu_count": cpu_count,
+            "memory_percent": virtual_memory.percent,
+            "memory_total": virtual_memory.total / 1024 ** 3,
+            "disk_usage": round(disk_percent, 2),
+            "updated_on": int(time.time() * 1000),
+        }
+
+    def record(self, row: dict) -> float:
+        """
+        Buffer a sample if it crossed a deadband or the heartbeat is due.
+
+        Args:
+            row: Sample built by make_row
+
+        Returns:
+            Seconds to wait before taking the next sample
+        """
+        changed = self.deadband.changed(row)
+        if changed or self.deadband.heartbeat_due(row):
+            self.buffer.add(row)
+            self.deadband.written(row)
+        return self.interval.update(changed)
+
+    def write(self):
+        """
+        Flush buffered samples and replay part of the spool when a flush is due.
+
+        Raises:
+            OperationalError, DatabaseError, InterfaceError: If the database is unavailable
+        """
+        global register_flag
+
+        if not self.buffer.should_flush():
+            return
+        if conn is None or conn.closed:
+            raise OperationalError("Not connected to database")
+        self.buffer.flush(conn, cursor)
+
+        # Catch up on samples spooled during an outage, a bounded number of batches at a time
+        if self.spool.pending():
+            replayed = self.spool.replay(conn, cursor, self.replay_batches)
+            if replayed:
+                print(f"Replayed {replayed} spooled samples")
+
+        if not register_flag:
+            print(f"Successfully registered {self.ip_address}:{self.access_port} to database")
+            register_flag = True
+
+    def flush(self):
+        """Write when a flush is due, spooling and reconnecting if the database fails."""
+        try:
+            self.write()
+        except (OperationalError, DatabaseError, InterfaceError) as e:
+            self.database_error(e)
+
+    def database_error(self, error: Exception):
+        """Spool the buffered samples and try to reconnect, at most every 5 seconds."""
+        # Keep sampling through the outage; samples go to the spool instead of being dropped
+        self.spool.append(self.buffer.drain())
+        if time.monotonic() >= self.retry_at:
+            print(f"Database error: {error}")
+            print(f"Spooled samples: {self.spool.size()} bytes in {self.spool.directory}")
             print("Attempting to reconnect...")
             if connect_to_database():
                 print("Reconnected successfully")
             else:
                 print("Reconnection failed. Retrying in 5 seconds...")
-                time.sleep(5)
+                self.retry_at = time.monotonic() + 5
+
+    def stop(self):
+        """Write or spool the remaining samples and close the connection."""
+        try:
+            if conn is None or conn.closed:
+                raise OperationalError("Not connected to database")
+            self.buffer.flush(conn, cursor)
+        except (OperationalError, DatabaseError, InterfaceError) as e:
+            print(f"Could not write buffered samples, spooling them: {e}")
+            self.spool.append(self.buffer.drain())
+        if conn:
+            conn.close()
+
+
+def register():
+    """
+    Main registration loop that continuously updates system metrics to the database.
+    """
+    agent = RegistrationAgent()
+    agent.start()
+
+    # Prime CPU measurement
+    backend.cpu_percent()
+    time.sleep(1)
+    cpu_count = backend.cpu_count(logical=False)
+
+    while True:
+        try:
+            backend.tick()
+            row = agent.make_row(
+                # CPU usage averaged over the whole time since the previous sample
+                backend.cpu_percent()[0],
+                cpu_count,
+                backend.virtual_memory(),
+                total_disk_usage_percent(),
+            )
+            delay = agent.record(row)
+            agent.write()
+            time.sleep(delay)
+
+        except (OperationalError, DatabaseError, InterfaceError) as e:
+            agent.database_error(e)
+            time.sleep(1)
         except KeyboardInterrupt:
             print("\nShutting down registration agent...")
-            if conn:
-                conn.close()
+            agent.stop()
             sys.exit(0)
         except Exception as e:
             print(f"Unexpected error: {e}")
             time.sleep(1)
 
 
+# Database and spool I/O of the embedded agent; one thread so writes never overlap
+# and a hung write cannot take collector slots away from the API
+agent_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent")
+
+
+def _report(future: asyncio.Future):
+    """Print an unexpected error of a background flush."""
+    if not future.cancelled() and future.exception() is not None:
+        print(f"Unexpected error: {future.exception()}")
+
+
+async def run_embedded(sampler):
+    """
+    Run the registration loop as an asyncio task inside the API process.
+
+    Samples come from the API's background sampler, so metrics are collected
+    once per tick for both the endpoints and the database. Database and spool
+    I/O run on the agent's own thread without being awaited: while a flush is
+    still running, later ticks only buffer their samples, and a hung write
+    (bounded by ``[database] statement_timeout``) never holds a collector slot.
+
+    Args:
+        sampler: The API's background sampler
+    """
+    from system_monitor.instrumentation import stats
+
+    loop = asyncio.get_running_loop()
+    agent = await loop.run_in_executor(agent_executor, RegistrationAgent)
+    await loop.run_in_executor(agent_executor, agent.start)
+    next_sample = 0.0
+    flushing: Optional[asyncio.Future] = None
+
+    try:
+        while True:
+            snapshot = await sampler.next_snapshot()
+            # Half a tick of tolerance so a delay equal to the sampler interval does not skip a tick
+            if loop.time() < next_sample - sampler.interval / 2:
+                continue
+            try:
+                row = agent.make_row(
+                    snapshot["cpu"]["percent"],
+                    snapshot["cpu"]["physical_count"],
+                    snapshot["memory"],
+                    total_disk_usage_percent([usage for _, usage in snapshot["disk"]]),
+                )
+                next_sample = loop.time() + agent.record(row)
+            except Exception as e:
+                print(f"Unexpected error: {e}")
+                continue
+            if flushing is not None and not flushing.done():
+                stats.count("agent.flush_skipped")
+                continue
+            flushing = loop.run_in_executor(agent_executor, agent.flush)
+            flushing.add_done_callback(_report)
+    finally:
+        print("Shutting down embedded registration agent...")
+        if flushing is not None:
+            await asyncio.wait({flushing})
+        await loop.run_in_executor(agent_executor, agent.stop)
+
+
 if __name__ == "__main__":
     register()
-
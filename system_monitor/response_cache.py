@@ -0,0 +1,109 @@
+"""
+Response cache
+
+Keeps encoded response bodies of slowly changing routes for a configurable
+time-to-live, keyed by route, query string and negotiated media type. Every
+body carries an ETag derived from its content, so polling clients that send
+If-None-Match get an empty 304 Not Modified while the body is unchanged, and
+the server skips both collection and encoding until the entry expires.
+"""
+
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+import system_monitor.config as config
+from system_monitor.encoding import encode, negotiate
+from system_monitor.instrumentation import stats
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    media_type: str
+    etag: str
+    created: float
+    expires: float
+
+
+def etag_for(body: bytes) -> str:
+    """
+    Build a weak ETag from a response body.
+
+    The tag is weak because GZipMiddleware may compress the body after it is
+    computed, which changes the bytes but not the content.
+    """
+    return f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag using weak comparison."""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Per-route cache of encoded responses.
+
+    The time-to-live of a route is ``ttl_<name>`` in the [cache] section,
+    falling back to ``ttl``. With a TTL of 0 nothing is stored, but responses
+    still carry an ETag and matching conditional requests still get a 304.
+    """
+
+    MAX_ENTRIES = 1024
+
+    def __init__(self):
+        self.entries: Dict[Tuple, CachedResponse] = {}
+        self._ttls: Dict[str, float] = {}
+
+    def ttl(self, name: str) -> float:
+        ttl = self._ttls.get(name)
+        if ttl is None:
+            ttl = float(config.get("cache", f"ttl_{name}", config.get("cache", "ttl", "0")))
+            self._ttls[name] = ttl
+        return ttl
+
+    async def respond(self, request: Request, name: str, produce: Callable[[], Awaitable[Any]]) -> Response:
+        """
+        Answer a request from the cache, producing and encoding the payload on a miss.
+
+        Args:
+            request: The incoming request
+            name: Route name, used for the TTL setting and as part of the cache key
+            produce: Coroutine function returning the JSON-compatible payload
+
+        Returns:
+            The encoded response, or an empty 304 if the client already has it
+        """
+        now = time.monotonic()
+        key = (name, negotiate(request), tuple(sorted(request.query_params.multi_items())))
+        entry = self.entries.get(key)
+        if entry is not None and entry.expires > now:
+            stats.count(f"cache.{name}.hit")
+        else:
+            stats.count(f"cache.{name}.miss")
+            body, media_type = encode(request, await produce())
+            ttl = self.ttl(name)
+            entry = CachedResponse(body, media_type, etag_for(body), now, now + ttl)
+            if ttl > 0:
+                if len(self.entries) >= self.MAX_ENTRIES:
+                    self.entries.clear()  # many distinct query strings
+                self.entries[key] = entry
+
+        headers = {"ETag": entry.etag, "Vary": "Accept", "Age": str(int(now - entry.created))}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            stats.count(f"cache.{name}.not_modified")
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+
+response_cache = ResponseCache()
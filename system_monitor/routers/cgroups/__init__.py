@@ -0,0 +1 @@
+"""cgroup v2 container accounting endpoints"""
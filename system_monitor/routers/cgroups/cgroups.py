@@ -0,0 +1,78 @@
+"""cgroup v2 container accounting endpoints"""
+
+import time
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from psutil._common import bytes2human
+
+from system_monitor.collectors.cgroups import cgroup_collector
+from system_monitor.encoding import FORMAT_QUERY, respond
+from system_monitor.executor import run_collector
+
+router = APIRouter(
+    prefix="/api/v1/cgroups",
+    tags=["Cgroups"],
+)
+
+
+@router.get("/")
+async def get_cgroups(
+        request: Request,
+        children: Optional[bool] = Query(None, description="Include descendant cgroups (default: [cgroups] children)"),
+        format: str = FORMAT_QUERY,
+):
+    """
+    Get CPU, memory, I/O and PID accounting of the monitor's cgroup and its children.
+
+    Values come from the cgroup v2 files (cpu.stat, cpu.max, memory.current,
+    memory.max, memory.stat, io.stat, cgroup.procs), so in a container they
+    describe the container rather than the host.
+
+    Returns:
+        - cgroup: The monitor's own cgroup path
+        - cgroups: One entry per cgroup with
+            - cpu: cpu.stat counters, the CPU limit in CPUs (null if unlimited),
+              usage_percent (100 = one busy CPU) and limit_percent since the previous read
+            - memory: current and max bytes, percent of max and the memory.stat breakdown
+            - io: Read/write bytes and operations in total and per device, and byte rates
+            - pids: Processes in the cgroup
+        - sampled_at: Unix timestamp of the read
+
+    Rates are null on the first read of a cgroup. With format=raw memory and
+    I/O sizes are integer bytes.
+    """
+    if not cgroup_collector.available():
+        raise HTTPException(status_code=404, detail="cgroup v2 is not available on this host")
+    entries = await run_collector("cgroups", cgroup_collector.refresh, children)
+    if format != "raw":
+        entries = [format_cgroup(entry) for entry in entries]
+    return respond(request, {"cgroup": cgroup_collector.cgroup, "cgroups": entries, "sampled_at": time.time()})
+
+
+def _size(value: Optional[float]) -> Optional[str]:
+    return None if value is None else bytes2human(value)
+
+
+def format_cgroup(entry: dict) -> dict:
+    """
+    Convert a cgroup entry into the human-readable response format.
+
+    Args:
+        entry: Entry produced by the cgroup collector
+
+    Returns:
+        Copy of the entry with memory and I/O sizes as strings
+    """
+    memory = entry["memory"]
+    formatted = dict(entry, memory=dict(memory, current=_size(memory["current"]), max=_size(memory["max"])))
+    io = entry["io"]
+    if io is not None:
+        formatted["io"] = dict(
+            io,
+            read_bytes=_size(io["read_bytes"]),
+            write_bytes=_size(io["write_bytes"]),
+            read_bytes_per_second=_size(io["read_bytes_per_second"]),
+            write_bytes_per_second=_size(io["write_bytes_per_second"]),
+        )
+    return formatted
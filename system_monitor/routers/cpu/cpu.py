@@ -1,7 +1,9 @@
 """CPU monitoring endpoints"""
 
-import psutil
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+
+from system_monitor.encoding import respond
+from system_monitor.sampler import sampler
 
 router = APIRouter(
     prefix="/api/v1/cpu",
@@ -10,7 +12,7 @@ router = APIRouter(
 
 
 @router.get("/")
-async def get_cpu_usage():
+async def get_cpu_usage(request: Request):
     """
     Get comprehensive CPU usage statistics.
     
@@ -19,16 +21,32 @@ async def get_cpu_usage():
         - cpu_utilization: Overall CPU usage percentage
         - per_cpu_utilization: Usage percentage for each CPU core
         - load_avg: System load average (1min, 5min, 15min) as percentages
+        - sampled_at: Unix timestamp of the sample the values come from
+    """
+    return respond(request, cpu_usage(await sampler.latest()))
+
+
+def cpu_usage(snapshot: dict) -> dict:
+    """
+    Build the CPU usage response from a sampler snapshot.
+
+    Args:
+        snapshot: Snapshot produced by the background sampler
+
+    Returns:
+        Dictionary with CPU usage statistics
     """
-    try:
-        cpu_avg = [round(x / psutil.cpu_count() * 100, 2) for x in psutil.getloadavg()]
-    except (AttributeError, OSError):
+    cpu = snapshot["cpu"]
+    if cpu["load_avg"] is not None:
+        cpu_avg = [round(x / cpu["count"] * 100, 2) for x in cpu["load_avg"]]
+    else:
         # getloadavg() not available on Windows
         cpu_avg = [0.0, 0.0, 0.0]
-    
+
     return {
-        "physical_cpu_count": psutil.cpu_count(logical=False),
-        "cpu_utilization": psutil.cpu_percent(interval=1),
-        "per_cpu_utilization": psutil.cpu_percent(interval=1, percpu=True),
-        "load_avg": cpu_avg
+        "physical_cpu_count": cpu["physical_count"],
+        "cpu_utilization": cpu["percent"],
+        "per_cpu_utilization": cpu["per_cpu_percent"],
+        "load_avg": cpu_avg,
+        "sampled_at": snapshot["sampled_at"],
     }
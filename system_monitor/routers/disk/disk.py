@@ -1,6 +1,10 @@
-import psutil
-import os
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+
+from system_monitor.collectors.disk import disk_collector, disk_io_rates
+from system_monitor.encoding import FORMAT_QUERY, respond
+from system_monitor.executor import run_collector
+from system_monitor.response_cache import response_cache
+from system_monitor.sampler import sampler
 
 router = APIRouter(
     prefix="/api/v1/disk",  # all routes here start with /api/v1/disk
@@ -17,8 +21,16 @@ def get_size(bytes, suffix="B"):
         bytes /= factor
 
 
+def _format_percent(value: float) -> str:
+    return f"{value:.2f}%"
+
+
+def _identity(value):
+    return value
+
+
 @router.get("/")
-async def get_disk_usage():
+async def get_disk_usage(request: Request, format: str = FORMAT_QUERY):
     """
     Get disk usage statistics for all mounted partitions.
     
@@ -29,46 +41,100 @@ async def get_disk_usage():
         - used_percent: Percentage of disk space used
         - free_percent: Percentage of disk space free
         - partitions: Detailed information for each partition
+        - sampled_at: Unix timestamp of the sample the values come from
+
+    With format=raw sizes are integer bytes and percentages are floats.
+    The response carries an ETag and is cached for ``[cache] ttl_disk``
+    seconds (default 0, i.e. every request reads the latest sample).
+    """
+    async def produce():
+        return disk_usage(await sampler.latest(), raw=format == "raw")
+
+    return await response_cache.respond(request, "disk", produce)
+
+
+@router.get("/partitions")
+async def get_disk_partitions(request: Request):
+    """
+    Get the partition layout without usage figures.
+
+    The layout only changes when filesystems are mounted or unmounted, so the
+    response is cached for ``[cache] ttl_disk_partitions`` seconds and carries
+    an ETag; requests with a matching If-None-Match get 304 Not Modified.
+
+    Returns:
+        List of partitions with device, mountpoint, fstype and mount options
     """
+    async def produce():
+        partitions = await run_collector("disk", disk_collector.partitions)
+        return [
+            {"device": partition.device, "mountpoint": partition.mountpoint, "fstype": partition.fstype,
+             "opts": partition.opts}
+            for partition in partitions
+        ]
+
+    return await response_cache.respond(request, "disk_partitions", produce)
+
+
+@router.get("/io")
+async def get_disk_io(request: Request):
+    """
+    Get per-device I/O activity between the two latest background samples.
+
+    Returns:
+        - devices: Per-device read/write bytes per second, read/write IOPS,
+          utilization percentage (null where the platform has no busy time)
+          and average await in milliseconds
+        - sampled_at: Unix timestamp of the latest sample
+    """
+    snapshot = await sampler.latest()
+    return respond(request, {
+        "devices": [{"device": device, **rates} for device, rates in disk_io_rates.rates.items()],
+        "sampled_at": snapshot["sampled_at"],
+    })
+
+
+def disk_usage(snapshot: dict, raw: bool = False) -> dict:
+    """
+    Build the disk usage response from a sampler snapshot.
+
+    Args:
+        snapshot: Snapshot produced by the background sampler
+        raw: Return integer bytes and float percentages instead of formatted strings
+
+    Returns:
+        Dictionary with totals and per-partition disk usage
+    """
+    size = _identity if raw else get_size
+    percent = _identity if raw else _format_percent
     total = used = free = 0
     partitions_info = []
 
-    for partition in psutil.disk_partitions(all=False):
-        try:
-            usage = psutil.disk_usage(partition.mountpoint)
-        except PermissionError:
-            continue  # skip restricted partitions
-
+    for partition, usage in snapshot["disk"]:
         total += usage.total
         used += usage.used
         free += usage.free
 
-        used_percent = (usage.used / usage.total) * 100
+        used_percent = (usage.used / usage.total) * 100 if usage.total else 0.0
         free_percent = 100 - used_percent
 
         partitions_info.append({
             "device": partition.device,
-            "total": get_size(usage.total),
-            "used": get_size(usage.used),
-            "free": get_size(usage.free),
-            "used_percent": f"{used_percent:.2f}%",
-            "free_percent": f"{free_percent:.2f}%",
+            "total": size(usage.total),
+            "used": size(usage.used),
+            "free": size(usage.free),
+            "used_percent": percent(used_percent),
+            "free_percent": percent(free_percent),
             "fstype": partition.fstype,
             "mountpoint": partition.mountpoint
         })
 
-    total = used = free = 0
-    for partition in partitions_info:
-        size = psutil.disk_usage(partition["mountpoint"])
-        total += size.total
-        used += size.used
-        free += size.free
-
     return {
-        "total": get_size(total),
-        "used": get_size(used),
-        "free": get_size(free),
-        "used_percent": f"{(used / total * 100):.2f}%" if total else "0.00%",
-        "free_percent": f"{(free / total * 100):.2f}%" if total else "0.00%",
-        "partitions": partitions_info
-    }
\ No newline at end of file
+        "total": size(total),
+        "used": size(used),
+        "free": size(free),
+        "used_percent": percent(used / total * 100 if total else 0.0),
+        "free_percent": percent(free / total * 100 if total else 0.0),
+        "partitions": partitions_info,
+        "sampled_at": snapshot["sampled_at"],
+    }
@@ -0,0 +1 @@
+"""Fleet-wide monitoring endpoints"""
@@ -0,0 +1,167 @@
+"""Fleet-wide monitoring endpoints"""
+
+import asyncio
+import threading
+import time
+from typing import List, Optional
+
+import httpx
+import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
+from fastapi import APIRouter, HTTPException, Query, Request
+
+import system_monitor.config as config
+from system_monitor.encoding import respond
+from system_monitor.executor import run_collector
+from system_monitor.register import connection_params
+
+router = APIRouter(
+    prefix="/api/v1/fleet",
+    tags=["Fleet"],
+)
+
+FLEET_METRICS = ("cpu", "memory", "disk", "network", "process", "sensors", "system")
+
+CONCURRENCY = int(config.get("fleet", "concurrency", "50"))
+DEFAULT_TIMEOUT = float(config.get("fleet", "timeout", "2"))
+DEFAULT_MAX_AGE = float(config.get("fleet", "max_age", "60"))
+DB_POOL_SIZE = int(config.get("fleet", "db_pool_size", "4"))
+
+sql_live_hosts = """
+                 SELECT ip, hostname, access_port
+                 FROM server_info
+                 WHERE updated_on > %s
+                 ORDER BY ip
+                 """
+
+_client: Optional[httpx.AsyncClient] = None
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY),
+        )
+    return _client
+
+
+async def close_client():
+    """Close the shared HTTP client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_pool() -> ThreadedConnectionPool:
+    """Get the shared database connection pool, creating it on first use."""
+    global _pool
+    # Called from collector threads
+    with _pool_lock:
+        if _pool is None:
+            # One connection stays open between requests, up to db_pool_size during concurrent ones
+            _pool = ThreadedConnectionPool(1, DB_POOL_SIZE, **connection_params())
+        return _pool
+
+
+def close_pool():
+    """Close the shared database connection pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+
+
+def get_live_hosts(max_age: float) -> List[dict]:
+    """
+    Read the hosts that reported to server_info within max_age seconds.
+
+    The query runs on a pooled connection; connections that failed are
+    discarded instead of being returned to the pool.
+
+    Args:
+        max_age: Maximum age of updated_on in seconds
+
+    Returns:
+        List of dictionaries with ip, hostname and access_port
+    """
+    cutoff = int((time.time() - max_age) * 1000)
+    pool = get_pool()
+    connection = pool.getconn()
+    broken = False
+    try:
+        # A single read; autocommit keeps pooled connections out of open transactions
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(sql_live_hosts, (cutoff,))
+            return [{"ip": ip, "hostname": hostname, "access_port": port} for ip, hostname, port in cursor.fetchall()]
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+    finally:
+        pool.putconn(connection, close=broken or bool(connection.closed))
+
+
+@router.get("/{metric}")
+async def get_fleet_metric(
+        metric: str,
+        request: Request,
+        timeout: float = Query(DEFAULT_TIMEOUT, gt=0, description="Per-host deadline in seconds"),
+        max_age: float = Query(DEFAULT_MAX_AGE, gt=0, description="Only include hosts that reported within this many seconds"),
+):
+    """
+    Query a metric on every live host in the fleet concurrently.
+
+    Live hosts are read from server_info. Each host's /api/v1/{metric}/
+    endpoint is requested over a pooled HTTP client with a per-host deadline
+    covering the whole request and a cap on concurrent requests. Any other
+    query parameters are forwarded to the hosts.
+
+    Returns:
+        - metric: The requested metric
+        - hosts: Number of live hosts queried
+        - succeeded / failed: Number of hosts that answered or failed
+        - elapsed: Seconds taken by the whole sweep
+        - results: Per-host entries with ip, hostname, access_port, status and data or error
+    """
+    if metric not in FLEET_METRICS:
+        raise HTTPException(status_code=404, detail=f"Unknown metric '{metric}'")
+
+    try:
+        hosts = await run_collector("fleet", get_live_hosts, max_age)
+    except (psycopg2.Error, ValueError) as e:
+        raise HTTPException(status_code=503, detail=f"Cannot read server registry: {e}")
+
+    params = [(key, value) for key, value in request.query_params.multi_items() if key not in ("timeout", "max_age")]
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    client = get_client()
+
+    async def query(host: dict) -> dict:
+        url = f"http://{host['ip']}:{host['access_port']}/api/v1/{metric}/"
+        async with semaphore:
+            try:
+                # httpx applies the timeout to each phase (connect, every read); wait_for bounds the total
+                response = await asyncio.wait_for(client.get(url, params=params, timeout=timeout), timeout)
+                response.raise_for_status()
+                return {**host, "status": "ok", "data": response.json()}
+            except (asyncio.TimeoutError, httpx.TimeoutException):
+                return {**host, "status": "error", "error": f"Timed out after {timeout:g}s"}
+            except (httpx.HTTPError, ValueError) as e:
+                return {**host, "status": "error", "error": str(e) or type(e).__name__}
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(query(host) for host in hosts))
+    succeeded = sum(1 for result in results if result["status"] == "ok")
+    return respond(request, {
+        "metric": metric,
+        "hosts": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "elapsed": round(time.perf_counter() - started, 3),
+        "results": results,
+    })
@@ -0,0 +1 @@
+"""Metrics history endpoints"""
@@ -0,0 +1,39 @@
+"""Metrics history endpoints"""
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from system_monitor.encoding import respond
+from system_monitor.executor import run_collector
+from system_monitor.history import METRICS, history
+
+router = APIRouter(
+    prefix="/api/v1/history",
+    tags=["History"],
+)
+
+
+@router.get("/{metric}")
+async def get_metric_history(
+        metric: str,
+        request: Request,
+        since: Optional[float] = Query(None, description="Only include samples taken at or after this Unix timestamp"),
+        step: float = Query(60.0, gt=0, description="Bucket width in seconds"),
+):
+    """
+    Get the recorded history of a metric downsampled into fixed-width buckets.
+
+    Available metrics are cpu (total and per core), memory (percent, used,
+    available), network (bytes sent/received per second for each NIC) and
+    disk (bytes read/written per second for each disk).
+
+    Returns:
+        - metric: The requested metric
+        - step: Bucket width in seconds
+        - timestamps: Start timestamp of each bucket
+        - series: For each series, lists of min, avg and max values per bucket
+    """
+    if metric not in METRICS:
+        raise HTTPException(status_code=404, detail=f"Unknown metric '{metric}'")
+    return respond(request, await run_collector("history", history.query, metric, since, step))
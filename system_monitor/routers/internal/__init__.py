@@ -0,0 +1 @@
+"""Self-instrumentation endpoints"""
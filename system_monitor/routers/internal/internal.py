@@ -0,0 +1,80 @@
+"""Self-instrumentation endpoints"""
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from system_monitor.encoding import respond
+from system_monitor.executor import in_flight
+from system_monitor.instrumentation import profiler, stats
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+)
+
+
+@router.get("/stats")
+async def get_stats(request: Request):
+    """
+    Get the server's own timing histograms and counters.
+
+    Returns:
+        Dictionary with:
+            - collectors: Run time of every run_collector call by collector name
+            - phases: Steps inside collections and responses (process.scan, sockets.scan,
+              process.format, encode.json, encode.msgpack)
+            - routes: Complete request durations by method and route template
+            - event_loop_lag: How late the event loop wakes up, i.e. time it spent blocked
+            - counters: Processes and sockets skipped on NoSuchProcess/AccessDenied, and
+              collector timeouts, and callers that shared a concurrent identical
+              collection (coalesced.<name>)
+            - in_flight: Collections currently queued or running, by collector name
+        Durations are in milliseconds; each histogram reports count, sum, mean,
+        max, estimated p50/p90/p99 and cumulative bucket counts.
+    """
+    return respond(request, dict(stats.report(), in_flight=in_flight()))
+
+
+@router.post("/profile", status_code=202)
+async def start_profile(
+        request: Request,
+        path: str = Query(..., description="Exact request path to profile, e.g. /api/v1/process/"),
+        requests: int = Query(5, ge=1, description="Number of requests to capture"),
+        mode: str = Query("cprofile", pattern="^(cprofile|sample)$",
+                          description="'cprofile' for the event loop thread, 'sample' for stacks of all threads"),
+):
+    """
+    Profile the next requests to a path.
+
+    Profiling is opt-in ([instrumentation] profiling = true) and rate-limited:
+    one capture at a time, a new one at most every profile_min_interval
+    seconds. Fetch the result with GET /internal/profile.
+    """
+    if not profiler.enabled:
+        raise HTTPException(status_code=403, detail="Profiling is disabled, set [instrumentation] profiling = true")
+    if requests > profiler.max_requests:
+        raise HTTPException(status_code=400, detail=f"At most {profiler.max_requests} requests can be profiled")
+    if profiler.busy():
+        raise HTTPException(status_code=409, detail=f"A capture of {profiler.capture.path} is still running")
+    retry_after = profiler.retry_after()
+    if retry_after > 0:
+        raise HTTPException(status_code=429, detail="Profiling was started too recently",
+                            headers={"Retry-After": str(int(retry_after) + 1)})
+    capture = profiler.arm(path, requests, mode)
+    response = respond(request, {"path": capture.path, "requests": capture.requests, "mode": capture.mode})
+    response.status_code = 202
+    return response
+
+
+@router.get("/profile")
+async def get_profile(request: Request):
+    """
+    Get the state or result of the latest profile capture.
+
+    Returns:
+        The capture settings and progress; once requests have been captured,
+        the pstats listing by cumulative time (cprofile) or the most frequent
+        collapsed stacks with sample counts (sample)
+    """
+    if profiler.capture is None:
+        raise HTTPException(status_code=404, detail="No profile has been captured")
+    return respond(request, profiler.capture.result())
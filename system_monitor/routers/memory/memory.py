@@ -1,7 +1,9 @@
 """Memory monitoring endpoints"""
 
-import psutil
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+
+from system_monitor.encoding import FORMAT_QUERY, respond
+from system_monitor.sampler import sampler
 
 router = APIRouter(
     prefix="/api/v1/memory",
@@ -10,14 +12,36 @@ router = APIRouter(
 
 
 @router.get("/")
-async def get_memory_usage():
+async def get_memory_usage(request: Request, format: str = FORMAT_QUERY):
     """
     Get comprehensive virtual memory usage statistics.
     
     Returns detailed memory information including total, available, used, free,
     and platform-specific metrics like active, inactive, buffers, cached, etc.
+    With format=raw sizes are integer bytes and unavailable fields are null.
+    """
+    return respond(request, memory_usage(await sampler.latest(), raw=format == "raw"))
+
+
+def memory_usage(snapshot: dict, raw: bool = False) -> dict:
     """
-    memory = psutil.virtual_memory()
+    Build the memory usage response from a sampler snapshot.
+
+    Args:
+        snapshot: Snapshot produced by the background sampler
+        raw: Return integer bytes instead of formatted strings
+
+    Returns:
+        Dictionary with memory statistics
+    """
+    memory = snapshot["memory"]
+    if raw:
+        fields = ("total", "available", "used", "free", "percent",
+                  "active", "inactive", "buffers", "cached", "shared", "slab")
+        usage = {field: getattr(memory, field, None) for field in fields}
+        usage["sampled_at"] = snapshot["sampled_at"]
+        return usage
+
     return {
         "total": f"{memory.total / (1024 ** 3):.2f} GB",
         "available": f"{memory.available / (1024 ** 3):.2f} GB",
@@ -29,5 +53,6 @@ async def get_memory_usage():
         "buffers": f"{memory.buffers / (1024 ** 3):.2f} GB" if hasattr(memory, "buffers") else "NA",
         "cached": f"{memory.cached / (1024 ** 3):.2f} GB" if hasattr(memory, "cached") else "NA",
         "shared": f"{memory.shared / (1024 ** 3):.2f} GB" if hasattr(memory, "shared") else "NA",
-        "slab": f"{memory.slab / (1024 ** 3):.2f} GB" if hasattr(memory, "slab") else "NA"
+        "slab": f"{memory.slab / (1024 ** 3):.2f} GB" if hasattr(memory, "slab") else "NA",
+        "sampled_at": snapshot["sampled_at"],
     }
@@ -0,0 +1 @@
+"""Prometheus metrics endpoint"""
@@ -0,0 +1,48 @@
+"""Prometheus metrics endpoint"""
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+import system_monitor.config as config
+from system_monitor.backends import backend
+from system_monitor.collectors.process import process_registry
+from system_monitor.collectors.sockets import socket_inventory
+from system_monitor.executor import run_collector
+from system_monitor.prometheus import CONTENT_TYPE, renderer
+from system_monitor.sampler import sampler
+
+router = APIRouter(
+    tags=["Metrics"],
+)
+
+# Process counts may come from a process table sample up to this many seconds old
+PROCESS_MAX_AGE = float(config.get("metrics", "process_max_age", "60"))
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Expose all metrics in the Prometheus text format.
+
+    Covers CPU (total, per core and load average), memory, per-partition disk
+    usage, per-NIC counters, temperature sensors, process counts by status and
+    socket counts by state, rendered from the latest sampler snapshot.
+
+    Process counts reuse the last process table sample unless it is older
+    than ``[metrics] process_max_age``, so scrapes do not rescan every
+    process each time.
+    """
+    snapshot = await sampler.latest()
+    temperatures = None
+    if backend.supports("sensors_temperatures"):
+        temperatures = await run_collector("sensors", backend.sensors_temperatures)
+    records = await run_collector("process", process_registry.refresh, PROCESS_MAX_AGE)
+    sockets = await run_collector("network", socket_inventory.refresh)
+
+    body = renderer.render(
+        snapshot,
+        temperatures=temperatures,
+        process_statuses=(record["status"] or "unknown" for record in records),
+        sockets=sockets,
+    )
+    return Response(content=body, media_type=CONTENT_TYPE)
@@ -1,27 +1,35 @@
-import json
-
-import psutil
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from psutil._common import bytes2human
 
+from system_monitor.collectors.network import NetworkRates, network_rates
+from system_monitor.collectors.sockets import socket_inventory
+from system_monitor.encoding import FORMAT_QUERY, respond
+from system_monitor.executor import run_collector
+from system_monitor.sampler import sampler
+
 router = APIRouter(
     prefix="/api/v1/network",  # all routes here start with /api/v1/network
     tags=["Network"],  # useful for docs grouping
 )
 
 
-def get_interfaces():
-    stats = psutil.net_if_stats()
-    io_counters = psutil.net_io_counters(pernic=True)
+def get_interfaces(snapshot: dict, raw: bool = False):
+    network = snapshot["network"]
+    stats = network["if_stats"]
+    io_counters = network["io_pernic"]
     output_format = "%(value).2f%(symbol)s"
     nic_data = []
-    for nic, addrs in psutil.net_if_addrs().items():
+    for nic, addrs in network["if_addrs"].items():
         nic_info = {"nic": nic, "bytes_sent": 0, "bytes_received": 0, "packets_sent": 0, "packets_received": 0}
         if nic in io_counters:
             io = io_counters[nic]
             nic_info["stats"] = stats[nic]._asdict() if nic in stats else {}
-            nic_info["bytes_sent"] = bytes2human(io.bytes_sent, format=output_format)
-            nic_info["bytes_received"] = bytes2human(io.bytes_recv, format=output_format)
+            if raw:
+                nic_info["bytes_sent"] = io.bytes_sent
+                nic_info["bytes_received"] = io.bytes_recv
+            else:
+                nic_info["bytes_sent"] = bytes2human(io.bytes_sent, format=output_format)
+                nic_info["bytes_received"] = bytes2human(io.bytes_recv, format=output_format)
             nic_info["packets_sent"] = io.packets_sent
             nic_info["packets_received"] = io.packets_recv
             nic_data.append(nic_info)
@@ -29,26 +37,57 @@ def get_interfaces():
 
 
 @router.get("/details")
-async def get_network_usage_details():
-    net_io = psutil.net_io_counters(pernic=True)
+async def get_network_usage_details(request: Request, format: str = FORMAT_QUERY):
+    """
+    Get per-interface counters and rates.
+
+    Rates are per-second values over each configured window (default 1s,
+    10s and 60s), computed from consecutive background samples, so the
+    request never waits to measure. A window is null until the interface has
+    two samples.
+
+    Returns:
+        List of interfaces with cumulative bytes, packets, errors and drops,
+        and a "rates" object keyed by window with bytes_sent, bytes_recv,
+        packets_sent, packets_recv, errin, errout, dropin and dropout per second
+
+    With format=raw byte counters are integers.
+    """
+    snapshot = await sampler.latest()
+    return respond(request, network_details(snapshot, network_rates, raw=format == "raw"))
+
+
+def network_details(snapshot: dict, rates: NetworkRates, raw: bool = False) -> list:
+    """
+    Build the per-interface details response from a sampler snapshot.
+
+    Args:
+        snapshot: Snapshot produced by the background sampler
+        rates: Rate collector fed by the sampler
+        raw: Return integer byte counters instead of formatted strings
+
+    Returns:
+        List of per-interface dictionaries
+    """
     network_info = []
-    for interface, stats in net_io.items():
+    for interface, stats in snapshot["network"]["io_pernic"].items():
         network_info.append({
             "interface": interface,
-            "bytes_sent": f"{bytes2human(stats.bytes_sent)}",
-            "bytes_recv": f"{bytes2human(stats.bytes_recv)}",
+            "bytes_sent": stats.bytes_sent if raw else f"{bytes2human(stats.bytes_sent)}",
+            "bytes_recv": stats.bytes_recv if raw else f"{bytes2human(stats.bytes_recv)}",
             "packets_sent": stats.packets_sent,
             "packets_recv": stats.packets_recv,
-            "errin": net_io.errin,
-            "errout": net_io.errout,
-            "dropin": net_io.dropin,
-            "dropout": net_io.dropout,
+            "errin": stats.errin,
+            "errout": stats.errout,
+            "dropin": stats.dropin,
+            "dropout": stats.dropout,
+            "rates": rates.rates(interface),
         })
     return network_info
 
 
 @router.get("/")
-async def get_network_usage():
+async def get_network_usage(request: Request, format: str = FORMAT_QUERY):
     """
     Get comprehensive network usage statistics.
     
@@ -58,19 +97,41 @@ async def get_network_usage():
         - packets_sent: Total packets sent
         - packets_recv: Total packets received
         - num_sockets: Number of active network connections
+        - socket_states: Number of connections in each state (ESTABLISHED, LISTEN, ...)
         - num_interfaces: Number of network interfaces
         - interfaces: Detailed per-interface statistics
+        - sampled_at: Unix timestamp of the sample the counters come from
+
+    With format=raw byte counters are integers.
+    """
+    snapshot = await sampler.latest()
+    sockets = await run_collector("network", socket_inventory.refresh)
+    return respond(request, network_usage(snapshot, sockets, raw=format == "raw"))
+
+
+def network_usage(snapshot: dict, sockets: dict, raw: bool = False) -> dict:
+    """
+    Build the network usage response from a sampler snapshot.
+
+    Args:
+        snapshot: Snapshot produced by the background sampler
+        sockets: Socket index from the socket inventory
+        raw: Return integer byte counters instead of formatted strings
+
+    Returns:
+        Dictionary with network usage statistics
     """
-    net_io = psutil.net_io_counters(pernic=False)
+    net_io = snapshot["network"]["io"]
     return {
-        "bytes_sent": f"{bytes2human(net_io.bytes_sent)}",
-        "bytes_recv": f"{bytes2human(net_io.bytes_recv)}",
+        "bytes_sent": net_io.bytes_sent if raw else f"{bytes2human(net_io.bytes_sent)}",
+        "bytes_recv": net_io.bytes_recv if raw else f"{bytes2human(net_io.bytes_recv)}",
         "packets_sent": net_io.packets_sent,
         "packets_recv": net_io.packets_recv,
-        "num_sockets": len(psutil.net_connections()),
-        "num_interfaces": len(psutil.net_if_addrs()),
+        "num_sockets": sockets["total"],
+        "socket_states": sockets["by_state"],
+        "num_interfaces": len(snapshot["network"]["if_addrs"]),
         "errin": net_io.errin if hasattr(net_io, 'errin') else 0,
         "errout": net_io.errout if hasattr(net_io, 'errout') else 0,
-        "interfaces": get_interfaces()
+        "interfaces": get_interfaces(snapshot, raw),
+        "sampled_at": snapshot["sampled_at"],
     }
-
@@ -1,9 +1,16 @@
 """Process monitoring endpoints"""
 
-import psutil
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
 from psutil._common import bytes2human
 
+from system_monitor.collectors import process as process_collector
+from system_monitor.collectors.process import process_registry
+from system_monitor.encoding import FORMAT_QUERY, respond
+from system_monitor.executor import run_collector
+from system_monitor.instrumentation import stats
+
 router = APIRouter(
     prefix="/api/v1/process",
     tags=["Process"],
@@ -11,69 +18,136 @@ router = APIRouter(
 
 
 @router.get("/")
-async def get_system_info():
+async def get_system_info(
+        request: Request,
+        sort: str = Query("pid", description="Field to sort by, prefix with '-' for descending order"),
+        limit: Optional[int] = Query(None, ge=1, description="Maximum number of processes to return"),
+        offset: int = Query(0, ge=0, description="Number of processes to skip"),
+        fields: Optional[str] = Query(None, description="Comma-separated list of fields to include"),
+        user: Optional[str] = Query(None, description="Only include processes owned by this user"),
+        name: Optional[str] = Query(None, description="Only include processes whose name contains this text"),
+        format: str = FORMAT_QUERY,
+):
     """
-    Get information about all running processes.
-    
+    Get information about running processes.
+
+    Supports sorting, top-N selection with limit/offset, field projection and
+    user/name filters. The total number of matching processes is returned in
+    the X-Total-Count header. With format=raw sizes and I/O counters are
+    integer bytes (rss, vms, read_bytes, write_bytes).
+
     Returns:
         List of process information including PID, name, CPU usage, memory usage,
         I/O statistics, and network connections
     """
-    return get_all_processes()
+    if sort.lstrip("-") not in process_collector.SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by '{sort}'")
+
+    records = await run_collector("process", process_registry.refresh)
+    if user is not None or name is not None:
+        records = process_collector.filter_records(records, user=user, name=name)
+    return respond_records(request, records, sort, limit, offset, fields, format)
+
+
+@router.get("/search")
+async def search_processes(
+        request: Request,
+        name: Optional[str] = Query(None, description="Process name (case-insensitive exact match)"),
+        user: Optional[str] = Query(None, description="Owner username"),
+        exe: Optional[str] = Query(None, description="Executable path or basename"),
+        cmdline: Optional[str] = Query(None, description="Words that must all occur in the command line"),
+        sort: str = Query("pid", description="Field to sort by, prefix with '-' for descending order"),
+        limit: Optional[int] = Query(None, ge=1, description="Maximum number of processes to return"),
+        offset: int = Query(0, ge=0, description="Number of processes to skip"),
+        fields: Optional[str] = Query(None, description="Comma-separated list of fields to include"),
+        format: str = FORMAT_QUERY,
+):
+    """
+    Find processes by name, owner, executable or command line.
+
+    Lookups go through an index over the process table that is updated
+    from the PID changes between samples, so only the matching processes
+    are read. All given criteria must match; cmdline words match whole
+    arguments or their parts between "=", "/", ":" and ",", e.g.
+    ``cmdline=java -Xmx4g`` or ``cmdline=nginx.conf``. Sorting, paging,
+    fields, format and X-Total-Count work as in the process list.
+
+    Returns:
+        List of the matching processes
+    """
+    if sort.lstrip("-") not in process_collector.SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by '{sort}'")
+    if name is None and user is None and exe is None and cmdline is None:
+        raise HTTPException(status_code=400, detail="Give at least one of name, user, exe or cmdline")
+
+    records = await run_collector("process", process_registry.search, name, user, exe, cmdline)
+    return respond_records(request, records, sort, limit, offset, fields, format)
+
+
+def respond_records(request: Request, records: list, sort: str, limit: Optional[int], offset: int,
+                    fields: Optional[str], format: str):
+    """
+    Sort, page, format and project process records into a response.
+
+    The number of records before paging is returned in the X-Total-Count header.
+    """
+    total = len(records)
+
+    selected = process_collector.select(records, sort=sort, limit=limit, offset=offset)
+    if format == "raw":
+        process_list = selected
+    else:
+        with stats.timer("process.format"):
+            process_list = [format_process(record) for record in selected]
+    if fields:
+        keys = [field.strip() for field in fields.split(",")]
+        process_list = [{key: info[key] for key in keys if key in info} for info in process_list]
+    return respond(request, process_list, headers={"X-Total-Count": str(total)})
+
+
+def format_process(record: dict) -> dict:
+    """
+    Convert a raw process record into the human-readable response format.
+
+    Args:
+        record: Raw process record from the process registry
+
+    Returns:
+        Dictionary containing process information
+    """
+    process_info = {key: record[key] for key in (
+        "pid", "name", "username", "status", "cpu_percent",
+        "memory_percent", "create_time", "exe", "num_threads"
+    )}
+
+    # Handle zombie process
+    if record["is_zombie"]:
+        process_info["is_zombie"] = True
+        process_info["connections"] = []  # zombies won’t have active sockets
+        process_info["read"] = 0
+        process_info["write"] = 0
+        return process_info
+
+    # Convert memory_info to human-readable
+    if record["rss"] is not None:
+        process_info["rss"] = f"{bytes2human(record['rss'])}"
+        process_info["vms"] = f"{bytes2human(record['vms'])}"
+
+    # Convert io_info to human-readable
+    if record["read_bytes"] is not None:
+        process_info["read"] = f"{bytes2human(record['read_bytes'])}"
+        process_info["write"] = f"{bytes2human(record['write_bytes'])}"
+
+    process_info["connections"] = record["connections"]
+    process_info["is_zombie"] = False
+    return process_info
 
 
 def get_all_processes() -> list:
     """
     Retrieve detailed information for all running processes.
-    
+
     Returns:
         List of dictionaries containing process information
     """
-    process_list = []
-
-    for proc in psutil.process_iter(attrs=[
-        "pid", "name", "username", "status", "cpu_percent",
-        "memory_percent", "memory_info", "create_time", "exe", "io_counters", "num_threads"
-    ]):
-        try:
-            process_info = proc.info
-
-            # Handle zombie process
-            if process_info.get("status") == psutil.STATUS_ZOMBIE:
-                process_info["is_zombie"] = True
-                process_info["connections"] = []# zombies won’t have active sockets
-                process_info["read"] = 0,
-                process_info["write"] = 0
-                process_list.append(process_info)
-                continue
-
-            # Convert memory_info to human-readable
-            mem_info = process_info.pop("memory_info", None)
-            if mem_info:
-                process_info["rss"] = f"{bytes2human(mem_info.rss)}"
-                process_info["vms"] = f"{bytes2human(mem_info.vms)}"
-
-            # Convert io_info to human-readable
-            io_info = process_info.pop("io_counters", None)
-            if io_info:
-                process_info["read"] = f"{bytes2human(io_info.read_bytes)}"
-                process_info["write"] = f"{bytes2human(io_info.write_bytes)}"
-
-            process_info["connections"] = len(proc.net_connections())
-            process_info["is_zombie"] = False
-            process_list.append(process_info)
-
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            pass
-        except psutil.ZombieProcess:  # fallback just in case
-            process_list.append({
-                "pid": proc.pid,
-                "name": proc.name(),
-                "status": "zombie",
-                "is_zombie": True,
-                "connections": [],
-                "read":0,
-                "write":0
-            })
-
-    return process_list
+    return [format_process(record) for record in process_registry.refresh()]
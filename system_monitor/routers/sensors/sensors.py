@@ -1,7 +1,10 @@
 """Sensor monitoring endpoints"""
 
-import psutil
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+
+from system_monitor.backends import backend
+from system_monitor.executor import run_collector
+from system_monitor.response_cache import response_cache
 
 router = APIRouter(
     prefix="/api/v1/sensors",
@@ -10,7 +13,7 @@ router = APIRouter(
 
 
 @router.get("/")
-async def get_sensors_data():
+async def get_sensors_data(request: Request):
     """
     Get sensor data including temperatures, fan speeds, and battery information.
     
@@ -21,25 +24,38 @@ async def get_sensors_data():
         - temperatures: Temperature sensors by device
         - fans: Fan speed sensors by device
         - battery: Battery information (if available)
+
+    The response is cached for ``[cache] ttl_sensors`` seconds and carries an
+    ETag; requests with a matching If-None-Match get 304 Not Modified.
+    """
+    return await response_cache.respond(request, "sensors", lambda: run_collector("sensors", collect_sensors_data))
+
+
+def collect_sensors_data() -> dict:
+    """
+    Read temperature, fan and battery sensors.
+
+    Returns:
+        Dictionary with temperatures, fans and battery sections
     """
     sensors_info = {}
-    if hasattr(psutil, "sensors_temperatures"):
-        temps = psutil.sensors_temperatures()
+    if backend.supports("sensors_temperatures"):
+        temps = backend.sensors_temperatures()
         sensors_info["temperatures"] = {
             k: [{"label": entry.label, "current": entry.current, "high": entry.high, "critical": entry.critical} for
                 entry in v] for k, v in temps.items()}
     else:
         sensors_info["temperatures"] = "Not supported on this platform"
 
-    if hasattr(psutil, "sensors_fans"):
-        fans = psutil.sensors_fans()
+    if backend.supports("sensors_fans"):
+        fans = backend.sensors_fans()
         sensors_info["fans"] = {k: [{"label": entry.label, "current": entry.current} for entry in v] for k, v in
                                 fans.items()}
     else:
         sensors_info["fans"] = "Not supported on this platform"
 
-    if hasattr(psutil, "sensors_battery"):
-        battery = psutil.sensors_battery()
+    if backend.supports("sensors_battery"):
+        battery = backend.sensors_battery()
         if battery:
             sensors_info["battery"] = {
                 "percent": battery.percent,
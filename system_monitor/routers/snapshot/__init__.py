@@ -0,0 +1 @@
+"""Combined snapshot endpoint"""
@@ -0,0 +1,143 @@
+"""Combined snapshot endpoint"""
+
+import asyncio
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from system_monitor.collectors import process as process_collector
+from system_monitor.collectors.process import process_registry
+from system_monitor.collectors.sockets import socket_inventory
+from system_monitor.encoding import FORMAT_QUERY, respond
+from system_monitor.executor import run_collector
+from system_monitor.routers.cpu.cpu import cpu_usage
+from system_monitor.routers.disk.disk import disk_usage
+from system_monitor.routers.memory.memory import memory_usage
+from system_monitor.routers.network.network import network_usage
+from system_monitor.routers.process.process import format_process
+from system_monitor.routers.sensors.sensors import collect_sensors_data
+from system_monitor.routers.system.system import collect_system_info
+from system_monitor.sampler import sampler
+
+router = APIRouter(
+    prefix="/api/v1/snapshot",
+    tags=["Snapshot"],
+)
+
+SUBSYSTEMS = ("cpu", "memory", "disk", "network", "sensors", "system", "process")
+
+
+@router.get("/")
+async def get_snapshot(
+        request: Request,
+        include: str = Query(",".join(SUBSYSTEMS), description="Comma-separated subsystems to include"),
+        fields: Optional[str] = Query(
+            None, description="Comma-separated dotted paths to keep, e.g. cpu.cpu_utilization,process.pid"),
+        sort: str = Query("pid", description="Process field to sort by, prefix with '-' for descending order"),
+        limit: Optional[int] = Query(None, ge=1, description="Maximum number of processes to return"),
+        format: str = FORMAT_QUERY,
+):
+    """
+    Get several subsystems in one round trip.
+
+    CPU, memory, disk and network come from the same background sampler
+    snapshot; sockets, sensors, system information and the process table are
+    collected concurrently on the collector pool. The response has one key per
+    included subsystem with the same payload as its own endpoint.
+
+    Field paths are relative to the response, so ``fields=cpu.cpu_utilization,
+    disk.partitions.mountpoint,process.pid`` keeps only those values. Paths
+    apply to every element of a list. Subsystems without any path are returned
+    whole. A path must start with an included subsystem; below that, names
+    that do not exist are left out of the result.
+
+    Available subsystems: cpu, memory, disk, network, sensors, system, process
+    """
+    requested = [name.strip() for name in include.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in SUBSYSTEMS]
+    if unknown or not requested:
+        raise HTTPException(status_code=400, detail=f"Unknown subsystems: {', '.join(unknown) or include}")
+    if "process" in requested and sort.lstrip("-") not in process_collector.SORT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by '{sort}'")
+    tree = parse_fields(fields) if fields else {}
+    outside = [name for name in tree if name not in requested]
+    if outside:
+        raise HTTPException(status_code=400, detail=f"Fields outside the included subsystems: {', '.join(outside)}")
+    raw = format == "raw"
+
+    # Start the blocking collections first so they overlap with each other
+    pending = {}
+    if "network" in requested:
+        pending["sockets"] = run_collector("network", socket_inventory.refresh)
+    if "sensors" in requested:
+        pending["sensors"] = run_collector("sensors", collect_sensors_data)
+    if "system" in requested:
+        pending["system"] = run_collector("system", collect_system_info)
+    if "process" in requested:
+        pending["process"] = run_collector("process", process_registry.refresh)
+    snapshot, *collected = await asyncio.gather(sampler.latest(), *pending.values())
+    results = dict(zip(pending, collected))
+
+    body = {}
+    for name in requested:
+        if name == "cpu":
+            body[name] = cpu_usage(snapshot)
+        elif name == "memory":
+            body[name] = memory_usage(snapshot, raw=raw)
+        elif name == "disk":
+            body[name] = disk_usage(snapshot, raw=raw)
+        elif name == "network":
+            body[name] = network_usage(snapshot, results["sockets"], raw=raw)
+        elif name == "process":
+            selected = process_collector.select(results["process"], sort=sort, limit=limit)
+            body[name] = selected if raw else [format_process(record) for record in selected]
+        else:
+            body[name] = results[name]
+
+    if tree:
+        body = project(body, tree)
+    return respond(request, body)
+
+
+def parse_fields(fields: str) -> Dict[str, dict]:
+    """
+    Turn comma-separated dotted paths into a nested tree.
+
+    Args:
+        fields: Paths such as ``cpu.cpu_utilization,process.pid``
+
+    Returns:
+        Nested dictionary where an empty dictionary marks a selected leaf
+    """
+    tree: Dict[str, dict] = {}
+    for path in fields.split(","):
+        parts: List[str] = [part for part in path.strip().split(".") if part]
+        node = tree
+        for part in parts:
+            node = node.setdefault(part, {})
+    return tree
+
+
+def project(value, tree: Dict[str, dict]):
+    """
+    Keep only the selected paths of a payload.
+
+    Args:
+        value: Payload to project; lists are projected element by element
+        tree: Selection tree from parse_fields; at the top level, keys that are
+            not mentioned are kept whole
+
+    Returns:
+        The projected payload
+    """
+    return {key: _select(item, tree[key]) if tree.get(key) else item for key, item in value.items()}
+
+
+def _select(value, tree: Dict[str, dict]):
+    """Recursively keep the selected keys of dictionaries, mapping over lists."""
+    if isinstance(value, list):
+        return [_select(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: _select(value[key], subtree) if subtree else value[key]
+            for key, subtree in tree.items() if key in value}
@@ -0,0 +1,128 @@
+"""Metrics streaming endpoints"""
+
+import json
+from typing import AsyncIterator, Dict, List, Tuple
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from system_monitor.collectors.sockets import socket_inventory
+from system_monitor.executor import run_collector
+from system_monitor.routers.cpu.cpu import cpu_usage
+from system_monitor.routers.disk.disk import disk_usage
+from system_monitor.routers.memory.memory import memory_usage
+from system_monitor.routers.network.network import network_usage
+from system_monitor.sampler import sampler
+
+router = APIRouter(
+    prefix="/api/v1/stream",
+    tags=["Stream"],
+)
+
+STREAM_METRICS = ("cpu", "memory", "network", "disk")
+
+# Payloads of the latest tick, shared by every subscriber: (sampled_at, metric) -> payload
+_payloads: Dict[Tuple[float, str], dict] = {}
+
+
+@router.get("/")
+async def stream_metrics(
+        metrics: str = Query("cpu,memory,network", description="Comma-separated metrics to stream"),
+        interval: float = Query(1.0, gt=0, description="Minimum seconds between frames"),
+):
+    """
+    Stream metrics as Server-Sent Events.
+
+    The first event ("full") carries the complete payload of every requested
+    metric. Subsequent events ("delta") are JSON merge patches (RFC 7396)
+    containing only the fields that changed since the previous frame: changed
+    values are included, removed keys are null and lists are replaced whole.
+    All subscribers share the background sampler's collection.
+
+    Available metrics: cpu, memory, network, disk
+    """
+    requested = [metric.strip() for metric in metrics.split(",") if metric.strip()]
+    unknown = [metric for metric in requested if metric not in STREAM_METRICS]
+    if unknown or not requested:
+        raise HTTPException(status_code=400, detail=f"Unknown metrics: {', '.join(unknown) or metrics}")
+
+    return StreamingResponse(
+        _events(requested, interval),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _events(metrics: List[str], interval: float) -> AsyncIterator[str]:
+    """Yield SSE events: one full frame followed by merge-patch deltas."""
+    snapshot = await sampler.latest()
+    previous = await _frame(snapshot, metrics)
+    yield _event("full", previous)
+    last_sent = snapshot["sampled_at"]
+
+    while True:
+        snapshot = await sampler.next_snapshot()
+        # Allow a little jitter so interval=1 with a 1s sampler sends every tick
+        if snapshot["sampled_at"] - last_sent < interval * 0.9:
+            continue
+        frame = await _frame(snapshot, metrics)
+        yield _event("delta", _diff(previous, frame))
+        previous = frame
+        last_sent = snapshot["sampled_at"]
+
+
+async def _frame(snapshot: dict, metrics: List[str]) -> dict:
+    """Build the payload of the requested metrics, reusing payloads other subscribers built for this tick."""
+    sampled_at = snapshot["sampled_at"]
+    frame = {}
+    for metric in metrics:
+        key = (sampled_at, metric)
+        payload = _payloads.get(key)
+        if payload is None:
+            payload = _payloads[key] = await _payload(snapshot, metric)
+        frame[metric] = payload
+
+    # Forget payloads of older ticks
+    for key in [key for key in _payloads if key[0] < sampled_at]:
+        del _payloads[key]
+    return frame
+
+
+async def _payload(snapshot: dict, metric: str) -> dict:
+    """Build a single metric payload from a snapshot."""
+    if metric == "cpu":
+        return cpu_usage(snapshot)
+    if metric == "memory":
+        return memory_usage(snapshot)
+    if metric == "disk":
+        return disk_usage(snapshot)
+    sockets = await run_collector("network", socket_inventory.refresh)
+    return network_usage(snapshot, sockets)
+
+
+def _diff(old: dict, new: dict) -> dict:
+    """
+    Compute a JSON merge patch that turns old into new.
+
+    Args:
+        old: Previous frame
+        new: Current frame
+
+    Returns:
+        Dictionary containing only changed keys; removed keys map to None
+    """
+    patch = {key: None for key in old if key not in new}
+    for key, value in new.items():
+        before = old.get(key)
+        if isinstance(value, dict) and isinstance(before, dict):
+            nested = _diff(before, value)
+            if nested:
+                patch[key] = nested
+        elif key not in old or before != value:
+            patch[key] = value
+    return patch
+
+
+def _event(event: str, data: dict) -> str:
+    """Encode a Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
@@ -3,8 +3,11 @@
 import time
 import platform
 
-import psutil
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+
+from system_monitor.backends import backend
+from system_monitor.executor import run_collector
+from system_monitor.response_cache import response_cache
 
 router = APIRouter(
     prefix="/api/v1/system",
@@ -13,7 +16,7 @@ router = APIRouter(
 
 
 @router.get("/")
-async def get_system_info():
+async def get_system_info(request: Request):
     """
     Get system information including uptime and logged-in users.
     
@@ -23,12 +26,25 @@ async def get_system_info():
         - uptime_seconds: Number of seconds since system boot
         - platform: Operating system information
         - users: List of currently logged-in users
+
+    The response is cached for ``[cache] ttl_system`` seconds and carries an
+    ETag; requests with a matching If-None-Match get 304 Not Modified.
+    """
+    return await response_cache.respond(request, "system", lambda: run_collector("system", collect_system_info))
+
+
+def collect_system_info() -> dict:
+    """
+    Read boot time, platform details and logged-in users.
+
+    Returns:
+        Dictionary with uptime, platform and user information
     """
-    boot_time = psutil.boot_time()
+    boot_time = backend.boot_time()
     uptime_seconds = int(time.time() - boot_time)
     uptime_days = round(uptime_seconds / 86400, 2)
     
-    users = psutil.users()
+    users = backend.users()
     return {
         "boot_time_timestamp": int(boot_time),
         "uptime_days": uptime_days,
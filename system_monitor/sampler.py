@@ -0,0 +1,251 @@
+"""
+Background metrics sampler
+
+Periodically collects CPU, memory, network and disk metrics into a shared
+snapshot so request handlers can answer immediately instead of blocking the
+event loop while psutil measures. Measurements come from the configured
+metrics backend (see system_monitor.backends).
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import system_monitor.config as config
+from system_monitor.backends import backend as default_backend
+from system_monitor.backends.base import MetricsBackend
+from system_monitor.collectors import procfs
+from system_monitor.collectors.disk import DiskCollector, disk_collector
+from system_monitor.executor import run_collector
+from system_monitor.instrumentation import stats
+from system_monitor.shared_snapshot import SEGMENT_ENV, SnapshotSegment
+
+
+class StaleSnapshotError(RuntimeError):
+    """Raised when the sampler has stopped producing snapshots."""
+
+
+class Sampler:
+    """
+    Collects system metrics on a fixed interval in the background.
+
+    The latest result is kept in ``snapshot``, a dictionary holding the raw
+    backend values together with the ``sampled_at`` Unix timestamp of the
+    collection. A section that fails to collect keeps its previous value, so
+    one broken source does not hold back the others. When no new snapshot
+    was published for ``stale_after`` seconds, latest() raises
+    StaleSnapshotError instead of returning the old one.
+    """
+
+    def __init__(self, interval: Optional[float] = None, backend: Optional[MetricsBackend] = None,
+                 disk: Optional[DiskCollector] = None, stale_after: Optional[float] = None):
+        self.backend = backend or default_backend
+        self.disk = disk or (disk_collector if backend is None else DiskCollector(backend=backend))
+        self.interval = interval or float(config.get("sampler", "interval", "1.0"))
+        if stale_after is None:
+            stale_after = float(config.get("sampler", "stale_after", str(max(5.0, 3 * self.interval))))
+        self.stale_after = stale_after
+        self.snapshot: Optional[dict] = None
+        self.listeners: List[Callable[[dict], None]] = []
+        self._ready: Optional[asyncio.Event] = None
+        self._tick: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+        self._published_at = time.monotonic()
+        # Last value of every section, reused when reading it fails
+        self._sections: Dict[str, Any] = {}
+        # The physical core count does not change while running
+        self._physical_count = self.backend.cpu_count(logical=False)
+
+    def collect(self) -> dict:
+        """
+        Take a single sample of all metrics.
+
+        This performs blocking backend calls and is meant to run in a worker thread.
+
+        Returns:
+            Snapshot dictionary with cpu, memory, network, disk and disk_io sections
+
+        Raises:
+            Exception: If a section fails that has never been read successfully
+        """
+        backend = self.backend
+        backend.tick()
+        return {
+            "sampled_at": time.time(),
+            "cpu": self._section("cpu", self._collect_cpu),
+            "memory": self._section("memory", backend.virtual_memory),
+            "network": self._section("network", self._collect_network),
+            "disk": self._section("disk", self.disk.usages),
+            "disk_io": self._section("disk_io", backend.disk_io_counters),
+        }
+
+    def _collect_cpu(self) -> dict:
+        percent, per_cpu_percent = self.backend.cpu_percent()
+        return {
+            "count": len(per_cpu_percent),
+            "physical_count": self._physical_count,
+            "percent": percent,
+            "per_cpu_percent": per_cpu_percent,
+            "load_avg": self.backend.getloadavg(),
+        }
+
+    def _collect_network(self) -> dict:
+        io_pernic = self.backend.net_io_counters()
+        return {
+            "io": procfs.total_net_io(io_pernic),
+            "io_pernic": io_pernic,
+            "if_addrs": self.backend.net_if_addrs(),
+            "if_stats": self.backend.net_if_stats(),
+        }
+
+    def _section(self, name: str, read: Callable[[], Any]) -> Any:
+        """Read one snapshot section, falling back to its previous value if that fails."""
+        try:
+            value = read()
+        except Exception as e:
+            if name not in self._sections:
+                raise
+            stats.count(f"sampler.section_errors.{name}")
+            print(f"Sampler error in {name}, reusing its previous value: {e}")
+            return self._sections[name]
+        self._sections[name] = value
+        return value
+
+    async def run(self):
+        """Sample forever, sleeping between collections to keep the configured interval."""
+        loop = asyncio.get_running_loop()
+
+        # Prime the CPU counters so the first sample has a baseline to compare against
+        self.backend.cpu_percent()
+        await asyncio.sleep(min(self.interval, 0.1))
+
+        while True:
+            started = loop.time()
+            try:
+                snapshot = await run_collector("sampler", self.collect)
+            except Exception as e:
+                print(f"Sampler error: {e}")
+            else:
+                self._publish(snapshot)
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
+
+    def _publish(self, snapshot: dict):
+        """Make a snapshot the latest one, wake next_snapshot() waiters and notify the listeners."""
+        self.snapshot = snapshot
+        self._published_at = time.monotonic()
+        self._ready.set()
+        self._tick.set_result(snapshot)
+        self._tick = asyncio.get_running_loop().create_future()
+        for listener in self.listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"Sampler listener error: {e}")
+
+    def add_listener(self, listener: Callable[[dict], None]):
+        """
+        Register a callback invoked on the event loop with every new snapshot.
+
+        Listeners must be cheap and must not block.
+        """
+        self.listeners.append(listener)
+
+    def start(self):
+        """Start the background sampling task on the running event loop."""
+        if self._task is None:
+            self._published_at = time.monotonic()
+            self._ready = asyncio.Event()
+            self._tick = asyncio.get_running_loop().create_future()
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        """Cancel the background sampling task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._tick.cancel()
+
+    def age(self) -> float:
+        """Seconds since a snapshot was last published (or since sampling started)."""
+        return time.monotonic() - self._published_at
+
+    async def latest(self) -> dict:
+        """
+        Get the most recent snapshot, waiting up to ``stale_after`` for the first one.
+
+        Returns:
+            The latest snapshot dictionary
+
+        Raises:
+            StaleSnapshotError: If no snapshot was published for ``stale_after`` seconds
+        """
+        if self.snapshot is None:
+            self.start()
+            try:
+                await asyncio.wait_for(self._ready.wait(), max(0.0, self.stale_after - self.age()))
+            except asyncio.TimeoutError:
+                raise StaleSnapshotError(f"No snapshot from the sampler after {self.age():.0f}s") from None
+        elif self.age() > self.stale_after:
+            raise StaleSnapshotError(f"The last snapshot from the sampler is {self.age():.0f}s old")
+        return self.snapshot
+
+    async def next_snapshot(self) -> dict:
+        """
+        Wait for the next sample to be taken.
+
+        All waiters share the same tick, so any number of subscribers cost a
+        single collection per interval.
+
+        Returns:
+            The new snapshot dictionary
+        """
+        if self._task is None:
+            self.start()
+        return await asyncio.shield(self._tick)
+
+
+class SharedSampler(Sampler):
+    """
+    Sampler of a uvicorn worker in multi-worker mode.
+
+    Instead of collecting, it polls the shared snapshot segment written by
+    the sampler process (see system_monitor.shared_snapshot) and publishes
+    each new snapshot locally, so listeners such as the history buffer and
+    the rate trackers still see every sample. Snapshots count as stale
+    after ``[api] snapshot_stale_after`` seconds, by default the sampler's
+    own ``stale_after``.
+    """
+
+    def __init__(self, path: str, poll_interval: Optional[float] = None, stale_after: Optional[float] = None):
+        super().__init__(stale_after=stale_after)
+        self.segment = SnapshotSegment.attach(path)
+        self.poll_interval = poll_interval or float(config.get("api", "snapshot_poll_interval", "0.05"))
+        if stale_after is None:
+            self.stale_after = float(config.get("api", "snapshot_stale_after", str(self.stale_after)))
+        self._sequence = 0
+
+    async def run(self):
+        """Publish every snapshot the sampler process writes, checking the sequence number each poll."""
+        while True:
+            if self.segment.sequence() != self._sequence:
+                sequence, snapshot = self.segment.read()
+                if snapshot is not None:
+                    self._sequence = sequence
+                    self._publish(snapshot)
+            await asyncio.sleep(self.poll_interval)
+
+
+def create() -> Sampler:
+    """Create the process-wide sampler: a reader of the shared segment inside multi-worker uvicorn workers."""
+    path = os.environ.get(SEGMENT_ENV)
+    if path:
+        return SharedSampler(path)
+    return Sampler()
+
+
+sampler = create()
@@ -0,0 +1,254 @@
+"""
+Shared-memory sampler snapshot
+
+In multi-worker mode ([api] workers > 1) a single sampler process collects
+the metrics and publishes every snapshot into a memory-mapped file under
+/dev/shm; the uvicorn workers only map it and read. Collection cost stays
+that of one sampler however many workers serve requests.
+
+The segment is a sequence lock: a 24-byte header (sequence, length, CRC32)
+followed by the pickled snapshot. The single writer makes the sequence odd,
+writes the body, then makes it even again. A reader copies the body and
+accepts it only if the sequence was even and unchanged around the copy and
+the checksum matches, so readers never lock or block the writer.
+
+The parent process supervises the sampler process and restarts it if it
+exits; workers answer 503 while no new snapshot arrives (see
+sampler.SharedSampler).
+
+Only the sampler snapshot is shared. Process, socket, sensor and cgroup
+collections still run on demand in the worker serving the request, at most
+once per refresh interval per worker. Publishing them would make the
+sampler process scan the process and socket tables on every tick whether or
+not anyone asks, which on large hosts costs more than the on-demand scans it
+would save.
+"""
+
+import asyncio
+import mmap
+import multiprocessing
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from typing import Optional, Tuple
+
+import system_monitor.config as config
+
+# Environment variable through which uvicorn workers learn the segment path
+SEGMENT_ENV = "SYSTEM_MONITOR_SNAPSHOT_SEGMENT"
+
+HEADER = struct.Struct("<QQI4x")
+SEQUENCE = struct.Struct("<Q")
+
+
+class SnapshotSegment:
+    """Memory-mapped snapshot slot with one writer and any number of readers."""
+
+    def __init__(self, path: str, capacity: int, writable: bool):
+        self.path = path
+        self.capacity = capacity
+        self._file = open(path, "r+b" if writable else "rb")
+        self._map = mmap.mmap(self._file.fileno(), HEADER.size + capacity,
+                              access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        self._sequence = SEQUENCE.unpack_from(self._map, 0)[0]
+        if writable and self._sequence % 2:
+            self._sequence += 1  # a previous writer died in the middle of a write
+
+    @classmethod
+    def create(cls, capacity: Optional[int] = None) -> "SnapshotSegment":
+        """
+        Create a zeroed segment in shared memory.
+
+        Args:
+            capacity: Maximum pickled snapshot size in bytes; [api] snapshot_capacity if omitted
+
+        Returns:
+            The writable segment
+        """
+        if capacity is None:
+            capacity = int(config.get("api", "snapshot_capacity", "4194304"))
+        directory = "/dev/shm" if os.path.isdir("/dev/shm") else None
+        descriptor, path = tempfile.mkstemp(prefix="system-monitor-", suffix=".snapshot", dir=directory)
+        with os.fdopen(descriptor, "wb") as segment:
+            segment.truncate(HEADER.size + capacity)
+        return cls(path, capacity, writable=True)
+
+    @classmethod
+    def attach(cls, path: str) -> "SnapshotSegment":
+        """Map an existing segment read-only."""
+        return cls(path, os.path.getsize(path) - HEADER.size, writable=False)
+
+    def sequence(self) -> int:
+        """Sequence number of the last write; even while no write is in progress."""
+        return SEQUENCE.unpack_from(self._map, 0)[0]
+
+    def write(self, snapshot: dict):
+        """
+        Publish a snapshot. Used as a sampler listener in the sampler process.
+
+        Snapshots larger than the capacity are dropped with an error message.
+        """
+        body = pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(body) > self.capacity:
+            print(f"Snapshot of {len(body)} bytes exceeds the shared segment capacity of {self.capacity} bytes, "
+                  f"increase [api] snapshot_capacity")
+            return
+        SEQUENCE.pack_into(self._map, 0, self._sequence + 1)
+        self._map[HEADER.size:HEADER.size + len(body)] = body
+        HEADER.pack_into(self._map, 0, self._sequence + 1, len(body), zlib.crc32(body))
+        self._sequence += 2
+        SEQUENCE.pack_into(self._map, 0, self._sequence)
+
+    def read(self, attempts: int = 100) -> Tuple[int, Optional[dict]]:
+        """
+        Read the latest snapshot.
+
+        Returns:
+            The sequence number and the snapshot, or None if nothing has been
+            written yet or no consistent copy was obtained
+        """
+        for _ in range(attempts):
+            sequence, length, checksum = HEADER.unpack_from(self._map, 0)
+            if sequence == 0:
+                return 0, None
+            if sequence % 2 == 0:
+                body = self._map[HEADER.size:HEADER.size + length]
+                if SEQUENCE.unpack_from(self._map, 0)[0] == sequence and zlib.crc32(body) == checksum:
+                    return sequence, pickle.loads(body)
+            time.sleep(0)  # a write is in progress
+        return self.sequence(), None
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def unlink(self):
+        """Remove the segment file; existing mappings stay valid."""
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def run_sampler_process(path: str):
+    """
+    Entry point of the sampler process in multi-worker mode.
+
+    Runs a background sampler, publishing every snapshot into the segment,
+    and the embedded registration agent if enabled, so it runs once per host
+    rather than once per worker.
+    """
+    # Not the module-level sampler: when the supervisor restarts this process,
+    # SEGMENT_ENV is set and that one would be a reader of the segment
+    from system_monitor.sampler import Sampler
+
+    sampler = Sampler()
+    segment = SnapshotSegment(path, os.path.getsize(path) - HEADER.size, writable=True)
+    sampler.add_listener(segment.write)
+
+    async def main():
+        sampler.start()
+        if config.get("agent", "embedded", "false").lower() == "true":
+            from system_monitor.register import run_embedded
+            await run_embedded(sampler)
+        else:
+            await asyncio.Event().wait()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        segment.close()
+
+
+class SamplerSupervisor:
+    """
+    Keeps the sampler process running.
+
+    A thread checks the process every CHECK_INTERVAL seconds and starts a
+    new one when it has exited. A process that exits within a minute of
+    being started is restarted after a delay that doubles each time, up to
+    MAX_RESTART_DELAY seconds, so a sampler that fails on startup does not
+    spin.
+    """
+
+    CHECK_INTERVAL = 1.0
+    MAX_RESTART_DELAY = 30.0
+
+    def __init__(self, path: str):
+        self.path = path
+        self.process: Optional[multiprocessing.Process] = None
+        self.restarts = 0
+        self._started_at = 0.0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the sampler process and the supervising thread."""
+        self._spawn()
+        self._thread = threading.Thread(target=self._watch, name="sampler-supervisor", daemon=True)
+        self._thread.start()
+
+    def _spawn(self):
+        with self._lock:
+            if self._stop.is_set():
+                return
+            self.process = multiprocessing.get_context("spawn").Process(
+                target=run_sampler_process, args=(self.path,), name="sampler", daemon=True)
+            self.process.start()
+            self._started_at = time.monotonic()
+
+    def _watch(self):
+        delay = 0.0
+        while not self._stop.wait(self.CHECK_INTERVAL):
+            process = self.process
+            if process.is_alive():
+                continue
+            if time.monotonic() - self._started_at > 60:
+                delay = 1.0
+            else:
+                delay = min(self.MAX_RESTART_DELAY, max(1.0, delay * 2))
+            print(f"Sampler process {process.pid} exited with code {process.exitcode}, restarting in {delay:g}s")
+            if self._stop.wait(delay):
+                return
+            self.restarts += 1
+            self._spawn()
+            print(f"Sampler process {self.process.pid} started")
+
+    def stop(self):
+        """Stop supervising and terminate the sampler process."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            if self.process is not None:
+                self.process.terminate()
+                self.process.join(5)
+
+
+def serve(host: str, port: int, log_level: str, workers: int):
+    """
+    Run uvicorn with several workers fed by one supervised sampler process.
+
+    The sampler process is started before the workers, then every worker
+    finds the segment through SEGMENT_ENV and reads snapshots from it.
+    """
+    import uvicorn
+
+    segment = SnapshotSegment.create()
+    supervisor = SamplerSupervisor(segment.path)
+    supervisor.start()
+    os.environ[SEGMENT_ENV] = segment.path
+    print(f"Sampler process {supervisor.process.pid} publishing snapshots to {segment.path}")
+    try:
+        uvicorn.run("system_monitor.main:app", host=host, port=port, log_level=log_level, workers=workers)
+    finally:
+        supervisor.stop()
+        segment.close()
+        segment.unlink()
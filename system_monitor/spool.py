@@ -0,0 +1,214 @@
+"""
+Durable on-disk spool for the registration agent
+
+Samples that cannot be written while the database is unreachable are
+appended to segment files as length-prefixed, checksummed records. Once the
+database is back they are replayed into server_samples with COPY in bounded
+batches. The spool has a size cap; when it is exceeded the oldest segments
+are evicted first. A record that fails its checksum is skipped; a segment
+that cannot be read to its end is set aside as ``.corrupt`` rather than
+deleted.
+"""
+
+import io
+import json
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+import system_monitor.config as config
+from system_monitor.instrumentation import stats
+
+# Record header: payload length and CRC32 of the payload
+HEADER = struct.Struct("<II")
+
+SEGMENT_SUFFIX = ".spool"
+QUARANTINE_SUFFIX = ".corrupt"
+
+sql_copy_samples = "COPY server_samples(ip, sampled_on, cpu_percent, memory_percent, disk_usage) FROM STDIN"
+
+
+class Spool:
+    """
+    Append-only spool of samples split into numbered segment files.
+
+    Replay progress is stored in an ``offset`` file holding the segment
+    number and byte position of the next unreplayed record, so a restart
+    resumes where the last committed batch ended.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 segment_bytes: Optional[int] = None, batch_size: Optional[int] = None):
+        if directory is None:
+            directory = config.get("spool", "directory", "spool")
+        if max_bytes is None:
+            max_bytes = int(float(config.get("spool", "max_mb", "64")) * 1024 ** 2)
+        if segment_bytes is None:
+            segment_bytes = int(float(config.get("spool", "segment_mb", "4")) * 1024 ** 2)
+        self.directory = Path(directory)
+        if not self.directory.is_absolute():
+            self.directory = config.PROJECT_ROOT / self.directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = min(segment_bytes, max_bytes)
+        self.batch_size = batch_size or int(config.get("spool", "replay_batch", "5000"))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Always start a fresh segment so a torn record from a crash is never followed by new data
+        self._current: Optional[int] = None
+
+    def _segments(self) -> List[int]:
+        """Segment numbers on disk, oldest first."""
+        return sorted(int(path.stem) for path in self.directory.glob(f"*{SEGMENT_SUFFIX}") if path.stem.isdigit())
+
+    def _path(self, segment: int) -> Path:
+        return self.directory / f"{segment:010d}{SEGMENT_SUFFIX}"
+
+    def pending(self) -> bool:
+        """Check whether there are spooled samples waiting to be replayed."""
+        return bool(self._segments())
+
+    def size(self) -> int:
+        """Total size of the spool in bytes."""
+        return sum(self._path(segment).stat().st_size for segment in self._segments())
+
+    def append(self, rows: Iterable[dict]) -> int:
+        """
+        Durably append samples to the spool.
+
+        Args:
+            rows: Samples with the server_info column names as keys
+
+        Returns:
+            Number of samples written
+        """
+        records = []
+        for row in rows:
+            payload = json.dumps(
+                [row["ip"], row["updated_on"], row["cpu_percent"], row["memory_percent"], row["disk_usage"]],
+                separators=(",", ":"),
+            ).encode()
+            records.append(HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        if not records:
+            return 0
+
+        segments = self._segments()
+        if self._current is None or self._current not in segments \
+                or self._path(self._current).stat().st_size >= self.segment_bytes:
+            self._current = (segments[-1] + 1) if segments else 1
+
+        with open(self._path(self._current), "ab") as segment:
+            segment.write(b"".join(records))
+            segment.flush()
+            os.fsync(segment.fileno())
+
+        self._evict()
+        return len(records)
+
+    def _evict(self):
+        """Delete the oldest segments until the spool fits within max_bytes."""
+        segments = self._segments()
+        total = sum(self._path(segment).stat().st_size for segment in segments)
+        while total > self.max_bytes and len(segments) > 1:
+            oldest = segments.pop(0)
+            total -= self._path(oldest).stat().st_size
+            self._path(oldest).unlink()
+            print(f"Spool over {self.max_bytes} bytes, dropped oldest segment {oldest}")
+
+    def _read_offset(self) -> Tuple[int, int]:
+        try:
+            segment, position = (self.directory / "offset").read_text().split()
+            return int(segment), int(position)
+        except (OSError, ValueError):
+            return 0, 0
+
+    def _write_offset(self, segment: int, position: int):
+        path = self.directory / "offset"
+        temp = path.with_suffix(".tmp")
+        temp.write_text(f"{segment} {position}")
+        os.replace(temp, path)
+
+    def _read_batch(self, segment: int, position: int) -> Tuple[List[list], int]:
+        """
+        Read up to batch_size records starting at a byte position.
+
+        A record whose payload fails the checksum is skipped using its length
+        prefix. Reading stops at the end of the segment or at a record that
+        cannot be read in full (a torn write or a damaged header).
+        """
+        rows = []
+        with open(self._path(segment), "rb") as f:
+            f.seek(position)
+            while len(rows) < self.batch_size:
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    break
+                length, checksum = HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length:
+                    break
+                position += HEADER.size + length
+                if zlib.crc32(payload) != checksum:
+                    stats.count("spool.corrupt_records")
+                    print(f"Spool segment {segment} has a corrupt record, skipping it")
+                    continue
+                rows.append(json.loads(payload))
+        return rows, position
+
+    def replay(self, connection, cursor, max_batches: int = 1) -> int:
+        """
+        Replay spooled samples into server_samples.
+
+        At most max_batches COPY batches of batch_size rows are written per
+        call, each committed on its own, so recovery after a long outage does
+        not monopolize the agent or flood the database.
+
+        Args:
+            connection: Open database connection
+            cursor: Cursor on that connection
+            max_batches: Maximum number of batches to replay in this call
+
+        Returns:
+            Number of samples replayed
+        """
+        replayed = 0
+        batches = 0
+        while batches < max_batches:
+            segments = self._segments()
+            if not segments:
+                break
+            segment = segments[0]
+            offset_segment, position = self._read_offset()
+            if offset_segment != segment:
+                position = 0
+
+            rows, end = self._read_batch(segment, position)
+            if not rows:
+                path = self._path(segment)
+                if end < path.stat().st_size:
+                    # Unreadable from here on; keep the rest for inspection
+                    path.rename(path.with_suffix(QUARANTINE_SUFFIX))
+                    print(f"Spool segment {segment} is unreadable after byte {end}, moved it aside")
+                else:
+                    path.unlink()  # fully replayed
+                if segment == self._current:
+                    self._current = None
+                continue
+
+            buffer = io.StringIO()
+            for row in rows:
+                buffer.write("\t".join("\\N" if value is None else str(value) for value in row))
+                buffer.write("\n")
+            buffer.seek(0)
+            try:
+                cursor.copy_expert(sql_copy_samples, buffer)
+                connection.commit()
+            except Exception:
+                if not connection.closed:
+                    connection.rollback()
+                raise
+
+            self._write_offset(segment, end)
+            replayed += len(rows)
+            batches += 1
+        return replayed
@@ -0,0 +1,11 @@
+"""Shared fixtures"""
+
+import pytest
+
+from system_monitor.backends.synthetic import SyntheticBackend
+
+
+@pytest.fixture
+def backend():
+    """A small deterministic host; every tick replaces a tenth of its processes."""
+    return SyntheticBackend(processes=50, cores=4, nics=2, partitions=2, sockets=40, users=3, churn=0.1, seed=1)
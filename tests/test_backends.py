@@ -0,0 +1,84 @@
+"""Tests for the metrics backends"""
+
+import pytest
+
+from system_monitor.backends.base import MetricsBackend
+from system_monitor.backends.replay import ReplayBackend, capture_processes, record
+from system_monitor.sampler import Sampler
+
+
+def test_incomplete_backend_fails_on_creation():
+    class CpuOnly(MetricsBackend):
+        def cpu_percent(self):
+            return 0.0, [0.0]
+
+    with pytest.raises(TypeError):
+        CpuOnly()
+
+
+def test_synthetic_backend_is_deterministic(backend):
+    from system_monitor.backends.synthetic import SyntheticBackend
+
+    other = SyntheticBackend(processes=50, cores=4, nics=2, partitions=2, sockets=40, users=3, churn=0.1, seed=1)
+    for _ in range(3):
+        backend.tick()
+        other.tick()
+    assert backend.pids() == other.pids()
+    assert backend.cpu_percent() == other.cpu_percent()
+    assert backend.net_io_counters() == other.net_io_counters()
+
+
+def test_replay_round_trip(backend, tmp_path, capsys):
+    path = str(tmp_path / "host.jsonl")
+    progress = []
+    record(backend, path, samples=3, interval=0, progress=lambda recorded, total: progress.append(recorded))
+
+    assert progress == [1, 2, 3]
+    # Recording is library code: it leaves the output to the caller
+    assert capsys.readouterr().out == ""
+
+    replay = ReplayBackend(path, loop=False)
+    snapshots = [Sampler(interval=1.0, backend=replay).collect() for _ in range(4)]
+    assert snapshots[0]["cpu"]["count"] == 4
+    assert set(snapshots[0]["network"]["io_pernic"]) == set(backend.net_io_counters())
+    # Without looping the last frame repeats
+    assert snapshots[3]["network"]["io"] == snapshots[2]["network"]["io"]
+    assert snapshots[2]["network"]["io"] != snapshots[0]["network"]["io"]
+
+
+class BaselineProcess:
+    """Handle whose cpu_percent, like psutil's, is 0.0 on its first call."""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.calls = 0
+
+    def is_running(self):
+        return True
+
+    def as_dict(self, attrs=None, ad_value=None):
+        self.calls += 1
+        return {"pid": self.pid, "cpu_percent": 0.0 if self.calls == 1 else 50.0}
+
+
+class BaselineSource:
+    def __init__(self):
+        self.pids_running = [1, 2]
+
+    def pids(self):
+        return list(self.pids_running)
+
+    def process(self, pid):
+        return BaselineProcess(pid)
+
+
+def test_capture_keeps_process_handles_across_frames():
+    source, handles = BaselineSource(), {}
+    first = capture_processes(source, handles)
+    source.pids_running = [2, 3]
+    second = capture_processes(source, handles)
+
+    assert [info["cpu_percent"] for info in first.values()] == [0.0, 0.0]
+    assert second[2]["cpu_percent"] == 50.0
+    assert second[3]["cpu_percent"] == 0.0  # new process, measured from the next frame
+    assert set(handles) == {2, 3}
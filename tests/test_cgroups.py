@@ -0,0 +1,140 @@
+"""Tests for the cgroup v2 collector"""
+
+import pytest
+
+from system_monitor.collectors import cgroups
+from system_monitor.collectors.cgroups import CgroupCollector, find_root, own_cgroup
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cgroups, "time", clock)
+    return clock
+
+
+def write_cgroup(directory, usage_usec=1_000_000, rbytes=4096, wbytes=8192, memory_current="104857600",
+                 memory_max="209715200", cpu_max="200000 100000", procs="10\n11\n"):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / "cpu.stat").write_text(
+        f"usage_usec {usage_usec}\nuser_usec {usage_usec // 2}\nsystem_usec {usage_usec // 2}\n"
+        "nr_periods 10\nnr_throttled 2\nthrottled_usec 500\n")
+    (directory / "cpu.max").write_text(cpu_max + "\n")
+    (directory / "memory.current").write_text(memory_current + "\n")
+    (directory / "memory.max").write_text(memory_max + "\n")
+    (directory / "memory.stat").write_text("anon 52428800\nfile 41943040\nshmem 0\n")
+    (directory / "io.stat").write_text(
+        f"8:0 rbytes={rbytes} wbytes={wbytes} rios=4 wios=2 dbytes=0 dios=0\n"
+        f"8:16 rbytes={rbytes} wbytes=0 rios=1 wios=0 dbytes=0 dios=0\n")
+    (directory / "cgroup.procs").write_text(procs)
+
+
+@pytest.fixture
+def root(tmp_path):
+    (tmp_path / "cgroup.controllers").write_text("cpu io memory pids\n")
+    write_cgroup(tmp_path / "app")
+    return tmp_path
+
+
+def collector_for(root, **kwargs):
+    collector = CgroupCollector(root=str(root), refresh_interval=0, **kwargs)
+    collector.cgroup = "/app"
+    return collector
+
+
+def test_parses_cgroup_files(root, clock):
+    entry = collector_for(root).read("/app")
+
+    assert entry["path"] == "/app"
+    assert entry["cpu"]["usage_usec"] == 1_000_000
+    assert entry["cpu"]["nr_throttled"] == 2
+    assert entry["cpu"]["limit_cpus"] == 2.0
+    assert entry["cpu"]["usage_percent"] is None  # no previous read
+    assert entry["memory"]["current"] == 104857600
+    assert entry["memory"]["percent"] == 50.0
+    assert entry["memory"]["stat"] == {"anon": 52428800, "file": 41943040, "shmem": 0}
+    assert entry["io"]["read_bytes"] == 8192
+    assert entry["io"]["write_bytes"] == 8192
+    assert entry["io"]["read_ios"] == 5
+    assert entry["io"]["devices"]["8:0"] == {"read_bytes": 4096, "write_bytes": 8192, "read_ios": 4, "write_ios": 2}
+    assert entry["pids"] == [10, 11]
+
+
+def test_unlimited_and_missing_controllers(root, clock):
+    write_cgroup(root / "app", memory_max="max", cpu_max="max 100000")
+    (root / "app" / "io.stat").unlink()
+
+    entry = collector_for(root).read("/app")
+
+    assert entry["cpu"]["limit_cpus"] is None
+    assert entry["memory"]["max"] is None
+    assert entry["memory"]["percent"] is None
+    assert entry["io"] is None
+
+
+def test_rates_from_consecutive_reads(root, clock):
+    collector = collector_for(root)
+    collector.read("/app")
+
+    clock.now += 2
+    write_cgroup(root / "app", usage_usec=2_000_000, rbytes=4096 + 1000, wbytes=8192 + 4000)
+    entry = collector.read("/app")
+
+    assert entry["cpu"]["usage_percent"] == pytest.approx(50.0)  # 1 CPU-second over 2 seconds
+    assert entry["cpu"]["limit_percent"] == pytest.approx(25.0)  # of a 2 CPU limit
+    assert entry["io"]["read_bytes_per_second"] == pytest.approx(1000.0)  # 2000 bytes over two devices
+    assert entry["io"]["write_bytes_per_second"] == pytest.approx(2000.0)
+
+
+def test_recent_read_is_reused(root, clock):
+    collector = CgroupCollector(root=str(root), refresh_interval=1.0)
+    first = collector.read("/app")
+    clock.now += 0.5
+    write_cgroup(root / "app", usage_usec=5_000_000)
+
+    assert collector.read("/app") is first
+
+
+def test_children_and_removed_cgroups(root, clock):
+    write_cgroup(root / "app" / "web")
+    write_cgroup(root / "app" / "web" / "worker")
+    collector = collector_for(root, children=True, max_depth=1)
+
+    assert [entry["path"] for entry in collector.refresh()] == ["/app", "/app/web"]
+
+    for name in ("worker", "web"):
+        directory = root / "app" / "web" if name == "web" else root / "app" / "web" / "worker"
+        for path in directory.iterdir():
+            path.unlink()
+        directory.rmdir()
+    assert [entry["path"] for entry in collector.refresh()] == ["/app"]
+    assert set(collector._reads) == {"/app"}
+
+
+def test_non_cgroup_v2_host(tmp_path, monkeypatch):
+    monkeypatch.setattr(cgroups, "DEFAULT_ROOTS", (str(tmp_path),))
+    assert find_root() is None
+    assert not CgroupCollector(root=None).available()
+
+    proc_file = tmp_path / "cgroup"
+    proc_file.write_text("12:memory:/user.slice\n1:name=systemd:/user.slice\n")
+    assert own_cgroup(str(proc_file)) == "/"
+    proc_file.write_text("0::/system.slice/app.service\n")
+    assert own_cgroup(str(proc_file)) == "/system.slice/app.service"
+
+
+def test_reads_at_the_same_instant_have_no_rates(root, clock):
+    collector = collector_for(root)
+    collector.read("/app")
+    entry = collector.read("/app")
+
+    assert entry["cpu"]["usage_percent"] is None
+    assert entry["io"]["read_bytes_per_second"] is None
@@ -0,0 +1,80 @@
+"""Tests for disk usage and I/O rates"""
+
+import errno
+
+from system_monitor.collectors.disk import DiskCollector, DiskIORates
+from system_monitor.measurements import sdiskio, sdiskpart, sdiskusage
+
+
+class FakeBackend:
+    def __init__(self, errors):
+        self.errors = errors
+
+    def disk_partitions(self):
+        return [sdiskpart(f"/dev/sd{letter}", mountpoint, "ext4", "rw")
+                for letter, mountpoint in zip("abc", ("/", "/mnt/nfs", "/data"))]
+
+    def disk_usage(self, mountpoint):
+        if mountpoint in self.errors:
+            raise self.errors[mountpoint]
+        return sdiskusage(100, 40, 60, 40.0)
+
+
+def test_usages_skip_failing_mounts():
+    stale = OSError(errno.ESTALE, "Stale file handle")
+    backend = FakeBackend({"/mnt/nfs": stale, "/data": PermissionError(errno.EACCES, "Permission denied")})
+    collector = DiskCollector(refresh_interval=60, backend=backend)
+
+    assert [partition.mountpoint for partition, _ in collector.usages()] == ["/"]
+
+    del backend.errors["/mnt/nfs"]
+    assert [partition.mountpoint for partition, _ in collector.usages()] == ["/", "/mnt/nfs"]
+
+
+def io(reads, writes, busy_time=0):
+    return sdiskio(reads, writes, reads * 4096, writes * 8192, reads * 2, writes * 3, 0, 0, busy_time)
+
+
+def snapshot(sampled_at, disks):
+    return {"sampled_at": sampled_at, "disk_io": disks}
+
+
+def test_io_rates_between_snapshots():
+    rates = DiskIORates()
+    rates.record(snapshot(0.0, {"sda": io(100, 50, busy_time=1000)}))
+    assert rates.rates == {}
+
+    rates.record(snapshot(2.0, {"sda": io(300, 150, busy_time=2000)}))
+
+    assert rates.rates["sda"] == {
+        "read_bytes": 200 * 4096 / 2,
+        "write_bytes": 100 * 8192 / 2,
+        "read_iops": 100.0,
+        "write_iops": 50.0,
+        "utilization": 50.0,
+        "await_ms": (400 + 300) / 300,
+    }
+
+
+def test_io_rates_skip_reset_new_and_vanished_devices():
+    rates = DiskIORates()
+    rates.record(snapshot(0.0, {"sda": io(100, 50), "sdb": io(10, 10), "sdc": io(10, 10)}))
+    # sda was reset (e.g. the device was re-attached), sdb disappeared and sdd is new
+    rates.record(snapshot(1.0, {"sda": io(5, 2), "sdc": io(20, 10), "sdd": io(1, 1)}))
+
+    assert set(rates.rates) == {"sdc"}
+    assert rates.rates["sdc"]["read_iops"] == 10.0
+    assert rates.rates["sdc"]["write_iops"] == 0.0
+
+    # The reset device reports again from the next sample
+    rates.record(snapshot(2.0, {"sda": io(15, 2), "sdc": io(20, 10)}))
+    assert rates.rates["sda"]["read_iops"] == 10.0
+
+
+def test_io_rates_ignore_non_advancing_clock():
+    rates = DiskIORates()
+    rates.record(snapshot(1.0, {"sda": io(100, 50)}))
+    rates.record(snapshot(2.0, {"sda": io(200, 50)}))
+    rates.record(snapshot(2.0, {"sda": io(300, 50)}))
+
+    assert rates.rates["sda"]["read_iops"] == 100.0
@@ -0,0 +1,166 @@
+"""Tests for the collector execution layer"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from system_monitor import executor
+from system_monitor.executor import CollectorTimeoutError, run_collector
+
+
+@pytest.fixture(autouse=True)
+def fresh_slots(monkeypatch):
+    # Every test runs its own event loop, so it needs its own semaphore
+    monkeypatch.setattr(executor, "_semaphore", None)
+    monkeypatch.setattr(executor, "_in_flight", {})
+
+
+@pytest.fixture
+def hang():
+    """Blocking function that returns once the test has finished."""
+    release = threading.Event()
+    yield release.wait
+    release.set()
+
+
+def test_saturated_slots_time_out_instead_of_queueing(hang):
+    async def run():
+        hung = [asyncio.ensure_future(run_collector(f"hung{index}", hang, timeout=0.1))
+                for index in range(executor.MAX_CONCURRENCY)]
+        for task in hung:
+            with pytest.raises(CollectorTimeoutError):
+                await task
+
+        started = time.perf_counter()
+        with pytest.raises(CollectorTimeoutError):
+            await run_collector("quick", lambda: 1, timeout=0.2)
+        return time.perf_counter() - started
+
+    assert asyncio.run(run()) < 0.5
+
+
+def test_slot_wait_counts_against_the_timeout(hang):
+    async def run():
+        hung = [asyncio.ensure_future(run_collector(f"hung{index}", hang, timeout=5))
+                for index in range(executor.MAX_CONCURRENCY)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(CollectorTimeoutError):
+            await run_collector("quick", lambda: 1, timeout=0.1)
+        for task in hung:
+            task.cancel()
+        # The slot the timed out wait gave up is not leaked
+        assert executor._semaphore._value == 0
+
+    asyncio.run(run())
+
+
+def counting(release=None):
+    """Blocking function that counts its runs and waits for release."""
+    calls = []
+
+    def collect(value=0):
+        calls.append(value)
+        if release is not None:
+            release.wait(5)
+        return value * 2
+
+    return collect, calls
+
+
+def test_concurrent_identical_calls_share_one_run():
+    release = threading.Event()
+    collect, calls = counting(release)
+
+    async def run():
+        tasks = [asyncio.ensure_future(run_collector("shared", collect, 21, timeout=5)) for _ in range(5)]
+        await asyncio.sleep(0.05)
+        assert executor.in_flight() == {"shared": 1}
+        release.set()
+        results = await asyncio.gather(*tasks)
+        await asyncio.sleep(0.01)
+        return results
+
+    assert asyncio.run(run()) == [42] * 5
+    assert calls == [21]
+    assert executor.in_flight() == {}
+
+
+def test_different_arguments_and_coalesce_false_run_separately():
+    release = threading.Event()
+    collect, calls = counting(release)
+
+    async def run():
+        tasks = [asyncio.ensure_future(run_collector("shared", collect, 1, timeout=5)),
+                 asyncio.ensure_future(run_collector("shared", collect, 2, timeout=5)),
+                 asyncio.ensure_future(run_collector("shared", collect, 1, timeout=5, coalesce=False))]
+        await asyncio.sleep(0.05)
+        assert executor.in_flight() == {"shared": 2}  # uncoalesced calls are not tracked
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(run()) == [2, 4, 2]
+    assert sorted(calls) == [1, 1, 2]
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_run():
+    release = threading.Event()
+    collect, calls = counting(release)
+
+    async def run():
+        first = asyncio.ensure_future(run_collector("shared", collect, 1, timeout=5))
+        second = asyncio.ensure_future(run_collector("shared", collect, 1, timeout=5))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        release.set()
+        return first, await second
+
+    first, result = asyncio.run(run())
+    assert first.cancelled()
+    assert result == 2
+    assert calls == [1]
+
+
+def test_timeout_fires_and_the_slot_is_held_until_the_thread_returns():
+    release = threading.Event()
+    collect, calls = counting(release)
+
+    async def run():
+        started = time.perf_counter()
+        with pytest.raises(CollectorTimeoutError) as error:
+            await run_collector("slow", collect, timeout=0.1)
+        elapsed = time.perf_counter() - started
+        held = executor._semaphore._value
+        # A later call joins the still running collection instead of starting another
+        joined = asyncio.ensure_future(run_collector("slow", collect, timeout=5))
+        await asyncio.sleep(0.01)
+        release.set()
+        await joined
+        await asyncio.sleep(0.01)
+        return error.value, elapsed, held
+
+    error, elapsed, held = asyncio.run(run())
+    assert error.name == "slow" and error.timeout == 0.1
+    assert elapsed < 0.5
+    assert held == executor.MAX_CONCURRENCY - 1
+    assert calls == [0]
+    assert executor.in_flight() == {}
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    collect_calls = []
+
+    def fail():
+        collect_calls.append(1)
+        raise ValueError("broken")
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                await run_collector("failing", fail, timeout=1)
+
+    asyncio.run(run())
+    assert len(collect_calls) == 2
+    assert executor.in_flight() == {}
@@ -0,0 +1,64 @@
+"""Tests for the in-process metrics history"""
+
+import threading
+
+from system_monitor.measurements import snetio
+from system_monitor.history import HistoryStore
+from system_monitor.sampler import Sampler
+
+
+def snapshots(backend, count):
+    sampler = Sampler(interval=1.0, backend=backend)
+    for index in range(count):
+        snapshot = sampler.collect()
+        snapshot["sampled_at"] = 1000.0 + index
+        yield snapshot
+
+
+def test_query_buckets(backend):
+    store = HistoryStore(hours=1, interval=1.0)
+    for snapshot in snapshots(backend, 120):
+        store.record(snapshot)
+
+    result = store.query("cpu", step=60)
+    assert result["timestamps"] == [960.0, 1020.0, 1080.0]
+    total = result["series"]["total"]
+    assert all(low <= avg <= high for low, avg, high in zip(total["min"], total["avg"], total["max"]))
+    assert set(store.query("network")["series"]) == {
+        f"{nic}.{field}" for nic in backend.net_io_counters() for field in ("bytes_sent", "bytes_recv")}
+
+
+def test_removed_interfaces_are_evicted(backend):
+    store = HistoryStore(hours=10 / 3600, interval=1.0)
+    for index, snapshot in enumerate(snapshots(backend, 40)):
+        if index < 5:
+            snapshot["network"]["io_pernic"][f"veth{index}"] = snetio(index, index, 0, 0, 0, 0, 0, 0)
+            snapshot["network"]["io_pernic"][f"veth{index + 1}"] = snetio(index, index, 0, 0, 0, 0, 0, 0)
+        store.record(snapshot)
+
+    # Every short-lived veth series left the 10-sample window and was dropped
+    assert not [name for name in store.series["network"] if name.startswith("veth")]
+    assert not [key for key in store.last_sample if key[1].startswith("veth")]
+    assert len(store.series["network"]) == 2 * len(backend.net_io_counters())
+
+
+def test_query_during_record_sees_whole_rows(backend):
+    store = HistoryStore(hours=200 / 3600, interval=1.0)
+    recorded = list(snapshots(backend, 400))
+    for snapshot in recorded[:200]:
+        store.record(snapshot)
+    errors = []
+
+    def query():
+        for _ in range(200):
+            result = store.query("memory", step=1)
+            # One bucket per sample: every timestamp has its value, never a half-written row
+            if None in result["series"]["percent"]["avg"]:
+                errors.append(result)
+
+    thread = threading.Thread(target=query)
+    thread.start()
+    for snapshot in recorded[200:]:
+        store.record(snapshot)
+    thread.join()
+    assert not errors
@@ -0,0 +1,42 @@
+"""Tests for the per-interface network rates"""
+
+from system_monitor.measurements import snetio
+from system_monitor.collectors.network import WRAP_32, NetworkRates
+
+
+def snapshot(sampled_at, **nics):
+    return {"sampled_at": sampled_at,
+            "network": {"io_pernic": {nic: snetio(sent, received, 0, 0, 0, 0, 0, 0)
+                                      for nic, (sent, received) in nics.items()}}}
+
+
+def test_rates_over_windows():
+    rates = NetworkRates(windows=[1, 10], interval=1.0)
+    for second in range(12):
+        rates.record(snapshot(1000.0 + second, eth0=(second * 1000, second * 500)))
+
+    result = rates.rates("eth0")
+    assert result["1s"]["bytes_sent"] == 1000
+    assert result["10s"]["bytes_recv"] == 500
+    assert result["10s"]["seconds"] == 10
+
+
+def test_32_bit_wrap():
+    rates = NetworkRates(windows=[1], interval=1.0)
+    rates.record(snapshot(1000.0, eth0=(WRAP_32 - 100, 0)))
+    rates.record(snapshot(1001.0, eth0=(400, 0)))
+    assert rates.rates("eth0")["1s"]["bytes_sent"] == 500
+
+
+def test_removed_and_recreated_interface():
+    rates = NetworkRates(windows=[1, 10], interval=1.0)
+    rates.record(snapshot(1000.0, eth0=(10 ** 9, 0), veth1=(5000, 5000)))
+    rates.record(snapshot(1001.0, eth0=(10 ** 9 + 100, 0), veth1=(6000, 6000)))
+    # veth1 disappears, then comes back with counters starting from zero
+    rates.record(snapshot(1002.0, eth0=(10 ** 9 + 200, 0)))
+    assert rates.rates("veth1")["1s"] is None
+    rates.record(snapshot(1003.0, eth0=(10 ** 9 + 300, 0), veth1=(10, 10)))
+    rates.record(snapshot(1004.0, eth0=(10 ** 9 + 400, 0), veth1=(30, 30)))
+
+    assert rates.rates("veth1")["1s"]["bytes_sent"] == 20
+    assert rates.rates("eth0")["10s"]["bytes_sent"] == 100
@@ -0,0 +1,152 @@
+"""Tests for the process registry"""
+
+import psutil
+
+from system_monitor.collectors.process import ProcessIndex, ProcessRegistry
+
+
+class FakeSockets:
+    index = {"by_pid": {}}
+
+    def refresh(self):
+        return self.index
+
+
+class FakeProcess:
+    """Process handle that, like psutil.Process, keeps the create_time it was created with."""
+
+    def __init__(self, host, pid):
+        self.host = host
+        self.pid = pid
+        self.create_time = host.table[pid]["create_time"]
+        self.cpu_reads = 0
+
+    def is_running(self):
+        info = self.host.table.get(self.pid)
+        return info is not None and info["create_time"] == self.create_time
+
+    def as_dict(self, attrs=None, ad_value=None):
+        if not self.is_running():
+            raise psutil.NoSuchProcess(self.pid)
+        if "cpu_percent" in attrs:
+            self.cpu_reads += 1
+        info = self.host.table[self.pid]
+        values = {"pid": self.pid, "username": "root", "status": "running", "cpu_percent": 1.0,
+                  "memory_percent": 1.0, "memory_info": None, "io_counters": None, "num_threads": 1,
+                  "create_time": self.create_time, **info}
+        return {attr: values.get(attr, ad_value) for attr in attrs}
+
+
+class FakeBackend:
+    """Host whose process table tests edit directly: PID -> name, exe, cmdline and create_time."""
+
+    def __init__(self):
+        self.table = {}
+        self.handles = []
+
+    def start(self, pid, name, create_time=1000.0):
+        self.table[pid] = {"name": name, "exe": f"/usr/bin/{name}", "cmdline": [f"/usr/bin/{name}"],
+                           "create_time": create_time}
+
+    def pids(self):
+        return list(self.table)
+
+    def process(self, pid):
+        if pid not in self.table:
+            raise psutil.NoSuchProcess(pid)
+        handle = FakeProcess(self, pid)
+        self.handles.append(handle)
+        return handle
+
+
+def fake_registry():
+    backend = FakeBackend()
+    return backend, ProcessRegistry(refresh_interval=0, backend=backend, sockets=FakeSockets())
+
+
+def test_refresh_reuses_recent_sample(backend):
+    registry = ProcessRegistry(refresh_interval=0, backend=backend)
+    first = registry.refresh()
+    backend.tick()
+
+    assert registry.refresh(max_age=60) is first
+    assert registry.refresh() is not first
+
+
+def test_index_search_intersects_criteria():
+    index = ProcessIndex()
+    index.add(1, {"name": "java", "username": "alice", "exe": "/usr/bin/java", "cmdline": ["java", "-Xmx4g"]})
+    index.add(2, {"name": "java", "username": "bob", "exe": "/usr/bin/java", "cmdline": ["java", "-Xmx8g"]})
+    index.add(3, {"name": "nginx", "username": "alice", "exe": None, "cmdline": ["nginx", "-c", "/etc/nginx.conf"]})
+
+    assert index.search(name="JAVA") == {1, 2}
+    assert index.search(name="java", user="alice") == {1}
+    assert index.search(exe="java") == {1, 2}
+    assert index.search(cmdline="nginx.conf") == {3}
+    assert index.search(user="alice", cmdline="-xmx8g") == set()
+    assert index.search() == set()
+
+    index.remove(1)
+    assert index.search(user="alice") == {3}
+
+
+def test_search_matches_the_synthetic_table(backend):
+    registry = ProcessRegistry(refresh_interval=0, backend=backend)
+    backend.tick()
+
+    expected = {record["pid"] for record in registry.refresh() if record["name"] == "postgres"}
+    assert expected
+    assert {record["pid"] for record in registry.search(name="postgres", max_age=60)} == expected
+
+
+def test_search_returns_the_cached_sample():
+    backend, registry = fake_registry()
+    backend.start(10, "java")
+    records = registry.refresh()
+    handle = backend.handles[0]
+
+    found = registry.search(name="java", max_age=60)
+
+    assert found == records
+    assert found[0] is records[0]
+    assert handle.cpu_reads == 1  # the search did not sample cpu_percent again
+
+
+def test_exec_reindexes_the_process():
+    backend, registry = fake_registry()
+    backend.start(10, "bash")
+    registry.refresh()
+
+    backend.start(10, "java")  # exec(): same PID and create_time, new program
+    records = registry.refresh()
+
+    assert records[0]["name"] == "java"
+    assert registry.search(name="bash", max_age=60) == []
+    assert [record["pid"] for record in registry.search(exe="java", max_age=60)] == [10]
+    assert len(backend.handles) == 1  # the process object and its CPU baseline are kept
+
+
+def test_reused_pid_gets_a_new_process_object():
+    backend, registry = fake_registry()
+    backend.start(10, "worker", create_time=1000.0)
+    registry.refresh()
+
+    backend.start(10, "worker", create_time=2000.0)  # exited and a new process got the PID
+    records = registry.refresh()
+
+    assert len(backend.handles) == 2
+    assert registry.processes[10] is backend.handles[1]
+    assert records[0]["create_time"] == 2000.0
+    assert registry.identities[10] == (2000.0, "worker")
+
+
+def test_exited_processes_are_forgotten():
+    backend, registry = fake_registry()
+    backend.start(10, "java")
+    backend.start(11, "java")
+    registry.refresh()
+
+    del backend.table[11]
+
+    assert [record["pid"] for record in registry.search(name="java")] == [10]
+    assert 11 not in registry.processes and 11 not in registry.identities
@@ -0,0 +1,95 @@
+"""Tests for the /proc fast path, against a fake /proc tree"""
+
+import os
+
+import pytest
+
+from system_monitor.collectors.procfs import ProcfsCollector, total_net_io
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "preadv"), reason="the /proc fast path needs preadv()")
+
+MEMINFO = """MemTotal:       16000000 kB
+MemFree:         2000000 kB
+MemAvailable:    8000000 kB
+Buffers:          500000 kB
+Cached:          4000000 kB
+SwapCached:        99999 kB
+Active:          6000000 kB
+Inactive:        3000000 kB
+Active(anon):    1111111 kB
+Shmem:            300000 kB
+ShmemHugePages:        0 kB
+Slab:             700000 kB
+SReclaimable:     400000 kB
+"""
+
+NET_DEV = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo:    1000      10    0    0    0     0          0         0     1000      10    0    0    0     0       0          0
+  eth0: 5000000    4000    1    2    0     0          0         0  3000000    2500    3    4    0     0       0          0
+"""
+
+DISKSTATS = """   8       0 sda 100 5 2000 30 200 10 4000 60 0 80 90 0 0 0 0
+   8       1 sda1 1 2 3 4
+"""
+
+
+def write_stat(root, user, idle, cpus=2):
+    lines = [f"cpu  {user * cpus} 0 0 {idle * cpus} 0 0 0 0 0 0"]
+    lines += [f"cpu{cpu} {user} 0 0 {idle} 0 0 0 0 0 0" for cpu in range(cpus)]
+    # A long interrupt line after the cpu lines, larger than the initial buffer
+    lines.append("intr " + " ".join(str(number) for number in range(20000)))
+    lines.append("ctxt 12345")
+    (root / "stat").write_text("\n".join(lines) + "\n")
+
+
+@pytest.fixture
+def proc(tmp_path):
+    (tmp_path / "net").mkdir()
+    write_stat(tmp_path, user=10, idle=100)
+    (tmp_path / "meminfo").write_text(MEMINFO)
+    (tmp_path / "net" / "dev").write_text(NET_DEV)
+    (tmp_path / "diskstats").write_text(DISKSTATS)
+    collector = ProcfsCollector(str(tmp_path))
+    yield tmp_path, collector
+    collector.close()
+
+
+def test_cpu_percent(proc):
+    root, collector = proc
+    # Each CPU spends 50 of the next 100 ticks busy
+    write_stat(root, user=60, idle=150)
+    percent, per_cpu = collector.cpu_percent()
+    assert per_cpu == [50.0, 50.0]
+    assert percent == 50.0
+
+
+def test_virtual_memory(proc):
+    _, collector = proc
+    memory = collector.virtual_memory()
+    assert memory.total == 16000000 * 1024
+    assert memory.available == 8000000 * 1024
+    # Cached includes SReclaimable and is not confused with SwapCached
+    assert memory.cached == (4000000 + 400000) * 1024
+    assert memory.active == 6000000 * 1024
+    assert memory.shared == 300000 * 1024
+    assert memory.percent == 50.0
+
+
+def test_net_io_counters(proc):
+    _, collector = proc
+    counters = collector.net_io_counters()
+    assert set(counters) == {"lo", "eth0"}
+    eth0 = counters["eth0"]
+    assert (eth0.bytes_recv, eth0.packets_recv, eth0.errin, eth0.dropin) == (5000000, 4000, 1, 2)
+    assert (eth0.bytes_sent, eth0.packets_sent, eth0.errout, eth0.dropout) == (3000000, 2500, 3, 4)
+    assert total_net_io(counters).bytes_recv == 5001000
+
+
+def test_disk_io_counters(proc):
+    _, collector = proc
+    counters = collector.disk_io_counters()
+    sda = counters["sda"]
+    assert (sda.read_count, sda.write_count, sda.read_bytes, sda.write_bytes) == (100, 200, 2000 * 512, 4000 * 512)
+    assert sda.busy_time == 80
+    assert counters["sda1"].read_bytes == 2 * 512
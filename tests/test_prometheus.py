@@ -0,0 +1,55 @@
+"""Tests for the Prometheus text renderer"""
+
+import re
+
+from system_monitor.measurements import shwtemp
+from system_monitor.prometheus import CONTENT_TYPE, Renderer
+from system_monitor.sampler import Sampler
+
+SAMPLE_LINE = re.compile(r'^([a-z_]+)(\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\})? (\S+)$')
+
+
+def render(backend, **kwargs):
+    snapshot = Sampler(interval=1.0, backend=backend).collect()
+    return Renderer().render(snapshot, **kwargs)
+
+
+def samples(text):
+    return [line for line in text.splitlines() if not line.startswith("#")]
+
+
+def test_renders_valid_text(backend):
+    text = render(backend, temperatures=backend.sensors_temperatures(),
+                  process_statuses=["running", "sleeping", "sleeping"],
+                  sockets={"by_state": {"LISTEN": 3, "ESTABLISHED": 7}})
+
+    assert CONTENT_TYPE.startswith("text/plain; version=0.0.4")
+    for line in samples(text):
+        match = SAMPLE_LINE.match(line)
+        assert match, line
+        float(match.group(4))
+    assert 'system_monitor_processes{status="sleeping"} 2' in text
+    assert 'system_monitor_sockets{state="LISTEN"} 3' in text
+    assert text.count("# TYPE system_monitor_cpu_core_usage_percent gauge") == 1
+    assert len([line for line in samples(text) if line.startswith("system_monitor_cpu_core_usage_percent")]) == 4
+
+
+def test_series_are_unique_with_repeated_sensor_labels(backend):
+    temperatures = {
+        "nvme": [shwtemp("Composite", 40.0, 80.0, 85.0), shwtemp("Composite", 42.0, 80.0, 85.0),
+                 shwtemp("Sensor 1", 39.0, 80.0, 85.0)],
+        "acpitz": [shwtemp("", 30.0, None, None), shwtemp("", 31.0, None, None)],
+    }
+    text = render(backend, temperatures=temperatures)
+
+    series = [line.rsplit(" ", 1)[0] for line in samples(text)]
+    assert len(series) == len(set(series))
+    assert 'system_monitor_temperature_celsius{sensor="nvme",label="Composite",index="0"} 40.0' in text
+    assert 'system_monitor_temperature_celsius{sensor="nvme",label="Composite",index="1"} 42.0' in text
+    assert 'system_monitor_temperature_celsius{sensor="nvme",label="Sensor 1"} 39.0' in text
+    assert 'system_monitor_temperature_celsius{sensor="acpitz",label="1"} 31.0' in text
+
+
+def test_label_values_are_escaped(backend):
+    text = render(backend, temperatures={'chip"0': [shwtemp("a\\b\nc", 50.0, None, None)]})
+    assert 'sensor="chip\\"0",label="a\\\\b\\nc"} 50.0' in text
@@ -0,0 +1,179 @@
+"""Tests for the registration agent's deadbands, adaptive interval and embedded loop"""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from system_monitor import register
+from system_monitor.register import AdaptiveInterval, Deadband, RegistrationAgent, SampleBuffer
+from system_monitor.spool import Spool
+
+DELTAS = {"cpu_percent": 5.0, "memory_percent": 2.0, "cpu_count": 0.0}
+
+
+def row(updated_on=0, cpu_percent=10.0, memory_percent=40.0, cpu_count=4):
+    return {"updated_on": updated_on, "cpu_percent": cpu_percent, "memory_percent": memory_percent,
+            "cpu_count": cpu_count}
+
+
+def test_deadband_suppresses_small_changes():
+    deadband = Deadband(DELTAS, heartbeat=30)
+    assert deadband.changed(row())
+    deadband.written(row())
+
+    assert not deadband.changed(row(cpu_percent=14.0, memory_percent=41.0))
+    assert deadband.changed(row(cpu_percent=15.5))
+    assert deadband.changed(row(memory_percent=37.5))
+    assert deadband.changed(row(cpu_count=8))
+
+
+def test_deadband_handles_unknown_values():
+    deadband = Deadband(DELTAS, heartbeat=30)
+    deadband.written(row(cpu_count=None))
+
+    assert not deadband.changed(row(cpu_count=None))
+    assert deadband.changed(row(cpu_count=4))
+    deadband.written(row(cpu_count=4))
+    assert deadband.changed(row(cpu_count=None))
+
+
+def test_heartbeat():
+    deadband = Deadband(DELTAS, heartbeat=30)
+    assert deadband.heartbeat_due(row())
+    deadband.written(row(updated_on=1000))
+
+    assert not deadband.heartbeat_due(row(updated_on=30999))
+    assert deadband.heartbeat_due(row(updated_on=31000))
+
+
+def test_adaptive_interval():
+    interval = AdaptiveInterval(min_interval=1, max_interval=10, backoff=2)
+    assert [interval.update(False) for _ in range(5)] == [2, 4, 8, 10, 10]
+    assert interval.update(True) == 1
+    assert interval.update(False) == 2
+
+
+@pytest.fixture
+def agent(tmp_path, monkeypatch):
+    monkeypatch.setattr(register, "Spool", lambda: Spool(directory=str(tmp_path)))
+    monkeypatch.setattr(register, "get_ip_address", lambda: "10.0.0.1")
+    return RegistrationAgent()
+
+
+def test_heartbeat_fits_fleet_max_age(agent):
+    agent.deadband.heartbeat = 60
+    agent.interval.max_interval = 10
+    agent.buffer.flush_interval = 5
+    agent.check_heartbeat(60)
+    assert agent.deadband.heartbeat == 45
+
+    agent.check_heartbeat(120)
+    assert agent.deadband.heartbeat == 45
+
+
+def test_idle_host_writes_within_max_age(agent):
+    max_age = 60
+    agent.check_heartbeat(max_age)
+    now, written = 0.0, []
+    # An idle host: nothing ever crosses a deadband
+    while now < 600:
+        sample = agent.make_row(10.0, None, SimpleNamespace(percent=40.0, total=2 ** 34), 50.0)
+        sample["updated_on"] = int(now * 1000)
+        delay = agent.record(sample)
+        if agent.buffer.rows:
+            written.append(now)
+            agent.buffer.drain()
+        now += delay
+
+    gaps = [later - earlier for earlier, later in zip(written, written[1:])]
+    assert max(gaps) + agent.buffer.flush_interval < max_age
+
+
+class FakeCursor:
+    def __init__(self, during_write=None):
+        self.during_write = during_write
+
+    def execute(self, sql, params=None):
+        if self.during_write is not None:
+            self.during_write()
+
+
+class FakeConnection:
+    closed = 0
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def full_row(updated_on):
+    return {**row(updated_on=updated_on), "ip": "10.0.0.1", "disk_usage": 50.0}
+
+
+def test_buffer_keeps_rows_added_during_a_flush(monkeypatch):
+    monkeypatch.setattr(register, "execute_values", lambda *args, **kwargs: None)
+    buffer = SampleBuffer(batch_size=10, flush_interval=5, max_buffered=3)
+    for index in range(3):
+        buffer.add(full_row(index))
+
+    # Two rows arrive while the write runs and evict the two oldest
+    cursor = FakeCursor(lambda: [buffer.add(full_row(index)) for index in (3, 4)])
+    assert buffer.flush(FakeConnection(), cursor) == 3
+
+    assert [sample["updated_on"] for sample in buffer.rows] == [3, 4]
+
+
+class FakeAgent:
+    def __init__(self):
+        self.rows = []
+        self.flushes = 0
+        self.release = threading.Event()
+        self.stopped = False
+
+    def start(self):
+        pass
+
+    def make_row(self, cpu_percent, cpu_count, virtual_memory, disk_percent):
+        return {"cpu_percent": cpu_percent}
+
+    def record(self, sample):
+        self.rows.append(sample)
+        return 0.0
+
+    def flush(self):
+        self.flushes += 1
+        self.release.wait(5)
+
+    def stop(self):
+        self.stopped = True
+
+
+class FakeSampler:
+    interval = 0.01
+
+    async def next_snapshot(self):
+        await asyncio.sleep(0.01)
+        return {"cpu": {"percent": 1.0, "physical_count": 2}, "memory": None, "disk": []}
+
+
+def test_embedded_agent_skips_flushes_while_one_is_running(monkeypatch):
+    fake = FakeAgent()
+    monkeypatch.setattr(register, "RegistrationAgent", lambda: fake)
+
+    async def run():
+        task = asyncio.ensure_future(register.run_embedded(FakeSampler()))
+        await asyncio.sleep(0.2)
+        samples, flushes = len(fake.rows), fake.flushes
+        fake.release.set()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return samples, flushes
+
+    samples, flushes = asyncio.run(run())
+    assert samples > 5  # sampling went on while the first flush hung
+    assert flushes == 1
+    assert fake.stopped
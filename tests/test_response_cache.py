@@ -0,0 +1,116 @@
+"""Tests for the response cache and conditional GET"""
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from system_monitor import response_cache as response_cache_module
+from system_monitor.response_cache import ResponseCache, etag_matches
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache_module, "time", clock)
+    return clock
+
+
+def make_client(ttl, changing=True):
+    cache = ResponseCache()
+    cache._ttls["counter"] = ttl
+    app = FastAPI()
+    calls = []
+
+    @app.get("/counter")
+    async def counter(request: Request):
+        async def produce():
+            calls.append(dict(request.query_params))
+            return {"calls": len(calls) if changing else 0, "query": dict(request.query_params)}
+
+        return await cache.respond(request, "counter", produce)
+
+    return TestClient(app), cache, calls
+
+
+def test_if_none_match_gets_304(clock):
+    client, _, calls = make_client(ttl=30)
+    first = client.get("/counter")
+    etag = first.headers["etag"]
+
+    assert first.status_code == 200
+    assert etag.startswith('W/"')
+    assert first.headers["vary"] == "Accept"
+
+    again = client.get("/counter", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    assert len(calls) == 1
+
+    other = client.get("/counter", headers={"If-None-Match": 'W/"0000000000000000"'})
+    assert other.status_code == 200
+
+
+def test_query_strings_get_separate_entries(clock):
+    client, cache, calls = make_client(ttl=30)
+    a = client.get("/counter?sort=pid&limit=5")
+    b = client.get("/counter?sort=-pid&limit=5")
+    # Parameter order does not matter
+    c = client.get("/counter?limit=5&sort=pid")
+
+    assert a.json()["query"] == {"sort": "pid", "limit": "5"}
+    assert b.json()["query"] == {"sort": "-pid", "limit": "5"}
+    assert c.json() == a.json()
+    assert len(calls) == 2
+    assert len(cache.entries) == 2
+    assert a.headers["etag"] != b.headers["etag"]
+
+
+def test_entries_expire_after_the_ttl(clock):
+    client, _, calls = make_client(ttl=30)
+    first = client.get("/counter")
+    clock.now += 10
+    cached = client.get("/counter")
+    assert cached.json() == first.json()
+    assert cached.headers["age"] == "10"
+
+    clock.now += 21
+    fresh = client.get("/counter")
+    assert fresh.json()["calls"] == 2
+    assert fresh.headers["age"] == "0"
+    assert fresh.headers["etag"] != first.headers["etag"]
+
+
+def test_zero_ttl_stores_nothing_but_still_answers_304(clock):
+    client, cache, calls = make_client(ttl=0, changing=False)
+    first = client.get("/counter")
+    second = client.get("/counter", headers={"If-None-Match": first.headers["etag"]})
+
+    assert second.status_code == 304
+    assert cache.entries == {}
+    assert len(calls) == 2
+
+
+def test_changed_body_is_sent_again(clock):
+    client, _, calls = make_client(ttl=0)
+    first = client.get("/counter")
+    second = client.get("/counter", headers={"If-None-Match": first.headers["etag"]})
+
+    assert second.status_code == 200
+    assert second.json()["calls"] == 2
+
+
+def test_etag_matching_is_weak_and_handles_lists():
+    assert etag_matches('"abc"', 'W/"abc"')
+    assert etag_matches('W/"x", W/"abc"', 'W/"abc"')
+    assert etag_matches("*", 'W/"abc"')
+    assert not etag_matches(None, 'W/"abc"')
+    assert not etag_matches('W/"abd"', 'W/"abc"')
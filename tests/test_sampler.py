@@ -0,0 +1,94 @@
+"""Tests for the background sampler"""
+
+import asyncio
+import errno
+
+import pytest
+
+from system_monitor.sampler import Sampler, StaleSnapshotError
+
+
+def test_collect_reads_every_section(backend):
+    sampler = Sampler(interval=1.0, backend=backend)
+    snapshot = sampler.collect()
+
+    assert snapshot["cpu"]["count"] == 4
+    assert snapshot["cpu"]["physical_count"] == 2
+    assert len(snapshot["cpu"]["per_cpu_percent"]) == 4
+    assert set(snapshot["network"]["io_pernic"]) == set(backend.net_io_counters())
+    assert len(snapshot["disk"]) == 2
+    assert snapshot["memory"].total == backend.memory_total
+
+
+def test_collect_sums_interfaces(backend):
+    snapshot = Sampler(interval=1.0, backend=backend).collect()
+
+    pernic = snapshot["network"]["io_pernic"].values()
+    assert snapshot["network"]["io"].bytes_sent == sum(nic.bytes_sent for nic in pernic)
+    assert snapshot["network"]["io"].bytes_recv == sum(nic.bytes_recv for nic in pernic)
+
+
+def test_listeners_see_every_snapshot(backend):
+    sampler = Sampler(interval=0.01, backend=backend)
+    seen = []
+    sampler.add_listener(seen.append)
+
+    async def main():
+        first = await sampler.latest()
+        second = await sampler.next_snapshot()
+        await sampler.stop()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert second["sampled_at"] >= first["sampled_at"]
+    assert seen[:2] == [first, second]
+
+
+def test_failing_section_keeps_its_previous_value(backend, monkeypatch):
+    sampler = Sampler(interval=1.0, backend=backend)
+    first = sampler.collect()
+
+    def stale_mount():
+        raise OSError(errno.ESTALE, "Stale file handle")
+
+    monkeypatch.setattr(sampler.disk, "usages", stale_mount)
+    backend.tick()
+    second = sampler.collect()
+
+    assert second["disk"] is first["disk"]
+    assert second["network"]["io"] != first["network"]["io"]
+
+
+def test_failing_section_without_previous_value_fails_the_sample(backend, monkeypatch):
+    sampler = Sampler(interval=1.0, backend=backend)
+    monkeypatch.setattr(backend, "virtual_memory", lambda: 1 / 0)
+
+    with pytest.raises(ZeroDivisionError):
+        sampler.collect()
+
+
+def test_latest_gives_up_when_no_sample_arrives(backend, monkeypatch):
+    sampler = Sampler(interval=0.01, backend=backend, stale_after=0.1)
+    monkeypatch.setattr(backend, "virtual_memory", lambda: 1 / 0)
+
+    async def main():
+        try:
+            with pytest.raises(StaleSnapshotError):
+                await asyncio.wait_for(sampler.latest(), 2)
+        finally:
+            await sampler.stop()
+
+    asyncio.run(main())
+
+
+def test_latest_rejects_a_stale_snapshot(backend):
+    sampler = Sampler(interval=0.01, backend=backend, stale_after=0.1)
+
+    async def main():
+        await sampler.latest()
+        await sampler.stop()
+        await asyncio.sleep(0.15)
+        with pytest.raises(StaleSnapshotError):
+            await sampler.latest()
+
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""Tests for the shared snapshot segment and the multi-worker sampler"""
+
+import asyncio
+import time
+
+import pytest
+
+from system_monitor.sampler import SharedSampler, StaleSnapshotError
+from system_monitor.shared_snapshot import SEQUENCE, SamplerSupervisor, SnapshotSegment
+
+
+@pytest.fixture
+def segment():
+    segment = SnapshotSegment.create(capacity=4096)
+    yield segment
+    segment.close()
+    segment.unlink()
+
+
+def test_read_returns_the_last_write(segment):
+    reader = SnapshotSegment.attach(segment.path)
+    assert reader.read() == (0, None)
+
+    segment.write({"value": 1})
+    segment.write({"value": 2})
+
+    assert reader.read() == (4, {"value": 2})
+    reader.close()
+
+
+def test_oversized_snapshot_is_dropped(segment):
+    segment.write({"value": 1})
+    segment.write({"blob": b"x" * 8192})
+
+    assert SnapshotSegment.attach(segment.path).read() == (2, {"value": 1})
+
+
+def test_new_writer_recovers_from_an_interrupted_write(segment):
+    segment.write({"value": 1})
+    SEQUENCE.pack_into(segment._map, 0, 3)  # the writer died after marking a write in progress
+
+    writer = SnapshotSegment(segment.path, segment.capacity, writable=True)
+    writer.write({"value": 2})
+
+    assert SnapshotSegment.attach(segment.path).read() == (6, {"value": 2})
+    writer.close()
+
+
+def test_shared_sampler_publishes_new_snapshots(segment):
+    sampler = SharedSampler(segment.path, poll_interval=0.01, stale_after=1.0)
+    seen = []
+    sampler.add_listener(seen.append)
+
+    async def run():
+        segment.write({"value": 1})
+        first = await sampler.latest()
+        segment.write({"value": 2})
+        await asyncio.sleep(0.05)
+        await sampler.stop()
+        return first
+
+    assert asyncio.run(run()) == {"value": 1}
+    assert seen == [{"value": 1}, {"value": 2}]
+
+
+def test_shared_sampler_reports_a_stalled_sampler_process(segment):
+    sampler = SharedSampler(segment.path, poll_interval=0.01, stale_after=0.1)
+
+    async def run():
+        segment.write({"value": 1})
+        await sampler.latest()
+        await asyncio.sleep(0.15)
+        with pytest.raises(StaleSnapshotError):
+            await sampler.latest()
+        segment.write({"value": 2})
+        await asyncio.sleep(0.05)
+        latest = await sampler.latest()
+        await sampler.stop()
+        return latest
+
+    assert asyncio.run(run()) == {"value": 2}
+
+
+def test_shared_sampler_gives_up_waiting_for_the_first_snapshot(segment):
+    sampler = SharedSampler(segment.path, poll_interval=0.01, stale_after=0.05)
+
+    async def run():
+        with pytest.raises(StaleSnapshotError):
+            await sampler.latest()
+        await sampler.stop()
+
+    asyncio.run(run())
+
+
+class FakeProcess:
+    def __init__(self):
+        self.pid = 1000
+        self.exitcode = None
+        self.terminated = False
+
+    def is_alive(self):
+        return self.exitcode is None
+
+    def terminate(self):
+        self.terminated = True
+
+    def join(self, timeout=None):
+        pass
+
+
+def test_supervisor_restarts_an_exited_sampler_process(monkeypatch):
+    supervisor = SamplerSupervisor("unused")
+    supervisor.CHECK_INTERVAL = 0.01
+    spawned = []
+
+    def spawn():
+        supervisor.process = FakeProcess()
+        supervisor._started_at = time.monotonic() - 120  # long-lived: restart after the minimum delay
+        spawned.append(supervisor.process)
+
+    monkeypatch.setattr(supervisor, "_spawn", spawn)
+    monkeypatch.setattr(supervisor._stop, "wait", lambda timeout: time.sleep(0.01) or supervisor._stop.is_set())
+    supervisor.start()
+    spawned[0].exitcode = 1
+    deadline = time.monotonic() + 2
+    while len(spawned) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    supervisor.stop()
+
+    assert len(spawned) == 2
+    assert supervisor.restarts == 1
+    assert spawned[1].terminated
@@ -0,0 +1,52 @@
+"""Tests for the field projection of the snapshot endpoint"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from system_monitor.routers.snapshot import snapshot
+from system_monitor.routers.snapshot.snapshot import parse_fields, project
+
+BODY = {
+    "cpu": {"cpu_utilization": "12%", "load_avg": {"1m": 0.5, "5m": 0.4}},
+    "disk": {"partitions": [{"mountpoint": "/", "total": "10G"}, {"mountpoint": "/data", "total": "1T"}]},
+    "memory": {"percent": "40%"},
+}
+
+
+def test_parse_fields_builds_a_tree():
+    assert parse_fields("cpu.load_avg.1m, cpu.cpu_utilization,disk") == {
+        "cpu": {"load_avg": {"1m": {}}, "cpu_utilization": {}}, "disk": {}}
+
+
+def test_parse_fields_ignores_empty_paths_and_segments():
+    assert parse_fields(",cpu..cpu_utilization,, ") == {"cpu": {"cpu_utilization": {}}}
+    assert parse_fields(",") == {}
+
+
+def test_project_keeps_selected_paths_through_lists():
+    projected = project(BODY, parse_fields("cpu.load_avg.1m,disk.partitions.mountpoint"))
+
+    assert projected == {
+        "cpu": {"load_avg": {"1m": 0.5}},
+        "disk": {"partitions": [{"mountpoint": "/"}, {"mountpoint": "/data"}]},
+        "memory": {"percent": "40%"},  # not mentioned, kept whole
+    }
+
+
+def test_project_leaves_out_missing_names():
+    projected = project(BODY, parse_fields("cpu.nonexistent,cpu.cpu_utilization.deeper,memory"))
+
+    assert projected["cpu"] == {"cpu_utilization": "12%"}  # no dict to descend into: kept as is
+    assert projected["memory"] == BODY["memory"]
+
+
+def test_fields_outside_the_included_subsystems_are_rejected():
+    app = FastAPI()
+    app.include_router(snapshot.router)
+    client = TestClient(app)
+
+    response = client.get("/api/v1/snapshot/", params={"include": "cpu", "fields": "cpu.cpu_utilization,cpux.a"})
+
+    assert response.status_code == 400
+    assert "cpux" in response.json()["detail"]
+    assert client.get("/api/v1/snapshot/", params={"include": "cpu", "fields": "memory"}).status_code == 400
@@ -0,0 +1,116 @@
+"""Tests for the registration agent's on-disk spool"""
+
+import pytest
+
+from system_monitor.spool import HEADER, QUARANTINE_SUFFIX, SEGMENT_SUFFIX, Spool
+
+
+class FakeConnection:
+    closed = False
+
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class FakeCursor:
+    """Records the rows of every COPY as lists of tab-separated fields."""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    def copy_expert(self, sql, buffer):
+        if self.fail:
+            raise RuntimeError("connection lost")
+        self.batches.append([line.split("\t") for line in buffer.read().splitlines()])
+
+
+def rows(count, start=0):
+    return [{"ip": "10.0.0.1", "updated_on": 1767225600000 + index * 1000, "cpu_percent": index,
+             "memory_percent": None, "disk_usage": 50.0} for index in range(start, start + count)]
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return Spool(directory=str(tmp_path), max_bytes=1024 ** 2, segment_bytes=1024, batch_size=10)
+
+
+def test_replay_in_batches(spool):
+    assert spool.append(rows(25)) == 25
+    connection, cursor = FakeConnection(), FakeCursor()
+
+    assert spool.replay(connection, cursor, max_batches=2) == 20
+    assert [len(batch) for batch in cursor.batches] == [10, 10]
+    assert cursor.batches[0][0] == ["10.0.0.1", "1767225600000", "0", "\\N", "50.0"]
+    assert connection.commits == 2
+
+    # A new spool on the same directory resumes from the stored offset
+    resumed = Spool(directory=str(spool.directory), max_bytes=spool.max_bytes, segment_bytes=1024, batch_size=10)
+    assert resumed.replay(connection, cursor, max_batches=5) == 5
+    assert [row[2] for row in cursor.batches[-1]] == ["20", "21", "22", "23", "24"]
+    assert not resumed.pending()
+
+
+def damage(spool, offset):
+    """Flip a byte at an offset from the start of the second record of the only segment."""
+    path = next(spool.directory.glob(f"*{SEGMENT_SUFFIX}"))
+    data = bytearray(path.read_bytes())
+    length, _ = HEADER.unpack_from(data, 0)
+    data[HEADER.size + length + offset] ^= 0xFF
+    path.write_bytes(bytes(data))
+    return path
+
+
+def test_replay_skips_corrupt_record(spool):
+    spool.append(rows(3))
+    # A payload byte, so the CRC of the second record no longer matches
+    damage(spool, HEADER.size + 1)
+
+    cursor = FakeCursor()
+    assert spool.replay(FakeConnection(), cursor, max_batches=5) == 2
+    assert [row[2] for row in cursor.batches[0]] == ["0", "2"]
+    assert not spool.pending()
+
+
+def test_unreadable_segment_is_moved_aside(spool):
+    spool.append(rows(3))
+    # The top byte of the length, which now points past the end of the segment
+    path = damage(spool, 3)
+
+    cursor = FakeCursor()
+    assert spool.replay(FakeConnection(), cursor, max_batches=5) == 1
+    assert [row[2] for row in cursor.batches[0]] == ["0"]
+    assert not spool.pending()
+    assert path.with_suffix(QUARANTINE_SUFFIX).exists()
+
+
+def test_failed_replay_keeps_rows(spool):
+    spool.append(rows(5))
+    connection = FakeConnection()
+    with pytest.raises(RuntimeError):
+        spool.replay(connection, FakeCursor(fail=True))
+    assert connection.rollbacks == 1
+
+    cursor = FakeCursor()
+    assert spool.replay(connection, cursor) == 5
+
+
+def test_evicts_oldest_segments(tmp_path):
+    spool = Spool(directory=str(tmp_path), max_bytes=2048, segment_bytes=512, batch_size=1000)
+    for start in range(0, 100, 5):
+        spool.append(rows(5, start))
+
+    assert spool.size() <= 2048
+    cursor = FakeCursor()
+    spool.replay(FakeConnection(), cursor, max_batches=100)
+    replayed = [int(row[2]) for batch in cursor.batches for row in batch]
+    # The newest samples survive, in order, and the oldest were dropped
+    assert replayed == list(range(100 - len(replayed), 100))
+    assert len(replayed) < 100
@@ -0,0 +1,62 @@
+"""Tests for the merge-patch deltas of the metrics stream"""
+
+from system_monitor.routers.stream.stream import _diff
+
+
+def merge_patch(target, patch):
+    """Apply a JSON merge patch (RFC 7396) like a stream client does."""
+    if not isinstance(patch, dict):
+        return patch
+    result = dict(target) if isinstance(target, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+    return result
+
+
+def test_unchanged_frame_gives_empty_patch():
+    frame = {"cpu": {"percent": 12.5, "per_cpu": [10, 15]}, "memory": {"percent": 40}}
+    assert _diff(frame, {"cpu": {"percent": 12.5, "per_cpu": [10, 15]}, "memory": {"percent": 40}}) == {}
+
+
+def test_only_changed_leaves_are_sent():
+    old = {"cpu": {"percent": 12.5, "load": {"1m": 0.5, "5m": 0.4}}, "memory": {"percent": 40}}
+    new = {"cpu": {"percent": 12.5, "load": {"1m": 0.7, "5m": 0.4}}, "memory": {"percent": 40}}
+
+    assert _diff(old, new) == {"cpu": {"load": {"1m": 0.7}}}
+
+
+def test_removed_keys_become_null_at_any_depth():
+    old = {"network": {"eth0": {"rx": 1}, "eth1": {"rx": 2}}, "sensors": {"cpu": 50}}
+    new = {"network": {"eth0": {"rx": 1}}}
+
+    assert _diff(old, new) == {"network": {"eth1": None}, "sensors": None}
+
+
+def test_added_keys_and_type_changes_are_sent_whole():
+    old = {"disk": [1, 2], "battery": None, "fans": 3}
+    new = {"disk": [1, 2, 3], "battery": {"percent": 80}, "fans": {"cpu": 1200}, "users": ["root"]}
+
+    assert _diff(old, new) == {"disk": [1, 2, 3], "battery": {"percent": 80}, "fans": {"cpu": 1200},
+                               "users": ["root"]}
+    assert _diff({"fans": {"cpu": 1200}}, {"fans": 0}) == {"fans": 0}
+
+
+def test_patches_rebuild_every_frame():
+    frames = [
+        {"cpu": {"percent": 1.0, "per_cpu": [1, 1]}, "network": {"eth0": {"rx": 1, "tx": 2}}},
+        {"cpu": {"percent": 2.0, "per_cpu": [1, 3]}, "network": {"eth0": {"rx": 1, "tx": 5}, "eth1": {"rx": 0}}},
+        {"cpu": {"percent": 2.0, "per_cpu": [1, 3]}, "network": {"eth1": {"rx": 4}}},
+        {"cpu": {"percent": 0.5}, "disk": {"sda": {"read": 10}}},
+    ]
+    state = frames[0]
+    for before, after in zip(frames, frames[1:]):
+        state = merge_patch(state, _diff(before, after))
+        assert state == after
+
+
+def test_null_values_are_sent_as_removals():
+    # Merge patches cannot tell "set to null" from "remove"; clients treat both as removal
+    assert _diff({"rates": {"eth0": 12.0}}, {"rates": {"eth0": None}}) == {"rates": {"eth0": None}}